@@ -0,0 +1,356 @@
+import math
+
+from krittika.workload_manager import WorkloadManager
+from krittika.partition_manager import PartitionManager
+from krittika.single_layer_sim import SingleLayerSim
+from krittika.compute.simd.simd import simd
+
+
+class AnalyticalLayerSim(SingleLayerSim):
+    '''
+        Closed form counterpart of SingleLayerSim used for design space exploration.
+        The per core report lists are filled in with the same layout as the cycle accurate
+        simulation, but no operand or demand matrices are ever created:
+        1. Partition the operand matrix dimensions exactly as SingleLayerSim does
+        2. Estimate folds, cycles and SRAM accesses per core from the dataflow
+        3. Estimate DRAM traffic from operand reuse vs the SRAM capacity
+        4. Estimate stalls from the DRAM traffic and the interface bandwidth (USER mode)
+    '''
+    def __init__(self):
+        super().__init__()
+
+        self.workload_obj = WorkloadManager()
+
+        # Dimensions of the ofmap operand matrix, consumed by the following activation layer
+        self.ofmap_rows = 0
+        self.ofmap_cols = 0
+
+    #
+    def set_analytical_params(self, workload_obj=WorkloadManager()):
+        self.workload_obj = workload_obj
+
+    #
+    def run(self):
+        assert self.params_set, 'Params are not set'
+
+        self.num_input_part, self.num_filter_part = self.partitioner_obj.get_layer_partitions(layer_id=self.layer_id)
+        self.num_batch_part = self.partitioner_obj.get_layer_batch_parts(layer_id=self.layer_id)
+        self.num_reduction_part = self.partitioner_obj.get_layer_reduction_parts(layer_id=self.layer_id)
+
+        num_rows, window_sz, num_filt = self.workload_obj.get_operand_matrix_dims(layer_id=self.layer_id)
+        self.ofmap_rows = num_rows
+        self.ofmap_cols = num_filt
+
+        layer_params = self.workload_obj.get_layer_params(self.layer_id)
+        ifmap_h, ifmap_w = layer_params[2:4]
+        num_ch = layer_params[6]
+        ifmap_unique_words = ifmap_h * ifmap_w * num_ch
+        layer_sparsity = self.workload_obj.get_layer_sparsity(self.layer_id)
+        filter_word_bits = int(8 * self.config_obj.get_precision_bytes(self.operand_precisions[1]))
+
+        # The window is not split finer than one word per core
+        self.num_reduction_part = min(self.num_reduction_part, window_sz)
+        window_cols_per_part = math.ceil(window_sz / self.num_reduction_part)
+        self.part_ofmap_words_list = []
+        self.core_units_list = []
+
+        # The matmul cores of a heterogeneous layer run the first rows, see SingleLayerSim.get_operand_partitions
+        for unit_entry, _, unit_rows in self.partitioner_obj.get_layer_unit_row_splits(layer_id=self.layer_id,
+                                                                                       num_rows=num_rows):
+            if unit_rows == 0:
+                continue
+
+            compute_unit, opt_dataflow = unit_entry[3:5]
+            row_bounds, col_bounds = self.partitioner_obj.get_part_bounds(layer_id=self.layer_id,
+                                                                          unit_entry=unit_entry,
+                                                                          num_rows=unit_rows,
+                                                                          num_cols=num_filt,
+                                                                          window_sz=window_sz,
+                                                                          num_reduction_part=self.num_reduction_part)
+
+            for ifmap_row_start, ifmap_row_end in row_bounds:
+                part_rows = ifmap_row_end - ifmap_row_start
+
+                # Overlapping convolution windows read the same ifmap words
+                part_ifmap_unique_words = min(part_rows * window_sz,
+                                              math.ceil(ifmap_unique_words * part_rows / num_rows))
+
+                for filt_col_start, filt_col_end in col_bounds:
+                    part_cols = filt_col_end - filt_col_start
+
+                    for red_part in range(self.num_reduction_part):
+                        window_col_start = red_part * window_cols_per_part
+                        window_col_end = min(window_col_start + window_cols_per_part, window_sz)
+                        part_window_sz = window_col_end - window_col_start
+
+                        # The matmul units skip the zero blocks of the filter, see SparseSystolicMatMul
+                        kept_window_sz = part_window_sz
+                        filter_dram_scale = 1
+                        if compute_unit == 'matmul' and not layer_sparsity.is_dense():
+                            kept_window_sz = layer_sparsity.get_num_kept_rows(num_rows=part_window_sz,
+                                                                              num_cols=part_cols)
+                            filter_dram_scale = layer_sparsity.get_filter_dram_scale(num_rows=part_window_sz,
+                                                                                     num_cols=part_cols,
+                                                                                     word_bits=filter_word_bits)
+
+                        self.estimate_part_report_items(compute_unit=compute_unit,
+                                                        dataflow=opt_dataflow,
+                                                        part_rows=part_rows,
+                                                        part_cols=part_cols,
+                                                        window_sz=kept_window_sz,
+                                                        ifmap_unique_words=math.ceil(part_ifmap_unique_words *
+                                                                                     kept_window_sz / window_sz),
+                                                        filter_dram_scale=filter_dram_scale)
+                        self.part_ofmap_words_list += [part_rows * part_cols]
+                        self.core_units_list += [compute_unit]
+
+        # The partitions above are the ones of one batch, see SingleLayerSim.expand_batch_groups
+        self.add_reduction_step()
+        self.expand_batch_groups()
+
+        self.compute_done = True
+        self.mem_traces_done = True
+        self.report_metrics_ready = True
+
+    #
+    def run_simd_all_parts(self, operand_matrix=None, optype='relu', operand_dims=(1, 1)):
+        num_rows, num_cols = operand_dims
+        self.ofmap_rows = num_rows
+        self.ofmap_cols = num_cols
+
+        self.num_input_part = 1
+        self.num_filter_part = self.config_obj.get_num_cores()
+        self.num_batch_part = 1
+        self.num_reduction_part = 1
+
+        # Same chunks as SingleLayerSim.run_simd_all_parts
+        chunk_scheme = 'EVEN' if self.config_obj.get_balanced_partitions() else 'CEIL'
+        for operand_row_start, operand_row_end in \
+                PartitionManager.get_chunk_bounds(num_rows=num_rows,
+                                                  num_parts=self.num_input_part * self.num_filter_part,
+                                                  scheme=chunk_scheme):
+            part_rows = operand_row_end - operand_row_start
+            if part_rows < 1:
+                continue
+
+            self.estimate_simd_part_report_items(optype=optype, num_words=part_rows * num_cols)
+            self.core_units_list += ['simd']
+
+        self.expand_batch_groups()
+
+        self.compute_done = True
+        self.mem_traces_done = True
+        self.report_metrics_ready = True
+
+    # The operands stream in from the DRAM and the results are written back in place
+    def estimate_simd_part_report_items(self, optype='relu', num_words=1):
+        cycles_per_element, num_passes, reduction_latency = self.config_obj.get_simd_op_cost(optype)
+
+        simd_unit = simd()
+        simd_unit.set_params(num_units=self.config_obj.get_simd_length(), simd_op=optype,
+                             cycles_per_element=cycles_per_element,
+                             num_passes=num_passes,
+                             reduction_latency=reduction_latency)
+        simd_unit.set_operand_size(op_matrix_size=num_words)
+        simd_unit.calc_simd_unit()
+
+        compute_cycles = simd_unit.get_compute_cycles()
+        num_unit = self.config_obj.get_simd_length()
+
+        # Every pass reads the operands, they come from the DRAM once if they fit in the SRAM
+        ifmap_sram_reads = simd_unit.get_mat1_reads()
+        ifmap_buf_words = self.config_obj.get_per_unit_sram_sizes_words(precisions=self.operand_precisions)[0]
+        ifmap_dram_reads = self.get_dram_accesses(unique_words=num_words,
+                                                  sram_accesses=ifmap_sram_reads,
+                                                  buf_words=ifmap_buf_words)
+
+        stall_cycles = 0
+        if self.config_obj.get_bandwidth_use_mode() == 'USER':
+            ifmap_bw, _, ofmap_bw = self.config_obj.get_interface_bandwidths_words(precisions=self.operand_precisions)
+            dram_cycles = max(math.ceil(ifmap_dram_reads / ifmap_bw), math.ceil(num_words / ofmap_bw))
+            stall_cycles = max(dram_cycles - compute_cycles, 0)
+
+        total_cycles = compute_cycles + stall_cycles
+
+        self.total_cycles_list += [total_cycles]
+        self.stall_cycles_list += [stall_cycles]
+        self.overall_util_list += [(num_words * 100) / (total_cycles * num_unit)]
+        self.mapping_eff_list += [simd_unit.get_avg_mapping_efficiency() * 100]
+        self.compute_util_list += [simd_unit.get_avg_compute_utilization() * 100]
+
+        # BW report
+        self.ifmap_sram_reads_list += [ifmap_sram_reads]
+        self.filter_sram_reads_list += [0]
+        self.ofmap_sram_writes_list += [num_words]
+        self.avg_ifmap_sram_bw_list += [ifmap_sram_reads / total_cycles]
+        self.avg_filter_sram_bw_list += [0]
+        self.avg_ofmap_sram_bw_list += [num_words / total_cycles]
+
+        # Detail report, the first results are written at the end of the first op of the last pass
+        ofmap_start_cycle = min(simd_unit.get_first_write_cycle(), total_cycles - 1)
+
+        self.ifmap_sram_start_cycle_list += [0]
+        self.ifmap_sram_stop_cycle_list += [total_cycles - 1]
+        self.filter_sram_start_cycle_list += [0]
+        self.filter_sram_stop_cycle_list += [0]
+        self.ofmap_sram_start_cycle_list += [ofmap_start_cycle]
+        self.ofmap_sram_stop_cycle_list += [total_cycles - 1]
+
+        self.ifmap_dram_start_cycle_list += [0]
+        self.ifmap_dram_stop_cycle_list += [total_cycles - 1]
+        self.filter_dram_start_cycle_list += [0]
+        self.filter_dram_stop_cycle_list += [0]
+        self.ofmap_dram_start_cycle_list += [ofmap_start_cycle]
+        self.ofmap_dram_stop_cycle_list += [total_cycles - 1]
+
+        self.ifmap_dram_reads_list += [ifmap_dram_reads]
+        self.filter_dram_reads_list += [0]
+        self.ofmap_dram_writes_list += [num_words]
+
+        self.avg_ifmap_dram_bw_list += [ifmap_dram_reads / total_cycles]
+        self.avg_filter_dram_bw_list += [0]
+        self.avg_ofmap_dram_bw_list += [num_words / (total_cycles - ofmap_start_cycle)]
+
+    #
+    def estimate_part_report_items(self, compute_unit='matmul', dataflow='ws',
+                                   part_rows=1, part_cols=1, window_sz=1, ifmap_unique_words=1,
+                                   filter_dram_scale=1):
+        arr_row, arr_col = self.get_compute_unit_dims(compute_unit=compute_unit)
+
+        Sr, Sc, T = self.get_spatio_temporal_dims(dataflow=dataflow, M=part_rows, N=part_cols, K=window_sz)
+        row_folds = math.ceil(Sr / arr_row)
+        col_folds = math.ceil(Sc / arr_col)
+        cycles_per_fold = 2 * arr_row + arr_col + T - 2
+        compute_cycles = max(cycles_per_fold * row_folds * col_folds, 1)
+
+        num_compute = part_rows * part_cols * window_sz
+        num_unit = arr_row * arr_col
+
+        mapping_eff = 0
+        if row_folds * col_folds > 0:
+            mapping_eff = (Sr * Sc) / (row_folds * arr_row * col_folds * arr_col)
+        compute_util = mapping_eff * T / cycles_per_fold
+
+        # SRAM accesses, the streaming operand is read once per fold along the other dimension
+        ifmap_sram_reads, filter_sram_reads, ofmap_sram_writes = \
+            self.get_sram_accesses(dataflow=dataflow, M=part_rows, N=part_cols, K=window_sz,
+                                   row_folds=row_folds, col_folds=col_folds)
+
+        # DRAM accesses, an operand is fetched once if it fits in the SRAM, else once per SRAM read
+        ifmap_buf_words, filter_buf_words, _ = \
+            self.config_obj.get_per_unit_sram_sizes_words(precisions=self.operand_precisions)
+        ifmap_dram_reads = self.get_dram_accesses(unique_words=ifmap_unique_words,
+                                                  sram_accesses=ifmap_sram_reads,
+                                                  buf_words=ifmap_buf_words)
+        filter_dram_reads = self.get_dram_accesses(unique_words=window_sz * part_cols,
+                                                   sram_accesses=filter_sram_reads,
+                                                   buf_words=filter_buf_words)
+        # Sparse weights come from the DRAM compressed, along with their metadata
+        filter_dram_reads = math.ceil(filter_dram_reads * filter_dram_scale)
+        ofmap_dram_writes = ofmap_sram_writes
+
+        # Stalls are only incurred when the user caps the interface bandwidth
+        stall_cycles = 0
+        if self.config_obj.get_bandwidth_use_mode() == 'USER':
+            ifmap_bw, filter_bw, ofmap_bw = \
+                self.config_obj.get_interface_bandwidths_words(precisions=self.operand_precisions)
+            dram_cycles = max(math.ceil(ifmap_dram_reads / ifmap_bw),
+                              math.ceil(filter_dram_reads / filter_bw),
+                              math.ceil(ofmap_dram_writes / ofmap_bw))
+            stall_cycles = max(dram_cycles - compute_cycles, 0)
+
+        total_cycles = compute_cycles + stall_cycles
+
+        self.total_cycles_list += [total_cycles]
+        self.stall_cycles_list += [stall_cycles]
+        self.overall_util_list += [(num_compute * 100) / (total_cycles * num_unit)]
+        self.mapping_eff_list += [mapping_eff * 100]
+        self.compute_util_list += [compute_util * 100]
+
+        # BW report
+        self.ifmap_sram_reads_list += [ifmap_sram_reads]
+        self.filter_sram_reads_list += [filter_sram_reads]
+        self.ofmap_sram_writes_list += [ofmap_sram_writes]
+        self.avg_ifmap_sram_bw_list += [ifmap_sram_reads / total_cycles]
+        self.avg_filter_sram_bw_list += [filter_sram_reads / total_cycles]
+        self.avg_ofmap_sram_bw_list += [ofmap_sram_writes / total_cycles]
+
+        # Detail report, inputs stream for the whole run, outputs start once the array is filled
+        ofmap_start_cycle = min(arr_row + arr_col - 2, total_cycles - 1)
+        if dataflow == 'os':
+            ofmap_start_cycle = min(ofmap_start_cycle + T, total_cycles - 1)
+
+        self.ifmap_sram_start_cycle_list += [0]
+        self.ifmap_sram_stop_cycle_list += [total_cycles - 1]
+        self.filter_sram_start_cycle_list += [0]
+        self.filter_sram_stop_cycle_list += [total_cycles - 1]
+        self.ofmap_sram_start_cycle_list += [ofmap_start_cycle]
+        self.ofmap_sram_stop_cycle_list += [total_cycles - 1]
+
+        self.ifmap_dram_start_cycle_list += [0]
+        self.ifmap_dram_stop_cycle_list += [total_cycles - 1]
+        self.filter_dram_start_cycle_list += [0]
+        self.filter_dram_stop_cycle_list += [total_cycles - 1]
+        self.ofmap_dram_start_cycle_list += [ofmap_start_cycle]
+        self.ofmap_dram_stop_cycle_list += [total_cycles - 1]
+
+        self.ifmap_dram_reads_list += [ifmap_dram_reads]
+        self.filter_dram_reads_list += [filter_dram_reads]
+        self.ofmap_dram_writes_list += [ofmap_dram_writes]
+
+        self.avg_ifmap_dram_bw_list += [ifmap_dram_reads / total_cycles]
+        self.avg_filter_dram_bw_list += [filter_dram_reads / total_cycles]
+        self.avg_ofmap_dram_bw_list += [ofmap_dram_writes / (total_cycles - ofmap_start_cycle)]
+
+    #
+    def get_compute_unit_dims(self, compute_unit='matmul'):
+        # Same array shapes as the ones ComputeNode hands over to scalesim
+        if compute_unit == 'matmul':
+            return self.config_obj.get_matmul_dims()
+        else:
+            return self.config_obj.get_vector_dim(), 1
+
+    #
+    def get_ofmap_operand_dims(self):
+        assert self.compute_done
+        return self.ofmap_rows, self.ofmap_cols
+
+    #
+    @staticmethod
+    def get_spatio_temporal_dims(dataflow='os', M=1, N=1, K=1):
+        assert dataflow in ['os', 'ws', 'is']
+
+        if dataflow == 'os':
+            return M, N, K
+        elif dataflow == 'ws':
+            return K, N, M
+        else:   # dataflow == 'is'
+            return K, M, N
+
+    #
+    @staticmethod
+    def get_sram_accesses(dataflow='os', M=1, N=1, K=1, row_folds=1, col_folds=1):
+        assert dataflow in ['os', 'ws', 'is']
+
+        if dataflow == 'os':
+            ifmap_reads = M * K * col_folds
+            filter_reads = N * K * row_folds
+            ofmap_writes = M * N
+        elif dataflow == 'ws':
+            ifmap_reads = M * K * col_folds
+            filter_reads = N * K
+            ofmap_writes = M * N * row_folds
+        else:   # dataflow == 'is'
+            ifmap_reads = M * K
+            filter_reads = N * K * col_folds
+            ofmap_writes = M * N * row_folds
+
+        return ifmap_reads, filter_reads, ofmap_writes
+
+    #
+    @staticmethod
+    def get_dram_accesses(unique_words=1, sram_accesses=1, buf_words=1):
+        if unique_words <= buf_words:
+            return unique_words
+
+        return max(sram_accesses, unique_words)
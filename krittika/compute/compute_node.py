@@ -6,6 +6,9 @@ from krittika.compute.vector.vector_ws import VectorWS
 from krittika.compute.mat_mul.systolic_mat_mul_os import SystolicMatMulOS
 from krittika.compute.mat_mul.systolic_mat_mul_ws import SystolicMatMulWS
 from krittika.compute.mat_mul.systolic_mat_mul_is import SystolicMatMulIS
+from krittika.compute.mat_mul.sparse_systolic_mat_mul import SparseSystolicMatMulOS
+from krittika.compute.mat_mul.sparse_systolic_mat_mul import SparseSystolicMatMulWS
+from krittika.compute.mat_mul.sparse_systolic_mat_mul import SparseSystolicMatMulIS
 from krittika.compute.simd.simd import simd
 
 
@@ -22,6 +25,7 @@ class ComputeNode:
         # State
         self.dataflow = 'os'
         self.compute_unit = 'matmul'
+        self.sparse = False
 
         # Operand_matrices
         self.ifmap_matrix = np.ones((1, 1))
@@ -37,7 +41,8 @@ class ComputeNode:
     def set_params(self,
                    config=KrittikaConfig(),
                    compute_unit='matmul',
-                   dataflow='ws', optype = 'relu'):
+                   dataflow='ws', optype = 'relu',
+                   sparsity_obj=None, filter_word_bits=8):
 
         assert compute_unit in self.valid_compute_units
         assert dataflow in self.valid_dataflow
@@ -46,15 +51,28 @@ class ComputeNode:
         self.compute_unit = compute_unit
         self.dataflow = dataflow
 
+        # Only the matmul units skip the zero blocks, the vector units stay dense
+        self.sparse = compute_unit == 'matmul' and sparsity_obj is not None and not sparsity_obj.is_dense()
+
         if compute_unit == 'matmul':
             if dataflow == 'os':
                 self.selected_compute_node = SystolicMatMulOS()
+                if self.sparse:
+                    self.selected_compute_node = SparseSystolicMatMulOS()
 
             elif dataflow == 'ws':
                 self.selected_compute_node = SystolicMatMulWS()
+                if self.sparse:
+                    self.selected_compute_node = SparseSystolicMatMulWS()
 
             elif dataflow == 'is':
                 self.selected_compute_node = SystolicMatMulIS()
+                if self.sparse:
+                    self.selected_compute_node = SparseSystolicMatMulIS()
+
+            if self.sparse:
+                self.selected_compute_node.set_sparsity(sparsity_obj=sparsity_obj,
+                                                        filter_word_bits=filter_word_bits)
 
             arr_row, arr_col = self.config_obj.get_matmul_dims()
             bw_mode = self.config_obj.get_bandwidth_use_mode()
@@ -103,7 +121,11 @@ class ComputeNode:
         elif compute_unit == 'simd':
             self.selected_compute_node = simd()
             num_simd_units = self.config_obj.get_simd_length()
-            self.selected_compute_node.set_params(num_units=num_simd_units, simd_op = optype)
+            cycles_per_element, num_passes, reduction_latency = self.config_obj.get_simd_op_cost(optype)
+            self.selected_compute_node.set_params(num_units=num_simd_units, simd_op = optype,
+                                                  cycles_per_element=cycles_per_element,
+                                                  num_passes=num_passes,
+                                                  reduction_latency=reduction_latency)
 
 
         self.params_set = True
@@ -162,7 +184,10 @@ class ComputeNode:
     #
     def get_num_compute(self):
         assert self.operands_valid
-        if self.compute_unit in ['matmul', 'vector']:
+        if self.sparse:
+            # MACs with the nonzero blocks only
+            num_compute = self.selected_compute_node.get_num_compute()
+        elif self.compute_unit in ['matmul', 'vector']:
             num_compute = self.ifmap_matrix.shape[0] * self.ifmap_matrix.shape[1] * self.filter_matrix.shape[1]
         elif self.compute_unit == 'simd':
             num_compute = self.ifmap_matrix.shape[0] * self.ifmap_matrix.shape[1] 
@@ -209,6 +234,14 @@ class ComputeNode:
 
         return self.selected_compute_node.get_mat2_reads()
     
+    # Filter words read from the DRAM for every word the memory system fetches
+    def get_filter_dram_scale(self):
+        assert self.operands_valid
+
+        if self.sparse:
+            return self.selected_compute_node.get_filter_dram_scale()
+        return 1
+
     #
     def get_ofmap_requests(self):
         assert self.operands_valid
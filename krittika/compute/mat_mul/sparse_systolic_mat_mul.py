@@ -0,0 +1,101 @@
+from krittika.layer_sparsity import LayerSparsity
+from krittika.compute.mat_mul.systolic_mat_mul_os import SystolicMatMulOS
+from krittika.compute.mat_mul.systolic_mat_mul_ws import SystolicMatMulWS
+from krittika.compute.mat_mul.systolic_mat_mul_is import SystolicMatMulIS
+from krittika.compute.mat_mul.systolic_mat_mul_os import dummy_matrix
+
+
+class SparseSystolicMatMul:
+    '''
+        Sparsity support shared by the sparse systolic arrays:
+        1. The rows of the filter operand which are skipped, see LayerSparsity, are dropped
+           along with the matching columns of the ifmap operand before the array sees them
+        2. The dense array of the same dataflow runs on the compressed operands, so the
+           demand matrices, cycles and SRAM accesses only cover the nonzero blocks
+        3. The filter DRAM traffic is scaled to the compressed weights and their metadata
+    '''
+    def init_sparsity(self):
+        self.sparsity_obj = LayerSparsity()
+        self.sparsity_obj.set_params(kind='dense')
+        # Width of the filter words, which the metadata is counted in
+        self.filter_word_bits = 8
+
+        # Filter operand shape before the compression
+        self.dense_filter_rows = 1
+        self.dense_filter_cols = 1
+
+    #
+    def set_sparsity(self, sparsity_obj=None, filter_word_bits=8):
+        assert sparsity_obj is not None and sparsity_obj.params_set, 'Invalid sparsity'
+        assert filter_word_bits > 0, 'Invalid word width'
+        self.sparsity_obj = sparsity_obj
+        self.filter_word_bits = filter_word_bits
+
+    #
+    def compress_operands(self, op_inmat1=dummy_matrix, op_inmat2=dummy_matrix):
+        self.dense_filter_rows, self.dense_filter_cols = op_inmat2.shape
+
+        kept_rows = self.sparsity_obj.get_kept_rows(num_rows=self.dense_filter_rows,
+                                                    num_cols=self.dense_filter_cols)
+        return op_inmat1[:, kept_rows], op_inmat2[kept_rows, :]
+
+    #
+    def get_filter_dram_scale(self):
+        assert self.operands_valid, 'Set the operands first'
+        return self.sparsity_obj.get_filter_dram_scale(num_rows=self.dense_filter_rows,
+                                                       num_cols=self.dense_filter_cols,
+                                                       word_bits=self.filter_word_bits)
+
+    #
+    def get_metadata_words(self):
+        assert self.operands_valid, 'Set the operands first'
+        return self.sparsity_obj.get_metadata_words(num_rows=self.dense_filter_rows,
+                                                    num_cols=self.dense_filter_cols,
+                                                    word_bits=self.filter_word_bits)
+
+    #
+    def get_num_compute(self):
+        assert self.operands_valid, 'Set the operands first'
+        return self.inmat1_np.shape[0] * self.inmat1_np.shape[1] * self.inmat2_np.shape[1]
+
+
+class SparseSystolicMatMulOS(SparseSystolicMatMul, SystolicMatMulOS):
+    def __init__(self):
+        super().__init__()
+        self.init_sparsity()
+
+    #
+    def set_operands(self,
+                     op_inmat1=dummy_matrix,
+                     op_inmat2=dummy_matrix,
+                     op_outmat=dummy_matrix):
+        op_inmat1, op_inmat2 = self.compress_operands(op_inmat1=op_inmat1, op_inmat2=op_inmat2)
+        SystolicMatMulOS.set_operands(self, op_inmat1=op_inmat1, op_inmat2=op_inmat2, op_outmat=op_outmat)
+
+
+class SparseSystolicMatMulWS(SparseSystolicMatMul, SystolicMatMulWS):
+    def __init__(self):
+        super().__init__()
+        self.init_sparsity()
+
+    #
+    def set_operands(self,
+                     op_inmat1=dummy_matrix,
+                     op_inmat2=dummy_matrix,
+                     op_outmat=dummy_matrix):
+        op_inmat1, op_inmat2 = self.compress_operands(op_inmat1=op_inmat1, op_inmat2=op_inmat2)
+        SystolicMatMulWS.set_operands(self, op_inmat1=op_inmat1, op_inmat2=op_inmat2, op_outmat=op_outmat)
+
+
+class SparseSystolicMatMulIS(SparseSystolicMatMul, SystolicMatMulIS):
+    def __init__(self):
+        super().__init__()
+        self.init_sparsity()
+
+    #
+    def set_operands(self,
+                     op_inmat1=dummy_matrix,
+                     op_inmat2=dummy_matrix,
+                     op_outmat=dummy_matrix):
+        op_inmat1, op_inmat2 = self.compress_operands(op_inmat1=op_inmat1, op_inmat2=op_inmat2)
+        SystolicMatMulIS.set_operands(self, op_inmat1=op_inmat1, op_inmat2=op_inmat2, op_outmat=op_outmat)
@@ -21,6 +21,9 @@ class ScaledOutComputeUnit:
     def set_params(self, total_nodes=1,
                    grid_rows=1, grid_cols=1,
                    compute_node_op='vector', compute_node_df='os'):
+        assert total_nodes > 0, 'Number of nodes must be greater than 0'
+        assert grid_rows * grid_cols >= total_nodes, 'The grid cannot hold all the nodes'
+
         self.num_compute_nodes = total_nodes
 
         self.grid_rows = grid_rows
@@ -38,6 +41,50 @@ class ScaledOutComputeUnit:
     def create_compute_node_obj_list(self):
         assert self.params_set
 
+        self.compute_node_obj_list = []
         for _ in range(self.num_compute_nodes):
             new_compute_node = ComputeNode()
 
+            self.compute_node_obj_list += [new_compute_node]
+
+    # Nodes are placed on the grid in row major order, unused slots hold -1
+    def update_layout_mat(self):
+        assert self.params_set
+
+        self.layout_mat = np.ones((self.grid_rows, self.grid_cols)) * -1
+        for node_id in range(self.num_compute_nodes):
+            self.layout_mat[node_id // self.grid_cols][node_id % self.grid_cols] = node_id
+
+    #
+    def get_num_compute_nodes(self):
+        assert self.params_set
+        return self.num_compute_nodes
+
+    #
+    def get_grid_dims(self):
+        assert self.params_set
+        return self.grid_rows, self.grid_cols
+
+    #
+    def get_layout_mat(self):
+        assert self.params_set
+        return self.layout_mat
+
+    #
+    def get_node_position(self, node_id=0):
+        assert self.params_set
+        assert 0 <= node_id < self.num_compute_nodes, 'Invalid node id ' + str(node_id)
+
+        return node_id // self.grid_cols, node_id % self.grid_cols
+
+    #
+    def get_node_id(self, row=0, col=0):
+        assert self.params_set
+        assert 0 <= row < self.grid_rows and 0 <= col < self.grid_cols, 'Position out of the grid'
+
+        return int(self.layout_mat[row][col])
+
+    #
+    def get_compute_node(self, node_id=0):
+        assert self.params_set
+        return self.compute_node_obj_list[node_id]
@@ -13,23 +13,45 @@ class simd:
         self.simd_length = 1
         self.config_obj = KrittikaConfig()
         self.topology_obj = None
-        self.simd_op = "RELU"
+        self.simd_op = 'relu'
         self.avg_mapping_efficiency = 0
 
+        # Op cost, see KrittikaConfig.get_simd_op_cost
+        self.cycles_per_op = 1
+        self.num_passes = 1
+        self.reduction_latency = 0
 
         # Operand matrix
         self.op_matrix = dummy_matrix
+        self.op_matrix_size = 0
+
+        # Demand matrices, one row per cycle
+        self.ifmap_demand_matrix = dummy_matrix
+        self.filter_demand_matrix = dummy_matrix
+        self.ofmap_demand_matrix = dummy_matrix
+
+        # Prefetch matrices, operands in the order they are consumed
+        self.ifmap_prefetch_matrix = dummy_matrix
+        self.filter_prefetch_matrix = dummy_matrix
 
         # Flags
         self.params_set = False
         self.operands_valid = False
+        self.demand_matrices_valid = False
 
     #
-    def set_params(self, num_units=1, simd_op = "RELU"):
+    def set_params(self, num_units=1, simd_op='relu', cycles_per_element=1, num_passes=1, reduction_latency=0):
 
         assert num_units > 0, 'Invalid number of units'
+        assert cycles_per_element > 0, 'Cycles per element must be greater than 0'
+        assert num_passes > 0, 'Number of passes must be greater than 0'
+        assert reduction_latency >= 0, 'Reduction latency cannot be negative'
+
         self.simd_length = num_units
         self.simd_op = simd_op
+        self.cycles_per_op = cycles_per_element
+        self.num_passes = num_passes
+        self.reduction_latency = reduction_latency
 
         self.params_set = True
 
@@ -41,21 +63,102 @@ class simd:
         assert op_matrix.shape[0] > 0, 'Input vector cannot be None'
 
         self.op_matrix = op_matrix
+        self.op_matrix_size = op_matrix.shape[0] * op_matrix.shape[1]
+        self.operands_valid = True
+
+    # Used by the analytical mode, where the operand matrix is never materialized
+    def set_operand_size(self, op_matrix_size=1):
+
+        assert self.params_set, 'Params are not set'
+
+        assert op_matrix_size > 0, 'Input vector cannot be None'
+
+        self.op_matrix_size = op_matrix_size
         self.operands_valid = True
     
-    #
+    # Every pass goes over all the operands, the passes before the last one end in a reduction
+    # (e.g. max and sum for softmax) whose result the next pass waits for
     def calc_simd_unit(self):
         assert self.operands_valid, 'Set the operands first'
-        op_matrix_size = self.op_matrix.shape[0] * self.op_matrix.shape[1]
-
-        cycles_per_op = 1
-        if self.simd_op == "RELU":
-            cycles_per_op = 5
+        op_matrix_size = self.op_matrix_size
 
         self.avg_mapping_efficiency = ((op_matrix_size // self.simd_length) * self.simd_length + op_matrix_size \
                                        % self.simd_length) / (math.ceil(op_matrix_size / self.simd_length) * self.simd_length)
-        self.compute_cycles = math.ceil(op_matrix_size / self.simd_length) * cycles_per_op
-        
+        cycles_per_pass = math.ceil(op_matrix_size / self.simd_length) * self.cycles_per_op
+        self.compute_cycles = self.num_passes * cycles_per_pass + (self.num_passes - 1) * self.reduction_latency
+
+    # Each op reads simd_length operands in its first cycle. Every pass reads all the operands,
+    # the last one writes the results back in place in the last cycle of each op.
+    # There is no filter operand
+    def create_all_operand_demand_matrix(self):
+        assert self.operands_valid, 'Set the operands first'
+        assert self.op_matrix is not dummy_matrix, 'Demand matrices need the operand matrix'
+
+        num_ops = math.ceil(self.op_matrix_size / self.simd_length)
+        op_addrs = np.ones(num_ops * self.simd_length) * -1
+        op_addrs[:self.op_matrix_size] = self.op_matrix.reshape(-1)
+        op_addrs = op_addrs.reshape((num_ops, self.simd_length))
+
+        cycles_per_pass = num_ops * self.cycles_per_op
+        pass_stride = cycles_per_pass + self.reduction_latency
+        num_cycles = self.num_passes * cycles_per_pass + (self.num_passes - 1) * self.reduction_latency
+
+        self.ifmap_demand_matrix = np.ones((num_cycles, self.simd_length)) * -1
+        for pass_id in range(self.num_passes):
+            pass_start = pass_id * pass_stride
+            self.ifmap_demand_matrix[pass_start:pass_start + cycles_per_pass:self.cycles_per_op] = op_addrs
+
+        last_pass_start = (self.num_passes - 1) * pass_stride
+        self.ofmap_demand_matrix = np.ones((num_cycles, self.simd_length)) * -1
+        self.ofmap_demand_matrix[last_pass_start + self.cycles_per_op - 1::self.cycles_per_op] = op_addrs
+        self.filter_demand_matrix = np.ones((num_cycles, 1)) * -1
+
+        self.ifmap_prefetch_matrix = op_addrs
+        self.filter_prefetch_matrix = np.ones((1, 1)) * -1
+
+        self.demand_matrices_valid = True
+
+    #
+    def get_demand_matrices(self):
+        assert self.demand_matrices_valid, 'Create the demand matrices first'
+        return self.ifmap_demand_matrix, self.filter_demand_matrix, self.ofmap_demand_matrix
+
+    #
+    def get_fetch_matrices(self):
+        assert self.demand_matrices_valid, 'Create the demand matrices first'
+        return self.ifmap_prefetch_matrix, self.filter_prefetch_matrix
+
+    #
+    def get_mat1_reads(self):
+        assert self.operands_valid, 'Set the operands first'
+        return self.op_matrix_size * self.num_passes
+
+    #
+    def get_mat2_reads(self):
+        assert self.operands_valid, 'Set the operands first'
+        return 0
+
+    #
+    def get_outmat_writes(self):
+        assert self.operands_valid, 'Set the operands first'
+        return self.op_matrix_size
+
+    #
+    def get_cycles_per_op(self):
+        assert self.operands_valid, 'Set the operands first'
+        return self.cycles_per_op
+
+    # Cycle of the first result, written at the end of the first op of the last pass
+    def get_first_write_cycle(self):
+        assert self.operands_valid, 'Set the operands first'
+        cycles_per_pass = math.ceil(self.op_matrix_size / self.simd_length) * self.cycles_per_op
+        return (self.num_passes - 1) * (cycles_per_pass + self.reduction_latency) + self.cycles_per_op - 1
+
+    #
+    def get_num_passes(self):
+        assert self.params_set, 'Params are not set'
+        return self.num_passes
+
     #
     def get_avg_mapping_efficiency(self):
         assert self.operands_valid, 'Set the operands first'
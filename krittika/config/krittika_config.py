@@ -1,15 +1,45 @@
+import math
 from configparser import ConfigParser
 
 
 class KrittikaConfig:
+    # Bytes per word of the supported operand precisions. The SRAM sizes and the interface
+    # bandwidths are given in bytes, i.e. in words of the default int8 precision
+    precision_bytes = {'int4': 0.5, 'int8': 1, 'fp16': 2, 'bf16': 2, 'fp32': 4}
+
     def __init__(self):
 
         self.run_name = 'default_run_name'
 
+        # Number of worker processes used to simulate the partitions of a layer
+        self.num_workers = 1
+        # Number of worker processes used to simulate independent layers
+        self.num_layer_workers = 1
+        # Reuse the results of identically shaped partitions within a layer
+        self.partition_cache_enabled = False
+        # Persistent cache of layer results, stored under the reports directory
+        self.result_cache_enabled = True
+        self.result_cache_size_mb = 1024
+        # Write the traces in chunks while the memory requests are serviced
+        self.stream_traces = False
+        self.trace_chunk_lines = 10000
+        # Supported trace formats: csv, npy, npz
+        self.trace_format = 'csv'
+        # Keep the ofmap of a layer on chip for the next layer when the partitions line up
+        self.layer_fusion = False
+        # Run the activation layers on the SIMD units while the producer writes its ofmap
+        self.fuse_activations = False
+
         #
         self.num_compute_cores = 1
+        # Clock of the cores, turns the cycles into time in the network summary
+        self.clock_mhz = 1000
         self.matmul_present = True
         self.vector_present = True
+        # Heterogeneous chips split the cores between the unit types, the first ones have a matmul unit
+        # and the others a vector unit. With 0 cores of each type every core has the units present
+        self.num_matmul_cores = 0
+        self.num_vector_cores = 0
 
         self.matmul_arr_row = 1
         self.matmul_arr_col = 1
@@ -19,14 +49,25 @@ class KrittikaConfig:
         self.vector_default_dataflow = 'ws'
 
         self.simd_length = 1
+        # Cost of each activation on the SIMD unit:
+        # [cycles per element, passes over the operands, reduction latency between passes, use the lookup table]
+        # Ops on the lookup table take simd_lut_cycles per element instead
+        self.simd_op_costs = {'relu': [5, 1, 0, False],
+                              'batch_norm': [2, 1, 0, False],
+                              'tanh': [8, 1, 0, False],
+                              'softmax': [4, 3, 8, False]}
+        self.simd_lut_cycles = 1
 
         self.default_ifmap_offset = 0
         self.default_filter_offset = 10 ** 7
         self.default_ofmap_offset = 2 * 10 ** 7
 
         # Supported partition modes:
-        # USER, IFMAP, FILTER, AUTO (Best effort first filter, then inputs)
+        # USER, IFMAP, FILTER, AUTO (Best effort first filter, then inputs),
+        # MEM_AWARE (AUTO with SRAM capacity and interface bandwidth in the cost)
         self.partition_mode = 'AUTO'
+        # Size the chunks of the partitions for the slowest core instead of cutting ceil(dim / parts) chunks
+        self.balanced_partitions = False
 
         self.per_unit_ifmap_sram_size_kb = 1
         self.per_unit_filter_sram_size_kb = 1
@@ -39,6 +80,36 @@ class KrittikaConfig:
         self.per_unit_user_filter_interface_bw = 1
         self.per_unit_user_ofmap_interface_bw = 1
 
+        # Word width of each operand, a layer in the topology can override them
+        self.ifmap_precision = 'int8'
+        self.filter_precision = 'int8'
+        self.ofmap_precision = 'int8'
+
+        # Supported interconnect topologies: 'none', 'mesh', 'ring', 'crossbar'
+        # A grid dimension of 0 picks the most square grid holding all the cores
+        self.interconnect_topology = 'none'
+        self.interconnect_grid_rows = 0
+        self.interconnect_grid_cols = 0
+        self.interconnect_link_bw = 1
+        self.interconnect_link_latency = 1
+
+        # Buffer shared by all the cores in front of the DRAM, a size of 0 leaves it out
+        self.shared_buffer_size_kb = 0
+        self.shared_buffer_bank_bw = 1
+        self.shared_buffer_num_banks = 1
+
+        # Total DRAM bandwidth shared by the cores, 0 leaves the per core interfaces independent
+        # Supported arbitration policies: 'ROUND_ROBIN', 'PROPORTIONAL', 'PRIORITY'
+        self.dram_total_bw = 0
+        self.dram_arbitration = 'ROUND_ROBIN'
+
+        # Inferences pipelined over groups of cores, a single stage runs every layer on all the cores
+        # Empty lists split the cores evenly among the stages and search the first layer of every stage
+        self.pipeline_num_stages = 1
+        self.pipeline_num_inferences = 1
+        self.pipeline_stage_cores = []
+        self.pipeline_stage_first_layers = []
+
         # Flags
         self.config_valid = False
 
@@ -52,9 +123,59 @@ class KrittikaConfig:
         cfg = ConfigParser()
         cfg.read(filename)
 
+        self.read_config(cfg)
+
+    # Parses an already loaded ConfigParser, used by the sweeps to apply overrides in memory
+    def read_config(self, cfg):
+
         section = 'GENERAL'
         self.run_name = cfg.get(section, 'Run Name')
 
+        if cfg.has_option(section, 'Num Workers'):
+            num_workers = int(cfg.get(section, 'Num Workers'))
+            assert num_workers > 0, 'Number of workers must be greater than 0'
+            self.num_workers = num_workers
+
+        if cfg.has_option(section, 'Num Layer Workers'):
+            num_layer_workers = int(cfg.get(section, 'Num Layer Workers'))
+            assert num_layer_workers > 0, 'Number of layer workers must be greater than 0'
+            self.num_layer_workers = num_layer_workers
+
+        if cfg.has_option(section, 'Partition Cache'):
+            partition_cache_str = cfg.get(section, 'Partition Cache')
+            self.partition_cache_enabled = partition_cache_str in ['true', 'True', 'TRUE']
+
+        if cfg.has_option(section, 'Result Cache'):
+            result_cache_str = cfg.get(section, 'Result Cache')
+            self.result_cache_enabled = result_cache_str in ['true', 'True', 'TRUE']
+
+        if cfg.has_option(section, 'Result Cache Size MB'):
+            result_cache_size_mb = int(cfg.get(section, 'Result Cache Size MB'))
+            assert result_cache_size_mb > 0, 'Cache size must be greater than 0'
+            self.result_cache_size_mb = result_cache_size_mb
+
+        if cfg.has_option(section, 'Stream Traces'):
+            stream_traces_str = cfg.get(section, 'Stream Traces')
+            self.stream_traces = stream_traces_str in ['true', 'True', 'TRUE']
+
+        if cfg.has_option(section, 'Trace Chunk Lines'):
+            trace_chunk_lines = int(cfg.get(section, 'Trace Chunk Lines'))
+            assert trace_chunk_lines > 0, 'Chunk size must be greater than 0'
+            self.trace_chunk_lines = trace_chunk_lines
+
+        if cfg.has_option(section, 'Trace Format'):
+            trace_format = cfg.get(section, 'Trace Format').lower()
+            assert trace_format in ['csv', 'npy', 'npz'], 'Invalid trace format: ' + trace_format
+            self.trace_format = trace_format
+
+        if cfg.has_option(section, 'Layer Fusion'):
+            layer_fusion_str = cfg.get(section, 'Layer Fusion')
+            self.layer_fusion = layer_fusion_str in ['true', 'True', 'TRUE']
+
+        if cfg.has_option(section, 'Fuse Activations'):
+            fuse_activations_str = cfg.get(section, 'Fuse Activations')
+            self.fuse_activations = fuse_activations_str in ['true', 'True', 'TRUE']
+
         section = 'COMPUTE'
         self.num_compute_cores = int(cfg.get(section, 'Num Compute Cores'))
 
@@ -84,15 +205,57 @@ class KrittikaConfig:
         else:
             self.vector_present = False
 
+        if cfg.has_option(section, 'Num MatMul Cores') or cfg.has_option(section, 'Num Vector Cores'):
+            num_matmul_cores = int(cfg.get(section, 'Num MatMul Cores'))
+            num_vector_cores = int(cfg.get(section, 'Num Vector Cores'))
+            assert self.matmul_present and self.vector_present, \
+                'Heterogeneous cores need both the matmul and the vector units'
+            assert num_matmul_cores > 0 and num_vector_cores > 0, 'Number of cores of each unit must be greater than 0'
+            assert num_matmul_cores + num_vector_cores == self.num_compute_cores, \
+                'Matmul and vector cores must add up to the compute cores'
+            self.num_matmul_cores = num_matmul_cores
+            self.num_vector_cores = num_vector_cores
+
+        if cfg.has_option(section, 'Clock MHz'):
+            clock_mhz = float(cfg.get(section, 'Clock MHz'))
+            assert clock_mhz > 0, 'Clock must be greater than 0'
+            self.clock_mhz = clock_mhz
+
         simd_length = int(cfg.get(section, 'simd length'))
         assert simd_length > 0, 'SIMD length must be greater than 0'
         self.simd_length = simd_length
 
         part_strategy = cfg.get(section, 'Partition Strategy')
-        assert part_strategy in ['USER', 'IFMAP', 'FILTER', 'CONST_DF', 'AUTO'], \
-            'Invalid partition mode ' + part_strategy + '. Supported vals: [USER, AUTO, IFMAP, FILTER, CONST_DF]'
+        assert part_strategy in ['USER', 'IFMAP', 'FILTER', 'CONST_DF', 'AUTO', 'MEM_AWARE'], \
+            'Invalid partition mode ' + part_strategy + '. Supported vals: [USER, AUTO, IFMAP, FILTER, CONST_DF, MEM_AWARE]'
         self.partition_mode = part_strategy
 
+        if cfg.has_option(section, 'Balanced Partitions'):
+            balanced_partitions_str = cfg.get(section, 'Balanced Partitions')
+            self.balanced_partitions = balanced_partitions_str in ['true', 'True', 'TRUE']
+
+        section = 'SIMD'
+        if cfg.has_section(section):
+            for op_name in self.simd_op_costs.keys():
+                op_cost = self.simd_op_costs[op_name]
+                if cfg.has_option(section, op_name + ' Cycles Per Element'):
+                    op_cost[0] = int(cfg.get(section, op_name + ' Cycles Per Element'))
+                if cfg.has_option(section, op_name + ' Passes'):
+                    op_cost[1] = int(cfg.get(section, op_name + ' Passes'))
+                if cfg.has_option(section, op_name + ' Reduction Latency'):
+                    op_cost[2] = int(cfg.get(section, op_name + ' Reduction Latency'))
+                if cfg.has_option(section, op_name + ' Lookup Table'):
+                    op_cost[3] = cfg.get(section, op_name + ' Lookup Table') in ['true', 'True', 'TRUE']
+
+                assert op_cost[0] > 0, 'Invalid cycles per element for ' + op_name
+                assert op_cost[1] > 0, 'Invalid number of passes for ' + op_name
+                assert op_cost[2] >= 0, 'Invalid reduction latency for ' + op_name
+
+            if cfg.has_option(section, 'Lookup Table Cycles Per Element'):
+                lut_cycles = int(cfg.get(section, 'Lookup Table Cycles Per Element'))
+                assert lut_cycles > 0, 'Invalid lookup table cycles'
+                self.simd_lut_cycles = lut_cycles
+
         section = 'MEMORY'
         ifmap_offset = int(cfg.get(section, 'IFMAP Offset'))
         filter_offset = int(cfg.get(section, 'FILTER Offset'))
@@ -114,6 +277,10 @@ class KrittikaConfig:
         assert filter_sram_sz > 0, 'Invalid SRAM size'
         assert ofmap_sram_sz > 0, 'Invalid SRAM size'
 
+        self.per_unit_ifmap_sram_size_kb = ifmap_sram_sz
+        self.per_unit_filter_sram_size_kb = filter_sram_sz
+        self.per_unit_ofmap_sram_size_kb = ofmap_sram_sz
+
         section = 'INTERFACE'
         bw_mode = cfg.get(section, 'Bandwidth Mode')
         assert bw_mode in ['USER', 'CALC'], 'Invalid mode of operation: ' + bw_mode + '. Valid modes are [USER, CALC]'
@@ -131,6 +298,87 @@ class KrittikaConfig:
         self.per_unit_user_filter_interface_bw = filter_bw
         self.per_unit_user_ofmap_interface_bw = ofmap_bw
 
+        section = 'PRECISION'
+        if cfg.has_section(section):
+            precisions = []
+            for operand in ['IFMAP', 'FILTER', 'OFMAP']:
+                precision = cfg.get(section, operand).strip().lower()
+                assert precision in self.precision_bytes, 'Invalid precision: ' + precision + \
+                    '. Supported vals: ' + str(list(self.precision_bytes.keys()))
+                precisions += [precision]
+            self.ifmap_precision, self.filter_precision, self.ofmap_precision = precisions
+
+        section = 'INTERCONNECT'
+        if cfg.has_section(section):
+            topology = cfg.get(section, 'Topology').lower()
+            assert topology in ['none', 'mesh', 'ring', 'crossbar'], 'Invalid interconnect topology: ' + topology
+            self.interconnect_topology = topology
+
+            if cfg.has_option(section, 'Grid Rows'):
+                self.interconnect_grid_rows = int(cfg.get(section, 'Grid Rows'))
+            if cfg.has_option(section, 'Grid Cols'):
+                self.interconnect_grid_cols = int(cfg.get(section, 'Grid Cols'))
+            assert self.interconnect_grid_rows >= 0 and self.interconnect_grid_cols >= 0, 'Invalid grid dimensions'
+
+            link_bw = int(cfg.get(section, 'Link BW (Words/Cycle)'))
+            link_latency = int(cfg.get(section, 'Link Latency (Cycles)'))
+            assert link_bw > 0, 'Invalid BW value'
+            assert link_latency >= 0, 'Invalid latency value'
+            self.interconnect_link_bw = link_bw
+            self.interconnect_link_latency = link_latency
+
+        section = 'SHARED BUFFER'
+        if cfg.has_section(section):
+            size_kb = int(cfg.get(section, 'Size KB'))
+            bank_bw = int(cfg.get(section, 'Bank BW (Words/Cycle)'))
+            num_banks = int(cfg.get(section, 'Num Banks'))
+            assert size_kb >= 0, 'Invalid SRAM size'
+            assert bank_bw > 0, 'Invalid BW value'
+            assert num_banks > 0, 'Number of banks must be greater than 0'
+            self.shared_buffer_size_kb = size_kb
+            self.shared_buffer_bank_bw = bank_bw
+            self.shared_buffer_num_banks = num_banks
+
+        section = 'DRAM'
+        if cfg.has_section(section):
+            total_bw = int(cfg.get(section, 'Total BW (Words/Cycle)'))
+            assert total_bw >= 0, 'Invalid BW value'
+            self.dram_total_bw = total_bw
+
+            if cfg.has_option(section, 'Arbitration'):
+                arbitration = cfg.get(section, 'Arbitration')
+                assert arbitration in ['ROUND_ROBIN', 'PROPORTIONAL', 'PRIORITY'], \
+                    'Invalid arbitration policy: ' + arbitration + '. Valid policies are [ROUND_ROBIN, PROPORTIONAL, PRIORITY]'
+                self.dram_arbitration = arbitration
+
+        section = 'PIPELINE'
+        if cfg.has_section(section):
+            num_stages = int(cfg.get(section, 'Num Stages'))
+            assert 0 < num_stages <= self.num_compute_cores, 'Number of stages must be in (0, compute cores]'
+            self.pipeline_num_stages = num_stages
+
+            if cfg.has_option(section, 'Num Inferences'):
+                num_inferences = int(cfg.get(section, 'Num Inferences'))
+                assert num_inferences > 0, 'Number of inferences must be greater than 0'
+                self.pipeline_num_inferences = num_inferences
+
+            if cfg.has_option(section, 'Stage Cores'):
+                stage_cores = [int(x) for x in cfg.get(section, 'Stage Cores').split(',') if x.strip() != '']
+                assert len(stage_cores) == num_stages, 'Stage cores must list the cores of every stage'
+                assert min(stage_cores) > 0, 'Every stage needs a core'
+                assert sum(stage_cores) <= self.num_compute_cores, 'Stages cannot use more than the compute cores'
+                self.pipeline_stage_cores = stage_cores
+
+            if cfg.has_option(section, 'Stage First Layers'):
+                stage_first_layers = [int(x) for x in cfg.get(section, 'Stage First Layers').split(',')
+                                      if x.strip() != '']
+                assert len(stage_first_layers) == num_stages, 'Stage first layers must list every stage'
+                self.pipeline_stage_first_layers = stage_first_layers
+
+            if num_stages > 1:
+                assert self.num_matmul_cores == 0, 'Pipelined runs need a homogeneous chip'
+                assert self.partition_mode != 'USER', 'Pipelined runs need a searched partition strategy'
+
         self.config_valid = True
 
     # ------ SET METHODS ------
@@ -158,7 +406,7 @@ class KrittikaConfig:
         assert ifmap_offset >= 0, 'Offsets should be non negative integers'
         assert filter_offset >= 0, 'Offsets should be non negative integers'
         assert ofmap_offset >= 0, 'Offsets should be non negative integers'
-        assert partition_mode in ['USER', 'AUTO', 'IFMAP', 'FILTER', 'CONST_DF'], 'Invalid partition mode provided'
+        assert partition_mode in ['USER', 'AUTO', 'IFMAP', 'FILTER', 'CONST_DF', 'MEM_AWARE'], 'Invalid partition mode provided'
         assert ifmap_sram_kb > 0, 'SRAM sizes should be a positive integer'
         assert filter_sram_kb > 0, 'SRAM sizes should be a positive integer'
         assert ofmap_sram_kb > 0, 'SRAM sizes should be a positive integer'
@@ -191,6 +439,61 @@ class KrittikaConfig:
 
         self.run_name = input_run_name
 
+    #
+    def set_num_workers(self, num_workers=1):
+        assert self.config_valid
+        assert num_workers > 0, 'Number of workers must be greater than 0'
+
+        self.num_workers = num_workers
+
+    #
+    def set_num_layer_workers(self, num_layer_workers=1):
+        assert self.config_valid
+        assert num_layer_workers > 0, 'Number of layer workers must be greater than 0'
+
+        self.num_layer_workers = num_layer_workers
+
+    #
+    def set_partition_cache_enabled(self, enabled=False):
+        assert self.config_valid
+
+        self.partition_cache_enabled = enabled
+
+    #
+    def set_result_cache_params(self, enabled=True, size_mb=1024):
+        assert self.config_valid
+        assert size_mb > 0, 'Cache size must be greater than 0'
+
+        self.result_cache_enabled = enabled
+        self.result_cache_size_mb = size_mb
+
+    #
+    def set_trace_stream_params(self, enabled=False, chunk_lines=10000):
+        assert self.config_valid
+        assert chunk_lines > 0, 'Chunk size must be greater than 0'
+
+        self.stream_traces = enabled
+        self.trace_chunk_lines = chunk_lines
+
+    #
+    def set_trace_format(self, trace_format='csv'):
+        assert self.config_valid
+        assert trace_format in ['csv', 'npy', 'npz'], 'Invalid trace format: ' + str(trace_format)
+
+        self.trace_format = trace_format
+
+    #
+    def set_layer_fusion(self, enabled=False):
+        assert self.config_valid
+
+        self.layer_fusion = enabled
+
+    #
+    def set_fuse_activations(self, enabled=False):
+        assert self.config_valid
+
+        self.fuse_activations = enabled
+
     #
     def set_compute_unit_valids(self, matmul_valid=True, vector_valid=True):
         assert self.config_valid
@@ -198,6 +501,21 @@ class KrittikaConfig:
         self.matmul_present = matmul_valid
         self.vector_present = vector_valid
 
+    # 0 cores of each type makes every core homogeneous again
+    def set_unit_core_counts(self, num_matmul_cores=0, num_vector_cores=0):
+        assert self.config_valid
+        assert num_matmul_cores >= 0 and num_vector_cores >= 0, 'Number of cores cannot be negative'
+
+        if num_matmul_cores > 0 or num_vector_cores > 0:
+            assert self.matmul_present and self.vector_present, \
+                'Heterogeneous cores need both the matmul and the vector units'
+            assert num_matmul_cores > 0 and num_vector_cores > 0, 'Number of cores of each unit must be greater than 0'
+            assert num_matmul_cores + num_vector_cores == self.num_compute_cores, \
+                'Matmul and vector cores must add up to the compute cores'
+
+        self.num_matmul_cores = num_matmul_cores
+        self.num_vector_cores = num_vector_cores
+
     #
     def set_matmul_dims(self, arr_row=1, arr_col=1):
         assert self.config_valid and self.matmul_present
@@ -234,6 +552,22 @@ class KrittikaConfig:
         self.simd_length = simd_length
 
 
+    #
+    def set_simd_op_cost(self, op_name='relu', cycles_per_element=1, num_passes=1, reduction_latency=0,
+                         use_lut=False):
+        assert op_name in self.simd_op_costs, 'Unsupported activation: ' + str(op_name)
+        assert cycles_per_element > 0, 'Cycles per element must be greater than 0'
+        assert num_passes > 0, 'Number of passes must be greater than 0'
+        assert reduction_latency >= 0, 'Reduction latency cannot be negative'
+
+        self.simd_op_costs[op_name] = [cycles_per_element, num_passes, reduction_latency, use_lut]
+
+    #
+    def set_simd_lut_cycles(self, lut_cycles=1):
+        assert lut_cycles > 0, 'Lookup table cycles must be greater than 0'
+
+        self.simd_lut_cycles = lut_cycles
+
     #
     def set_operand_offsets(self, ifmap_offset=0, filter_offset=10 ** 7, ofmap_offset=2 * 10 ** 7):
         assert self.config_valid
@@ -248,10 +582,23 @@ class KrittikaConfig:
     #
     def set_partition_mode(self, part_mode = ''):
         assert self.config_valid
-        assert part_mode in ['USER', 'AUTO', 'IFMAP', 'FILTER', 'CONST_DF'], 'Invalid partition mode provided'
+        assert part_mode in ['USER', 'AUTO', 'IFMAP', 'FILTER', 'CONST_DF', 'MEM_AWARE'], 'Invalid partition mode provided'
 
         self.partition_mode = part_mode
 
+    #
+    def set_clock_mhz(self, clock_mhz=1000):
+        assert self.config_valid
+        assert clock_mhz > 0, 'Clock must be greater than 0'
+
+        self.clock_mhz = clock_mhz
+
+    #
+    def set_balanced_partitions(self, enabled=False):
+        assert self.config_valid
+
+        self.balanced_partitions = enabled
+
     #
     def set_per_unit_sram_sizes_kb(self, ifmap_sram_kb=0, filter_sram_kb=0, ofmap_sram_kb=0):
         assert self.config_valid
@@ -281,12 +628,126 @@ class KrittikaConfig:
         self.per_unit_user_filter_interface_bw = per_core_filter_bw
         self.per_unit_user_ofmap_interface_bw = per_core_ofmap_bw
 
+    #
+    def set_operand_precisions(self, ifmap_precision='int8', filter_precision='int8', ofmap_precision='int8'):
+        assert self.config_valid
+        for precision in [ifmap_precision, filter_precision, ofmap_precision]:
+            assert precision in self.precision_bytes, 'Invalid precision: ' + str(precision)
+
+        self.ifmap_precision = ifmap_precision
+        self.filter_precision = filter_precision
+        self.ofmap_precision = ofmap_precision
+
+    #
+    def set_interconnect_params(self, topology='none', grid_rows=0, grid_cols=0, link_bw=1, link_latency=1):
+        assert self.config_valid
+        assert topology in ['none', 'mesh', 'ring', 'crossbar'], 'Invalid interconnect topology: ' + str(topology)
+        assert grid_rows >= 0 and grid_cols >= 0, 'Invalid grid dimensions'
+        assert link_bw > 0, 'Bandwidth should be positive integer'
+        assert link_latency >= 0, 'Latency should be a non negative integer'
+
+        self.interconnect_topology = topology
+        self.interconnect_grid_rows = grid_rows
+        self.interconnect_grid_cols = grid_cols
+        self.interconnect_link_bw = link_bw
+        self.interconnect_link_latency = link_latency
+
+    #
+    def set_shared_buffer_params(self, size_kb=0, bank_bw=1, num_banks=1):
+        assert self.config_valid
+        assert size_kb >= 0, 'SRAM sizes should be a non negative integer'
+        assert bank_bw > 0, 'Bandwidth should be positive integer'
+        assert num_banks > 0, 'Number of banks must be greater than 0'
+
+        self.shared_buffer_size_kb = size_kb
+        self.shared_buffer_bank_bw = bank_bw
+        self.shared_buffer_num_banks = num_banks
+
+    #
+    def set_dram_params(self, total_bw=0, arbitration='ROUND_ROBIN'):
+        assert self.config_valid
+        assert total_bw >= 0, 'Bandwidth should be a non negative integer'
+        assert arbitration in ['ROUND_ROBIN', 'PROPORTIONAL', 'PRIORITY'], 'Invalid arbitration policy provided'
+
+        self.dram_total_bw = total_bw
+        self.dram_arbitration = arbitration
+
+    #
+    def set_pipeline_params(self, num_stages=1, num_inferences=1, stage_cores=None, stage_first_layers=None):
+        assert self.config_valid
+        assert 0 < num_stages <= self.num_compute_cores, 'Number of stages must be in (0, compute cores]'
+        assert num_inferences > 0, 'Number of inferences must be greater than 0'
+
+        if stage_cores is None:
+            stage_cores = []
+        if stage_first_layers is None:
+            stage_first_layers = []
+        assert len(stage_cores) in [0, num_stages], 'Stage cores must list the cores of every stage'
+        assert len(stage_first_layers) in [0, num_stages], 'Stage first layers must list every stage'
+        assert sum(stage_cores) <= self.num_compute_cores, 'Stages cannot use more than the compute cores'
+
+        self.pipeline_num_stages = num_stages
+        self.pipeline_num_inferences = num_inferences
+        self.pipeline_stage_cores = list(stage_cores)
+        self.pipeline_stage_first_layers = list(stage_first_layers)
+
+    # The cores of a stage group form a chip of their own, on their own most square interconnect grid
+    def set_num_cores(self, num_cores=1):
+        assert self.config_valid
+        assert num_cores > 0, 'Number of cores must be greater than 0'
+        assert not self.is_heterogeneous(), 'The cores of a heterogeneous chip are set per unit type'
+        assert self.pipeline_num_stages <= num_cores, 'Fewer cores than pipeline stages'
+
+        self.num_compute_cores = num_cores
+        self.interconnect_grid_rows = 0
+        self.interconnect_grid_cols = 0
+
     # ------ GET METHODS ------
     #
     def get_run_name(self):
         assert self.config_valid
         return self.run_name
 
+    #
+    def get_num_workers(self):
+        assert self.config_valid
+        return self.num_workers
+
+    #
+    def get_num_layer_workers(self):
+        assert self.config_valid
+        return self.num_layer_workers
+
+    #
+    def get_partition_cache_enabled(self):
+        assert self.config_valid
+        return self.partition_cache_enabled
+
+    #
+    def get_result_cache_params(self):
+        assert self.config_valid
+        return self.result_cache_enabled, self.result_cache_size_mb
+
+    #
+    def get_trace_stream_params(self):
+        assert self.config_valid
+        return self.stream_traces, self.trace_chunk_lines
+
+    #
+    def get_trace_format(self):
+        assert self.config_valid
+        return self.trace_format
+
+    #
+    def get_layer_fusion(self):
+        assert self.config_valid
+        return self.layer_fusion
+
+    #
+    def get_fuse_activations(self):
+        assert self.config_valid
+        return self.fuse_activations
+
     #
     def get_compute_unit_valids(self):
         assert self.config_valid
@@ -296,6 +757,41 @@ class KrittikaConfig:
         assert self.config_valid
         return self.num_compute_cores
 
+    #
+    def get_clock_mhz(self):
+        assert self.config_valid
+        return self.clock_mhz
+
+    # MACs per cycle of the whole chip. A core of a homogeneous chip runs a layer on one of its units
+    def get_peak_macs(self):
+        assert self.config_valid
+        if self.is_heterogeneous():
+            return sum(self.get_unit_peak_macs())
+
+        core_macs = 0
+        if self.matmul_present:
+            core_macs = self.matmul_arr_row * self.matmul_arr_col
+        if self.vector_present:
+            core_macs = max(core_macs, self.vector_dim)
+        return self.num_compute_cores * core_macs
+
+    #
+    def is_heterogeneous(self):
+        assert self.config_valid
+        return self.num_matmul_cores > 0 and self.num_vector_cores > 0
+
+    #
+    def get_unit_core_counts(self):
+        assert self.config_valid
+        return self.num_matmul_cores, self.num_vector_cores
+
+    # MACs per cycle of all the matmul cores and of all the vector cores of a heterogeneous chip
+    def get_unit_peak_macs(self):
+        assert self.config_valid and self.is_heterogeneous()
+        matmul_macs = self.num_matmul_cores * self.matmul_arr_row * self.matmul_arr_col
+        vector_macs = self.num_vector_cores * self.vector_dim
+        return matmul_macs, vector_macs
+
     #
     def get_matmul_dims(self):
         assert self.config_valid and self.matmul_present
@@ -321,6 +817,17 @@ class KrittikaConfig:
         assert self.config_valid
         return self.simd_length
 
+    # Cycles per element, passes and reduction latency of an activation, with the lookup table applied
+    def get_simd_op_cost(self, op_name='relu'):
+        assert self.config_valid
+        assert op_name in self.simd_op_costs, 'Unsupported activation: ' + str(op_name)
+
+        cycles_per_element, num_passes, reduction_latency, use_lut = self.simd_op_costs[op_name]
+        if use_lut:
+            cycles_per_element = self.simd_lut_cycles
+
+        return cycles_per_element, num_passes, reduction_latency
+
     #
     def get_operand_offsets(self):
         assert self.config_valid
@@ -331,6 +838,11 @@ class KrittikaConfig:
         assert self.config_valid
         return self.partition_mode
 
+    #
+    def get_balanced_partitions(self):
+        assert self.config_valid
+        return self.balanced_partitions
+
     #
     def is_autopartition(self):
         return self.partition_mode != 'USER'
@@ -342,6 +854,17 @@ class KrittikaConfig:
                 self.per_unit_filter_sram_size_kb, \
                 self.per_unit_ofmap_sram_size_kb
 
+    # SRAM capacities in words of the operand precisions
+    def get_per_unit_sram_sizes_words(self, precisions=None):
+        assert self.config_valid
+        precisions = self.get_operand_precisions(layer_precisions=precisions)
+
+        sram_sizes_words = []
+        for size_kb, precision in zip(self.get_per_unit_sram_sizes_kb(), precisions):
+            sram_sizes_words += [int(size_kb * 1024 / self.get_precision_bytes(precision))]
+
+        return sram_sizes_words
+
     #
     def get_bandwidth_use_mode(self):
         assert self.config_valid
@@ -354,6 +877,100 @@ class KrittikaConfig:
                self.per_unit_user_filter_interface_bw, \
                self.per_unit_user_ofmap_interface_bw
 
+    # Interface bandwidths in words of the operand precisions, rounded down to at least a word per cycle
+    def get_interface_bandwidths_words(self, precisions=None):
+        assert self.config_valid
+        precisions = self.get_operand_precisions(layer_precisions=precisions)
+
+        bandwidths_words = []
+        for bw, precision in zip(self.get_interface_bandwidths(), precisions):
+            bandwidths_words += [max(int(bw / self.get_precision_bytes(precision)), 1)]
+
+        return bandwidths_words
+
+    # Precisions of the ifmap, filter and ofmap, the ones of a layer take precedence when given
+    def get_operand_precisions(self, layer_precisions=None):
+        assert self.config_valid
+        if layer_precisions is not None:
+            return tuple(layer_precisions)
+
+        return self.ifmap_precision, self.filter_precision, self.ofmap_precision
+
+    #
+    @staticmethod
+    def get_precision_bytes(precision='int8'):
+        assert precision in KrittikaConfig.precision_bytes, 'Invalid precision: ' + str(precision)
+        return KrittikaConfig.precision_bytes[precision]
+
+    #
+    def get_interconnect_topology(self):
+        assert self.config_valid
+        return self.interconnect_topology
+
+    #
+    def get_interconnect_grid_dims(self):
+        assert self.config_valid
+
+        grid_rows = self.interconnect_grid_rows
+        grid_cols = self.interconnect_grid_cols
+        num_cores = self.num_compute_cores
+
+        if grid_rows == 0 and grid_cols == 0:
+            grid_rows = int(math.sqrt(num_cores))
+            while num_cores % grid_rows != 0:
+                grid_rows -= 1
+        elif grid_rows == 0:
+            grid_rows = math.ceil(num_cores / grid_cols)
+
+        if grid_cols == 0:
+            grid_cols = math.ceil(num_cores / grid_rows)
+
+        assert grid_rows * grid_cols >= num_cores, 'The interconnect grid cannot hold all the cores'
+        return grid_rows, grid_cols
+
+    #
+    def get_interconnect_link_params(self):
+        assert self.config_valid
+        return self.interconnect_link_bw, self.interconnect_link_latency
+
+    #
+    def is_shared_buffer_present(self):
+        assert self.config_valid
+        return self.shared_buffer_size_kb > 0
+
+    #
+    def get_shared_buffer_params(self):
+        assert self.config_valid
+        return self.shared_buffer_size_kb, self.shared_buffer_bank_bw, self.shared_buffer_num_banks
+
+    #
+    def is_dram_bw_shared(self):
+        assert self.config_valid
+        return self.dram_total_bw > 0
+
+    #
+    def get_dram_params(self):
+        assert self.config_valid
+        return self.dram_total_bw, self.dram_arbitration
+
+    #
+    def is_pipelined(self):
+        assert self.config_valid
+        return self.pipeline_num_stages > 1
+
+    # Stage cores default to an even split, the first stages take the remaining cores
+    def get_pipeline_params(self):
+        assert self.config_valid
+
+        stage_cores = list(self.pipeline_stage_cores)
+        if len(stage_cores) == 0:
+            stage_cores = [self.num_compute_cores // self.pipeline_num_stages] * self.pipeline_num_stages
+            for stage_id in range(self.num_compute_cores % self.pipeline_num_stages):
+                stage_cores[stage_id] += 1
+
+        return self.pipeline_num_stages, self.pipeline_num_inferences, \
+            stage_cores, list(self.pipeline_stage_first_layers)
+
     #
     def write_config_file(self, filename='krittika_config.cfg'):
         assert self.config_valid
@@ -363,10 +980,21 @@ class KrittikaConfig:
         section = 'GENERAL'
         cp.add_section(section)
         cp.set(section, 'Run Name', str(self.run_name))
+        cp.set(section, 'Num Workers', str(self.num_workers))
+        cp.set(section, 'Num Layer Workers', str(self.num_layer_workers))
+        cp.set(section, 'Partition Cache', str(self.partition_cache_enabled))
+        cp.set(section, 'Result Cache', str(self.result_cache_enabled))
+        cp.set(section, 'Result Cache Size MB', str(self.result_cache_size_mb))
+        cp.set(section, 'Stream Traces', str(self.stream_traces))
+        cp.set(section, 'Trace Chunk Lines', str(self.trace_chunk_lines))
+        cp.set(section, 'Trace Format', str(self.trace_format))
+        cp.set(section, 'Layer Fusion', str(self.layer_fusion))
+        cp.set(section, 'Fuse Activations', str(self.fuse_activations))
 
         section = 'COMPUTE'
         cp.add_section(section)
         cp.set(section, 'Num Compute Cores', str(self.num_compute_cores))
+        cp.set(section, 'Clock MHz', str(self.clock_mhz))
         cp.set(section, 'MatMul Core Present', str(self.matmul_present))
         cp.set(section, 'Vector Core Present', str(self.vector_present))
 
@@ -379,7 +1007,23 @@ class KrittikaConfig:
             cp.set(section, 'Vector Dim', str(self.vector_dim))
             cp.set(section, 'Vector Default Dataflow', str(self.vector_default_dataflow))
 
+        if self.is_heterogeneous():
+            cp.set(section, 'Num MatMul Cores', str(self.num_matmul_cores))
+            cp.set(section, 'Num Vector Cores', str(self.num_vector_cores))
+
+        cp.set(section, 'SIMD Length', str(self.simd_length))
         cp.set(section, 'Partition Strategy', str(self.partition_mode))
+        cp.set(section, 'Balanced Partitions', str(self.balanced_partitions))
+
+        section = 'SIMD'
+        cp.add_section(section)
+        for op_name in self.simd_op_costs.keys():
+            cycles_per_element, num_passes, reduction_latency, use_lut = self.simd_op_costs[op_name]
+            cp.set(section, op_name + ' Cycles Per Element', str(cycles_per_element))
+            cp.set(section, op_name + ' Passes', str(num_passes))
+            cp.set(section, op_name + ' Reduction Latency', str(reduction_latency))
+            cp.set(section, op_name + ' Lookup Table', str(use_lut))
+        cp.set(section, 'Lookup Table Cycles Per Element', str(self.simd_lut_cycles))
 
         section = 'MEMORY'
         cp.add_section(section)
@@ -401,6 +1045,40 @@ class KrittikaConfig:
         cp.set(section, 'Per Core User OFMAP buf interface BW (Words/Cycle)',
                             str(self.per_unit_user_ofmap_interface_bw))
 
+        section = 'PRECISION'
+        cp.add_section(section)
+        cp.set(section, 'IFMAP', str(self.ifmap_precision))
+        cp.set(section, 'FILTER', str(self.filter_precision))
+        cp.set(section, 'OFMAP', str(self.ofmap_precision))
+
+        section = 'INTERCONNECT'
+        cp.add_section(section)
+        cp.set(section, 'Topology', str(self.interconnect_topology))
+        cp.set(section, 'Grid Rows', str(self.interconnect_grid_rows))
+        cp.set(section, 'Grid Cols', str(self.interconnect_grid_cols))
+        cp.set(section, 'Link BW (Words/Cycle)', str(self.interconnect_link_bw))
+        cp.set(section, 'Link Latency (Cycles)', str(self.interconnect_link_latency))
+
+        section = 'SHARED BUFFER'
+        cp.add_section(section)
+        cp.set(section, 'Size KB', str(self.shared_buffer_size_kb))
+        cp.set(section, 'Bank BW (Words/Cycle)', str(self.shared_buffer_bank_bw))
+        cp.set(section, 'Num Banks', str(self.shared_buffer_num_banks))
+
+        section = 'DRAM'
+        cp.add_section(section)
+        cp.set(section, 'Total BW (Words/Cycle)', str(self.dram_total_bw))
+        cp.set(section, 'Arbitration', str(self.dram_arbitration))
+
+        section = 'PIPELINE'
+        cp.add_section(section)
+        cp.set(section, 'Num Stages', str(self.pipeline_num_stages))
+        cp.set(section, 'Num Inferences', str(self.pipeline_num_inferences))
+        if len(self.pipeline_stage_cores) > 0:
+            cp.set(section, 'Stage Cores', ', '.join([str(x) for x in self.pipeline_stage_cores]))
+        if len(self.pipeline_stage_first_layers) > 0:
+            cp.set(section, 'Stage First Layers', ', '.join([str(x) for x in self.pipeline_stage_first_layers]))
+
         with open(filename, 'w') as configfile:
             cp.write(configfile)
 
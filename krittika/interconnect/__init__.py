@@ -0,0 +1 @@
+from krittika.interconnect.interconnect import Interconnect
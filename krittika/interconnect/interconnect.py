@@ -0,0 +1,162 @@
+import math
+import numpy as np
+
+from krittika.compute.scaled_out_compute_unit import ScaledOutComputeUnit
+
+
+class Interconnect:
+    '''
+        Network between the cores, laid out on the grid of a ScaledOutComputeUnit.
+        Links are directional and move link_bw words per cycle each. Supported topologies:
+        1. mesh: links between the grid neighbours, dimension order routing (columns first, then rows)
+        2. ring: links between consecutive node ids, the shorter direction is taken
+        3. crossbar: every node injects and ejects through its own port, all transfers take one hop
+        A set of concurrent transfers takes as long as its most loaded link needs to serialize
+        its words, plus the latency of the longest route.
+    '''
+    def __init__(self):
+        self.scaled_out_unit = ScaledOutComputeUnit()
+
+        self.topology = 'mesh'
+        self.link_bw = 1
+        self.link_latency = 1
+
+        # Link names and the routes between every pair of nodes, as lists of link indices
+        self.link_names = []
+        self.routes = {}
+
+        # Stats, accumulated over all the transfers
+        self.link_words = np.zeros(0)
+        self.link_busy_cycles = np.zeros(0)
+        self.total_transfer_cycles = 0
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, topology='mesh', num_nodes=1, grid_rows=1, grid_cols=1, link_bw=1, link_latency=1):
+        assert topology in ['mesh', 'ring', 'crossbar'], 'Invalid interconnect topology: ' + str(topology)
+        assert link_bw > 0, 'Link bandwidth must be greater than 0'
+        assert link_latency >= 0, 'Link latency cannot be negative'
+
+        self.scaled_out_unit = ScaledOutComputeUnit()
+        self.scaled_out_unit.set_params(total_nodes=num_nodes, grid_rows=grid_rows, grid_cols=grid_cols)
+
+        self.topology = topology
+        self.link_bw = link_bw
+        self.link_latency = link_latency
+
+        self.create_routes()
+
+        self.link_words = np.zeros(len(self.link_names), dtype=np.int64)
+        self.link_busy_cycles = np.zeros(len(self.link_names), dtype=np.int64)
+        self.total_transfer_cycles = 0
+
+        self.params_set = True
+
+    #
+    def create_routes(self):
+        link_ids = {}
+        self.link_names = []
+        self.routes = {}
+
+        num_nodes = self.scaled_out_unit.get_num_compute_nodes()
+        for src in range(num_nodes):
+            for dst in range(num_nodes):
+                if src == dst:
+                    continue
+
+                route = []
+                for link_name in self.get_route_link_names(src=src, dst=dst):
+                    if link_name not in link_ids:
+                        link_ids[link_name] = len(self.link_names)
+                        self.link_names += [link_name]
+                    route += [link_ids[link_name]]
+
+                self.routes[(src, dst)] = route
+
+    #
+    def get_route_link_names(self, src=0, dst=0):
+        if self.topology == 'crossbar':
+            return ['n' + str(src) + '->X', 'X->n' + str(dst)]
+
+        elif self.topology == 'ring':
+            num_nodes = self.scaled_out_unit.get_num_compute_nodes()
+            forward_hops = (dst - src) % num_nodes
+            step = 1
+            if forward_hops > num_nodes - forward_hops:
+                step = -1
+
+            link_names = []
+            node = src
+            while node != dst:
+                next_node = (node + step) % num_nodes
+                link_names += ['n' + str(node) + '->n' + str(next_node)]
+                node = next_node
+            return link_names
+
+        else:   # self.topology == 'mesh'
+            row, col = self.scaled_out_unit.get_node_position(node_id=src)
+            dst_row, dst_col = self.scaled_out_unit.get_node_position(node_id=dst)
+
+            # Routers sit on every grid slot, including the ones without a node
+            link_names = []
+            while col != dst_col:
+                next_col = col + int(math.copysign(1, dst_col - col))
+                link_names += [self.get_mesh_link_name(row, col, row, next_col)]
+                col = next_col
+            while row != dst_row:
+                next_row = row + int(math.copysign(1, dst_row - row))
+                link_names += [self.get_mesh_link_name(row, col, next_row, col)]
+                row = next_row
+            return link_names
+
+    # Kept free of commas, the names go into the CSV reports
+    @staticmethod
+    def get_mesh_link_name(src_row=0, src_col=0, dst_row=0, dst_col=0):
+        return 'r' + str(src_row) + 'c' + str(src_col) + '->r' + str(dst_row) + 'c' + str(dst_col)
+
+    # Charges a set of concurrent transfers, transfer_mat[src][dst] holds the words moved
+    def add_transfers(self, transfer_mat=None):
+        assert self.params_set, 'Interconnect is not set up'
+        assert transfer_mat is not None
+
+        link_loads = np.zeros(len(self.link_names), dtype=np.int64)
+        max_hops = 0
+        for src, dst in zip(*np.nonzero(transfer_mat)):
+            if src == dst:
+                continue
+            route = self.routes[(int(src), int(dst))]
+            link_loads[route] += int(transfer_mat[src][dst])
+            max_hops = max(max_hops, len(route))
+
+        busy_cycles = -(-link_loads // self.link_bw)
+        transfer_cycles = 0
+        if max_hops > 0:
+            transfer_cycles = int(np.max(busy_cycles)) + max_hops * self.link_latency
+
+        self.link_words += link_loads
+        self.link_busy_cycles += busy_cycles
+        self.total_transfer_cycles += transfer_cycles
+
+        return transfer_cycles
+
+    #
+    def get_link_names(self):
+        assert self.params_set
+        return self.link_names
+
+    #
+    def get_link_stats(self):
+        assert self.params_set
+        return self.link_words, self.link_busy_cycles
+
+    #
+    def get_total_transfer_cycles(self):
+        assert self.params_set
+        return self.total_transfer_cycles
+
+    #
+    def get_scaled_out_unit(self):
+        assert self.params_set
+        return self.scaled_out_unit
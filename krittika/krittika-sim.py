@@ -11,6 +11,11 @@ if __name__ == '__main__':
         -o : Path to log dump directory 
         --verbose: Verbosity of the run (Default: True)
         --savetrace: If True then saves the traces (Default: True) 
+        --workers: Number of processes used to simulate the cores of a layer (Default: from config)
+        --layerworkers: Number of processes used to simulate independent layers (Default: from config)
+        --mode: cycle for the cycle accurate simulation, analytical for closed form estimates (Default: cycle)
+        --no-cache: Simulate every layer instead of loading cached results from earlier runs
+        --traceformat: csv, npy or npz, format of the saved traces (Default: from config)
     '''
 
     parser = argparse.ArgumentParser()
@@ -45,6 +50,30 @@ if __name__ == '__main__':
                         help='Flag to indicate if the traces should be saved'
                         )
 
+    parser.add_argument('--workers', metavar='Num workers', type=int,
+                        default=None,
+                        help='Number of processes used to simulate the cores of a layer'
+                        )
+
+    parser.add_argument('--layerworkers', metavar='Num layer workers', type=int,
+                        default=None,
+                        help='Number of processes used to simulate independent layers'
+                        )
+
+    parser.add_argument('--mode', metavar='Simulation mode', type=str,
+                        default='cycle', choices=['cycle', 'analytical'],
+                        help='cycle: cycle accurate simulation, analytical: closed form estimates only'
+                        )
+
+    parser.add_argument('--no-cache', dest='no_cache', action='store_true',
+                        help='Simulate every layer instead of loading cached results from earlier runs'
+                        )
+
+    parser.add_argument('--traceformat', metavar='Trace format', type=str,
+                        default=None, choices=['csv', 'npy', 'npz'],
+                        help='csv: plain text, npy: binary and memory mappable, npz: compressed binary'
+                        )
+
     args = parser.parse_args()
 
     topology_file = args.t
@@ -54,6 +83,11 @@ if __name__ == '__main__':
 
     verbosity = args.verbose
     save_traces_flag = args.savetrace
+    num_workers = args.workers
+    num_layer_workers = args.layerworkers
+    sim_mode = args.mode
+    no_cache = args.no_cache
+    trace_format = args.traceformat
 
     krittika = Simulator()
     krittika.set_params(
@@ -62,7 +96,12 @@ if __name__ == '__main__':
         custom_partition_filename=partition_file,
         reports_dir_path=logs_top_path,
         verbose=verbosity,
-        save_traces=save_traces_flag
+        save_traces=save_traces_flag,
+        num_workers=num_workers,
+        num_layer_workers=num_layer_workers,
+        mode=sim_mode,
+        no_cache=no_cache,
+        trace_format=trace_format
     )
 
     krittika.run()
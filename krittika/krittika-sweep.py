@@ -0,0 +1,81 @@
+import os
+import argparse
+
+from krittika.sweep import DesignSpaceSweep
+
+if __name__ == '__main__':
+    '''
+        Input parameters:
+        -t : Path to topology file
+        -c : Path to the base config file
+        -p : Path to partition file (Not needed if partition mode is auto)
+        -s : Path to the sweep file
+        -o : Path to log dump directory, each point is dumped into <dir>/point<id>
+        --workers: Number of design points simulated at the same time (Default: number of CPUs)
+        --mode: cycle for the cycle accurate simulation, analytical for closed form estimates (Default: cycle)
+        --verbose: Verbosity of the run, only used when the points run serially (Default: True)
+    '''
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-t', metavar='Topology file', type=str,
+                        default='../topologies/conv_nets/test.csv',
+                        help='Path to the topology CSV file'
+                        )
+
+    parser.add_argument('-c', metavar='Config file', type=str,
+                        default='../configs/krittika.cfg',
+                        help='Path to the base config file'
+                        )
+
+    parser.add_argument('-p', metavar='Partition file', type=str,
+                        default='../part_files/demo_partition_file.csv',
+                        help='Path to the partition file'
+                        )
+
+    parser.add_argument('-s', metavar='Sweep file', type=str,
+                        default='../configs/sweep_example.cfg',
+                        help='Path to the sweep file'
+                        )
+
+    parser.add_argument('-o', metavar='Top path', type=str,
+                        default='../test_sweep_outputs',
+                        help='Path to the log dump directory'
+                        )
+
+    parser.add_argument('--workers', metavar='Num workers', type=int,
+                        default=None,
+                        help='Number of design points simulated at the same time'
+                        )
+
+    parser.add_argument('--mode', metavar='Simulation mode', type=str,
+                        default='cycle', choices=['cycle', 'analytical'],
+                        help='cycle: cycle accurate simulation, analytical: closed form estimates only'
+                        )
+
+    parser.add_argument('--verbose', metavar='Verbosity', type=bool,
+                        default=True,
+                        help='Flag to change the verbosity of the run'
+                        )
+
+    args = parser.parse_args()
+
+    num_workers = args.workers
+    if num_workers is None:
+        num_workers = os.cpu_count()
+
+    sweep = DesignSpaceSweep()
+    sweep.set_params(
+        config_filename=args.c,
+        workload_filename=args.t,
+        custom_partition_filename=args.p,
+        sweep_filename=args.s,
+        reports_dir_path=args.o,
+        num_workers=num_workers,
+        mode=args.mode,
+        verbose=args.verbose
+    )
+
+    sweep.run()
+
+    print('Krittika Sweep Done')
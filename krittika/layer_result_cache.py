@@ -0,0 +1,148 @@
+import os
+import hashlib
+import pickle
+
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.workload_manager import WorkloadManager
+from krittika.partition_manager import PartitionManager
+
+
+class LayerResultCache:
+    '''
+        Content addressed on disk cache of the per core report items of a layer.
+        The key is a hash of everything the results of a layer depend on:
+        1. The layer row from the topology (without the layer id), the weight sparsity and
+           the operand precisions
+        2. The partition table entries of the layer, and the rows the matmul cores run on heterogeneous chips
+        3. The config fields that affect the simulation (run name, worker counts, the
+           interconnect, layer fusion, the shared buffer and the DRAM arbitration, which
+           are applied after the layers, excluded)
+        4. For activation layers, the key of the producer layer
+        Entries are pickled files named by the key, the least recently used ones are evicted
+        once the cache grows over the size limit.
+    '''
+    # Bump when the simulation model changes, so that stale results are not reused
+    cache_version = 8
+
+    # Config fields which do not change the simulated results
+    config_fields_ignored = ['run_name', 'num_workers', 'num_layer_workers',
+                             'result_cache_enabled', 'result_cache_size_mb',
+                             'stream_traces', 'trace_chunk_lines', 'trace_format',
+                             'interconnect_topology', 'interconnect_grid_rows', 'interconnect_grid_cols',
+                             'interconnect_link_bw', 'interconnect_link_latency',
+                             'shared_buffer_size_kb', 'shared_buffer_bank_bw', 'shared_buffer_num_banks',
+                             'dram_total_bw', 'dram_arbitration', 'layer_fusion',
+                             'fuse_activations',
+                             'config_valid']
+
+    def __init__(self):
+        self.cache_dir = './cache'
+        self.max_size_bytes = 1024 * 1024 * 1024
+
+        # Stats
+        self.num_hits = 0
+        self.num_misses = 0
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, cache_dir='./cache', max_size_mb=1024):
+        assert max_size_mb > 0, 'Cache size must be greater than 0'
+
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+        self.params_set = True
+
+    #
+    def get_layer_key(self, config_obj=KrittikaConfig(), workload_obj=WorkloadManager(),
+                      partition_obj=PartitionManager(), layer_id=0, producer_key=''):
+        layer_params = workload_obj.get_layer_params(layer_id)
+        layer_row = [layer_params[0]] + list(layer_params[2:]) + [workload_obj.get_layer_batch(layer_id)]
+        if layer_params[0] in ['conv', 'gemm']:
+            layer_row += [workload_obj.get_layer_sparsity(layer_id).get_descriptor(),
+                          workload_obj.get_layer_precisions(layer_id)]
+
+        # Every unit type of a heterogeneous layer has its own entry
+        partition_entry = []
+        if layer_params[0] in ['conv', 'gemm']:
+            for unit_entry in partition_obj.get_layer_unit_entries(layer_id=layer_id):
+                partition_entry += [list(unit_entry[1:])]
+            if partition_obj.is_heterogeneous_layer(layer_id=layer_id):
+                partition_entry += [partition_obj.get_layer_matmul_unit_rows(layer_id=layer_id)]
+
+        config_fields = []
+        for field_name in sorted(vars(config_obj).keys()):
+            if field_name not in self.config_fields_ignored:
+                config_fields += [(field_name, vars(config_obj)[field_name])]
+
+        key_str = repr([self.cache_version, layer_row, partition_entry, config_fields, producer_key])
+        return hashlib.sha256(key_str.encode('utf-8')).hexdigest()
+
+    #
+    def get_entry_filename(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    #
+    def lookup(self, key):
+        assert self.params_set, 'Cache is not set up'
+
+        filename = self.get_entry_filename(key)
+        if not os.path.isfile(filename):
+            self.num_misses += 1
+            return None
+
+        try:
+            with open(filename, 'rb') as f:
+                report_items = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # A truncated entry is treated as a miss and overwritten later
+            self.num_misses += 1
+            return None
+
+        # Update the access time, which the eviction policy uses
+        os.utime(filename)
+        self.num_hits += 1
+
+        return report_items
+
+    #
+    def insert(self, key, report_items):
+        assert self.params_set, 'Cache is not set up'
+
+        # Write to a temporary file first so that readers never see a partial entry
+        filename = self.get_entry_filename(key)
+        tmp_filename = filename + '.tmp' + str(os.getpid())
+        with open(tmp_filename, 'wb') as f:
+            pickle.dump(report_items, f)
+        os.replace(tmp_filename, filename)
+
+        self.evict()
+
+    #
+    def evict(self):
+        entries = []
+        total_size = 0
+        for entry_name in os.listdir(self.cache_dir):
+            if not entry_name.endswith('.pkl'):
+                continue
+            filename = os.path.join(self.cache_dir, entry_name)
+            entry_stat = os.stat(filename)
+            entries += [(entry_stat.st_mtime, entry_stat.st_size, filename)]
+            total_size += entry_stat.st_size
+
+        # Least recently used first
+        entries.sort()
+        for _, entry_size, filename in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            os.remove(filename)
+            total_size -= entry_size
+
+    #
+    def get_hit_miss_counts(self):
+        return self.num_hits, self.num_misses
@@ -0,0 +1,72 @@
+from krittika.workload_manager import WorkloadManager
+
+
+class LayerScheduler:
+    '''
+        Builds the dependency graph between the layers of a workload and groups them into waves.
+        Layers in the same wave do not depend on each other and can be simulated concurrently.
+        1. conv and gemm layers generate their own operand matrices, hence have no producers
+        2. activation layers operate on the ofmap operand matrix of the previous layer
+    '''
+    def __init__(self):
+        self.workload_obj = WorkloadManager()
+
+        # Producers of each layer, indexed by layer id
+        self.layer_dependencies = []
+        self.layer_waves = []
+
+        # Flags
+        self.params_set = False
+        self.schedule_valid = False
+
+    #
+    def set_params(self, workload_obj=WorkloadManager()):
+        self.workload_obj = workload_obj
+
+        self.params_set = True
+        self.schedule_valid = False
+
+    #
+    def create_dependency_graph(self):
+        assert self.params_set, 'Workload is not set'
+
+        num_layers = self.workload_obj.get_num_layers()
+        self.layer_dependencies = []
+
+        for lid in range(num_layers):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if layer_params[0] in ['activation']:
+                assert lid > 0, 'Activation layer needs a preceding layer'
+                self.layer_dependencies += [[lid - 1]]
+            else:
+                self.layer_dependencies += [[]]
+
+        self.create_layer_waves()
+        self.schedule_valid = True
+
+    #
+    def create_layer_waves(self):
+        # A layer is placed one wave after the latest of its producers
+        layer_wave_ids = []
+        for producers in self.layer_dependencies:
+            wave_id = 0
+            for producer_id in producers:
+                wave_id = max(wave_id, layer_wave_ids[producer_id] + 1)
+            layer_wave_ids += [wave_id]
+
+        self.layer_waves = []
+        if len(layer_wave_ids) > 0:
+            self.layer_waves = [[] for _ in range(max(layer_wave_ids) + 1)]
+
+        for lid, wave_id in enumerate(layer_wave_ids):
+            self.layer_waves[wave_id] += [lid]
+
+    #
+    def get_layer_dependencies(self, layer_id=0):
+        assert self.schedule_valid, 'Dependency graph is not created'
+        return self.layer_dependencies[layer_id]
+
+    #
+    def get_layer_waves(self):
+        assert self.schedule_valid, 'Dependency graph is not created'
+        return self.layer_waves
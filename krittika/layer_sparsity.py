@@ -0,0 +1,147 @@
+import math
+import numpy as np
+
+
+class LayerSparsity:
+    '''
+        Weight sparsity of a conv/gemm layer, from the optional last field of its topology row.
+        The zeros are along the reduction dimension (K) of the filter operand matrix:
+        1. dense: no zeros, the default
+        2. N:M (e.g. 2:4): N nonzeros in every group of M weights of a filter. The array skips
+           the zeros, each weight keeps a ceil(log2(M)) bit index into its group
+        3. block:B:D (e.g. block:4:0.5): a fraction D of the blocks of B consecutive rows of the
+           filter matrix are nonzero. The array skips the zero blocks, a bitmap with one bit per
+           block marks the nonzero ones
+        4. unstructured:D (e.g. unstructured:0.3): a fraction D of the weights are nonzero at random.
+           The weights are stored compressed with a bitmap of one bit per weight, the array only
+           skips the rows which are zero for every filter
+        Skipped rows are not fed to the array, hence both the ifmap and filter demands shrink.
+    '''
+    def __init__(self):
+        self.kind = 'dense'
+        self.density = 1.0
+        self.group_size = 1
+        self.num_nonzero = 1
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, kind='dense', density=1.0, group_size=1, num_nonzero=1):
+        assert kind in ['dense', 'structured', 'block', 'unstructured'], 'Invalid sparsity: ' + str(kind)
+        assert 0 < density <= 1, 'Density must be in (0, 1]'
+        assert group_size > 0, 'Group size must be greater than 0'
+        assert 0 < num_nonzero <= group_size, 'Nonzeros must be in (0, group size]'
+
+        self.kind = kind
+        self.density = density
+        self.group_size = group_size
+        self.num_nonzero = num_nonzero
+
+        self.params_set = True
+
+    # Parses 'dense', 'N:M', 'block:B:D' or 'unstructured:D'
+    def set_params_from_descriptor(self, descriptor='dense'):
+        elems = [x.strip() for x in descriptor.strip().split(':')]
+
+        if elems[0] == 'dense':
+            self.set_params(kind='dense')
+
+        elif elems[0] == 'block':
+            assert len(elems) == 3, 'Block sparsity is written as block:<block size>:<density>'
+            self.set_params(kind='block', density=float(elems[2]), group_size=int(elems[1]))
+
+        elif elems[0] == 'unstructured':
+            assert len(elems) == 2, 'Unstructured sparsity is written as unstructured:<density>'
+            self.set_params(kind='unstructured', density=float(elems[1]))
+
+        else:
+            assert len(elems) == 2, 'Invalid sparsity descriptor: ' + descriptor
+            num_nonzero = int(elems[0])
+            group_size = int(elems[1])
+            self.set_params(kind='structured', density=num_nonzero / group_size,
+                            group_size=group_size, num_nonzero=num_nonzero)
+
+    #
+    def get_descriptor(self):
+        assert self.params_set
+
+        if self.kind == 'structured':
+            return str(self.num_nonzero) + ':' + str(self.group_size)
+        elif self.kind == 'block':
+            return 'block:' + str(self.group_size) + ':' + str(self.density)
+        elif self.kind == 'unstructured':
+            return 'unstructured:' + str(self.density)
+
+        return 'dense'
+
+    #
+    def is_dense(self):
+        assert self.params_set
+        return self.kind == 'dense'
+
+    # Rows of a num_rows x num_cols filter matrix which the array streams.
+    # The same pattern is used for every filter, only the count matters for the cycles and accesses
+    def get_kept_rows(self, num_rows=1, num_cols=1):
+        assert self.params_set
+
+        if self.kind == 'dense':
+            return np.arange(num_rows)
+
+        if self.kind == 'structured':
+            row_ids = np.arange(num_rows)
+            return row_ids[row_ids % self.group_size < self.num_nonzero]
+
+        if self.kind == 'block':
+            num_blocks = math.ceil(num_rows / self.group_size)
+            num_kept_blocks = max(math.ceil(num_blocks * self.density), 1)
+            kept_blocks = np.floor(np.arange(num_kept_blocks) * num_blocks / num_kept_blocks).astype(int)
+            row_ids = (kept_blocks.reshape(-1, 1) * self.group_size + np.arange(self.group_size)).reshape(-1)
+            return row_ids[row_ids < num_rows]
+
+        # Unstructured, a row is skipped only when all the filters are zero in it
+        row_nonzero_prob = 1 - (1 - self.density) ** num_cols
+        num_kept_rows = min(max(math.ceil(num_rows * row_nonzero_prob), 1), num_rows)
+        return np.floor(np.arange(num_kept_rows) * num_rows / num_kept_rows).astype(int)
+
+    #
+    def get_num_kept_rows(self, num_rows=1, num_cols=1):
+        return len(self.get_kept_rows(num_rows=num_rows, num_cols=num_cols))
+
+    # Nonzero weights kept in memory
+    def get_stored_words(self, num_rows=1, num_cols=1):
+        assert self.params_set
+
+        if self.kind == 'unstructured':
+            return math.ceil(num_rows * num_cols * self.density)
+
+        return self.get_num_kept_rows(num_rows=num_rows, num_cols=num_cols) * num_cols
+
+    # Words of the compression metadata (indices or bitmaps) kept next to the weights,
+    # in words of word_bits bits as the weights
+    def get_metadata_words(self, num_rows=1, num_cols=1, word_bits=8):
+        assert self.params_set
+
+        metadata_bits = 0
+        if self.kind == 'structured':
+            index_bits = max(math.ceil(math.log2(self.group_size)), 1)
+            metadata_bits = self.get_stored_words(num_rows=num_rows, num_cols=num_cols) * index_bits
+        elif self.kind == 'block':
+            metadata_bits = math.ceil(num_rows / self.group_size)
+        elif self.kind == 'unstructured':
+            metadata_bits = num_rows * num_cols
+
+        return math.ceil(metadata_bits / word_bits)
+
+    # Filter words moved from the DRAM for every word streamed to the array.
+    # The weights stay compressed in the DRAM and come with their metadata
+    def get_filter_dram_scale(self, num_rows=1, num_cols=1, word_bits=8):
+        assert self.params_set
+
+        streamed_words = self.get_num_kept_rows(num_rows=num_rows, num_cols=num_cols) * num_cols
+        if self.kind == 'dense' or streamed_words == 0:
+            return 1
+
+        stored_words = self.get_stored_words(num_rows=num_rows, num_cols=num_cols)
+        metadata_words = self.get_metadata_words(num_rows=num_rows, num_cols=num_cols, word_bits=word_bits)
+        return (stored_words + metadata_words) / streamed_words
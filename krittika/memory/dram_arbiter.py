@@ -0,0 +1,113 @@
+class DramArbiter:
+    '''
+        DRAM with a total bandwidth shared by the cores of a layer.
+        Each core needs its DRAM words at the average rate of its own run. While the cores
+        together ask for more than the total bandwidth, the arbiter splits it:
+        1. ROUND_ROBIN: equal shares, the share a core does not need goes to the others
+        2. PROPORTIONAL: shares proportional to the rates asked for, all cores slow down alike
+        3. PRIORITY: lower core ids are served first
+        A core getting less than it asks for advances proportionally slower. The shares are
+        recomputed whenever a core finishes.
+    '''
+    def __init__(self):
+        self.total_bw = 1
+        self.policy = 'ROUND_ROBIN'
+
+        # Per core cycles of every arbitrated layer
+        self.standalone_cycles_list = []
+        self.contended_cycles_list = []
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, total_bw=1, policy='ROUND_ROBIN'):
+        assert total_bw > 0, 'DRAM bandwidth must be greater than 0'
+        assert policy in ['ROUND_ROBIN', 'PROPORTIONAL', 'PRIORITY'], 'Invalid arbitration policy: ' + str(policy)
+
+        self.total_bw = total_bw
+        self.policy = policy
+
+        self.standalone_cycles_list = []
+        self.contended_cycles_list = []
+
+        self.params_set = True
+
+    #
+    def arbitrate_layer(self, dram_words_list=None, cycles_list=None):
+        assert self.params_set, 'DRAM arbiter is not set up'
+        assert dram_words_list is not None and cycles_list is not None
+        assert len(dram_words_list) == len(cycles_list)
+
+        num_cores = len(cycles_list)
+        demand_rates = [dram_words_list[i] / max(cycles_list[i], 1) for i in range(num_cores)]
+
+        # Remaining work of each core, in cycles of its own uncontended run
+        remaining = [float(x) for x in cycles_list]
+        finish_cycles = [0.0] * num_cores
+        active = [i for i in range(num_cores) if remaining[i] > 0]
+        now = 0.0
+
+        while len(active) > 0:
+            shares = self.get_bw_shares(demand_rates=[demand_rates[i] for i in active])
+
+            speeds = []
+            for core_id, share in zip(active, shares):
+                speed = 1.0
+                if demand_rates[core_id] > 0:
+                    speed = min(1.0, share / demand_rates[core_id])
+                speeds += [speed]
+
+            step = min([remaining[i] / s for i, s in zip(active, speeds) if s > 0])
+            now += step
+
+            still_active = []
+            for core_id, speed in zip(active, speeds):
+                remaining[core_id] -= step * speed
+                if remaining[core_id] <= 1e-9:
+                    finish_cycles[core_id] = now
+                else:
+                    still_active += [core_id]
+            active = still_active
+
+        contended_cycles = [max(round(finish_cycles[i]), cycles_list[i]) for i in range(num_cores)]
+
+        self.standalone_cycles_list += [list(cycles_list)]
+        self.contended_cycles_list += [contended_cycles]
+
+        return contended_cycles
+
+    #
+    def get_bw_shares(self, demand_rates=None):
+        assert demand_rates is not None
+
+        if sum(demand_rates) <= self.total_bw:
+            return list(demand_rates)
+
+        if self.policy == 'PROPORTIONAL':
+            return [x * self.total_bw / sum(demand_rates) for x in demand_rates]
+
+        elif self.policy == 'PRIORITY':
+            shares = []
+            left_bw = self.total_bw
+            for rate in demand_rates:
+                shares += [min(rate, left_bw)]
+                left_bw -= shares[-1]
+            return shares
+
+        else:   # self.policy == 'ROUND_ROBIN'
+            # Water filling, the cores asking for less than an equal share are served in full
+            shares = [0.0] * len(demand_rates)
+            left_bw = self.total_bw
+            pending = sorted(range(len(demand_rates)), key=lambda i: demand_rates[i])
+            while len(pending) > 0:
+                fair_share = left_bw / len(pending)
+                core_id = pending.pop(0)
+                shares[core_id] = min(demand_rates[core_id], fair_share)
+                left_bw -= shares[core_id]
+            return shares
+
+    #
+    def get_layer_cycles(self, layer_idx=0):
+        assert self.params_set
+        return self.standalone_cycles_list[layer_idx], self.contended_cycles_list[layer_idx]
@@ -0,0 +1,105 @@
+import math
+
+
+class SharedBuffer:
+    '''
+        On chip buffer shared by all the cores, between their scratchpads and the DRAM.
+        The operand fetches of all the cores in a layer go to the shared buffer:
+        1. Words read by several cores are fetched from the DRAM once, if the layer's unique
+           operand words fit in the buffer. Otherwise only the fraction that fits is reused
+        2. The buffer serves num_banks * bank_bw words per cycle when every bank is busy.
+           The cores hit the banks at random, so on average fewer banks are busy
+        3. The layer stalls when the buffer needs more cycles than the slowest core computes
+        OFMAP writes go straight through to the DRAM. The size and the bank bandwidth are in bytes,
+        the requests of a layer are in words of its operand precisions.
+    '''
+    def __init__(self):
+        self.size_bytes = 1024
+        self.bank_bw = 1
+        self.num_banks = 1
+        self.num_cores = 1
+
+        # Stats, one entry per serviced layer
+        self.requests_list = []
+        self.hits_list = []
+        self.dram_reads_list = []
+        self.buffer_cycles_list = []
+        self.stall_cycles_list = []
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, size_kb=1, bank_bw=1, num_banks=1, num_cores=1):
+        assert size_kb > 0, 'Buffer size must be greater than 0'
+        assert bank_bw > 0, 'Bank bandwidth must be greater than 0'
+        assert num_banks > 0, 'Number of banks must be greater than 0'
+        assert num_cores > 0, 'Number of cores must be greater than 0'
+
+        self.size_bytes = size_kb * 1024
+        self.bank_bw = bank_bw
+        self.num_banks = num_banks
+        self.num_cores = num_cores
+
+        self.requests_list = []
+        self.hits_list = []
+        self.dram_reads_list = []
+        self.buffer_cycles_list = []
+        self.stall_cycles_list = []
+
+        self.params_set = True
+
+    # Expected words served per cycle when every core accesses one bank at random
+    def get_effective_bw(self, word_bytes=1):
+        assert self.params_set
+
+        busy_banks = self.num_banks * (1 - (1 - 1 / self.num_banks) ** self.num_cores)
+        return max(self.bank_bw / word_bytes, 1) * busy_banks
+
+    # word_bytes is the mean width of the requested words
+    def service_layer(self, requests=0, unique_words=0, compute_cycles=1, word_bytes=1):
+        assert self.params_set, 'Shared buffer is not set up'
+        assert word_bytes > 0, 'Invalid word width'
+
+        size_words = int(self.size_bytes / word_bytes)
+        unique_words = min(unique_words, requests)
+        if unique_words <= size_words:
+            dram_reads = unique_words
+        else:
+            reused_fraction = size_words / unique_words
+            dram_reads = unique_words + math.ceil((requests - unique_words) * (1 - reused_fraction))
+
+        buffer_cycles = math.ceil(requests / self.get_effective_bw(word_bytes=word_bytes))
+        stall_cycles = max(buffer_cycles - compute_cycles, 0)
+
+        self.requests_list += [requests]
+        self.hits_list += [requests - dram_reads]
+        self.dram_reads_list += [dram_reads]
+        self.buffer_cycles_list += [buffer_cycles]
+        self.stall_cycles_list += [stall_cycles]
+
+    #
+    def skip_layer(self):
+        assert self.params_set, 'Shared buffer is not set up'
+
+        self.requests_list += [0]
+        self.hits_list += [0]
+        self.dram_reads_list += [0]
+        self.buffer_cycles_list += [0]
+        self.stall_cycles_list += [0]
+
+    #
+    def get_layer_stats(self, layer_id=0):
+        assert self.params_set
+        return self.requests_list[layer_id], self.hits_list[layer_id], self.dram_reads_list[layer_id], \
+               self.buffer_cycles_list[layer_id], self.stall_cycles_list[layer_id]
+
+    #
+    def get_total_stall_cycles(self):
+        assert self.params_set
+        return sum(self.stall_cycles_list)
+
+    #
+    def get_total_dram_words_saved(self):
+        assert self.params_set
+        return sum(self.hits_list)
@@ -0,0 +1,291 @@
+import shutil
+
+import numpy as np
+from tqdm import tqdm
+
+from scalesim.memory.double_buffered_scratchpad_mem import double_buffered_scratchpad
+
+from krittika.trace_io.trace_writer import TraceWriter
+from krittika.trace_io.trace_reader import TraceReader
+
+
+class StreamingScratchpad(double_buffered_scratchpad):
+    '''
+        Double buffered scratchpad which streams the SRAM traces to files while the demands are
+        serviced, instead of building the full trace matrices in memory:
+        1. The serviced cycles of every chunk of demand lines are joined with the demands and
+           appended to the trace files, then dropped
+        2. The SRAM start and stop cycles are tracked chunk by chunk
+        3. The DRAM traces are written once the servicing is complete
+        Only the SRAM traces are chunked. The demand matrices and the DRAM traces of the core are
+        held in full, the memory is bounded per core and not per chunk.
+        The files are written in the trace format chosen, csv files are identical to the ones
+        written by double_buffered_scratchpad.
+    '''
+    def __init__(self):
+        super().__init__()
+
+        self.ifmap_sram_filename = './IFMAP_SRAM_TRACE.csv'
+        self.filter_sram_filename = './FILTER_SRAM_TRACE.csv'
+        self.ofmap_sram_filename = './OFMAP_SRAM_TRACE.csv'
+        self.ifmap_dram_filename = './IFMAP_DRAM_TRACE.csv'
+        self.filter_dram_filename = './FILTER_DRAM_TRACE.csv'
+        self.ofmap_dram_filename = './OFMAP_DRAM_TRACE.csv'
+
+        self.chunk_lines = 10000
+        self.trace_format = 'csv'
+
+        # Flags
+        self.stream_params_set = False
+
+    #
+    def set_stream_params(self,
+                          ifmap_sram_filename='./IFMAP_SRAM_TRACE.csv',
+                          filter_sram_filename='./FILTER_SRAM_TRACE.csv',
+                          ofmap_sram_filename='./OFMAP_SRAM_TRACE.csv',
+                          ifmap_dram_filename='./IFMAP_DRAM_TRACE.csv',
+                          filter_dram_filename='./FILTER_DRAM_TRACE.csv',
+                          ofmap_dram_filename='./OFMAP_DRAM_TRACE.csv',
+                          chunk_lines=10000,
+                          trace_format='csv'):
+
+        assert chunk_lines > 0, 'Chunk size must be greater than 0'
+        assert trace_format in TraceWriter.supported_formats, 'Invalid trace format: ' + str(trace_format)
+
+        self.ifmap_sram_filename = ifmap_sram_filename
+        self.filter_sram_filename = filter_sram_filename
+        self.ofmap_sram_filename = ofmap_sram_filename
+        self.ifmap_dram_filename = ifmap_dram_filename
+        self.filter_dram_filename = filter_dram_filename
+        self.ofmap_dram_filename = ofmap_dram_filename
+
+        self.chunk_lines = chunk_lines
+        self.trace_format = trace_format
+
+        self.stream_params_set = True
+
+    #
+    def service_memory_requests(self, ifmap_demand_mat, filter_demand_mat, ofmap_demand_mat):
+        assert self.params_valid_flag, 'Memories not initialized yet'
+        assert self.stream_params_set, 'Trace files are not set'
+
+        ofmap_lines = ofmap_demand_mat.shape[0]
+
+        self.total_cycles = 0
+        self.stall_cycles = 0
+
+        ifmap_hit_latency = self.ifmap_buf.get_hit_latency()
+        filter_hit_latency = self.filter_buf.get_hit_latency()
+
+        # Only the serviced cycles of the current chunk are held in memory
+        ifmap_serviced_cycles = []
+        filter_serviced_cycles = []
+        ofmap_serviced_cycles = []
+        chunk_start_line = 0
+        last_ofmap_serviced_cycle = np.zeros(1)
+        max_ofmap_serviced_cycle = 0
+
+        # None until the first valid request is seen
+        sram_start_stop_cycles = {'ifmap': [None, 0], 'filter': [None, 0], 'ofmap': [None, 0]}
+
+        ifmap_trace_writer = self.open_trace_writer(self.ifmap_sram_filename)
+        filter_trace_writer = self.open_trace_writer(self.filter_sram_filename)
+        ofmap_trace_writer = self.open_trace_writer(self.ofmap_sram_filename)
+
+        try:
+            pbar_disable = not self.verbose
+            for i in tqdm(range(ofmap_lines), disable=pbar_disable):
+
+                cycle_arr = np.zeros((1, 1)) + i + self.stall_cycles
+
+                ifmap_demand_line = ifmap_demand_mat[i, :].reshape((1, ifmap_demand_mat.shape[1]))
+                ifmap_cycle_out = \
+                    self.ifmap_buf.service_reads(incoming_requests_arr_np=ifmap_demand_line,
+                                                 incoming_cycles_arr=cycle_arr)
+                ifmap_serviced_cycles += [ifmap_cycle_out[0]]
+                ifmap_stalls = ifmap_cycle_out[0] - cycle_arr[0] - ifmap_hit_latency
+
+                filter_demand_line = filter_demand_mat[i, :].reshape((1, filter_demand_mat.shape[1]))
+                filter_cycle_out = \
+                    self.filter_buf.service_reads(incoming_requests_arr_np=filter_demand_line,
+                                                  incoming_cycles_arr=cycle_arr)
+                filter_serviced_cycles += [filter_cycle_out[0]]
+                filter_stalls = filter_cycle_out[0] - cycle_arr[0] - filter_hit_latency
+
+                ofmap_demand_line = ofmap_demand_mat[i, :].reshape((1, ofmap_demand_mat.shape[1]))
+                ofmap_cycle_out = \
+                    self.ofmap_buf.service_writes(incoming_requests_arr_np=ofmap_demand_line,
+                                                  incoming_cycles_arr_np=cycle_arr)
+                ofmap_serviced_cycles += [ofmap_cycle_out[0]]
+                ofmap_stalls = ofmap_cycle_out[0] - cycle_arr[0]
+
+                last_ofmap_serviced_cycle = ofmap_cycle_out[0]
+                max_ofmap_serviced_cycle = max(max_ofmap_serviced_cycle, ofmap_cycle_out[0][0])
+
+                self.stall_cycles += int(max(ifmap_stalls[0], filter_stalls[0], ofmap_stalls[0]))
+
+                # Flush the chunk
+                if i + 1 - chunk_start_line == self.chunk_lines or i == ofmap_lines - 1:
+                    self.write_trace_chunk(trace_writer=ifmap_trace_writer,
+                                           serviced_cycles=ifmap_serviced_cycles,
+                                           demand_chunk=ifmap_demand_mat[chunk_start_line:i + 1, :],
+                                           start_stop_cycles=sram_start_stop_cycles['ifmap'])
+                    self.write_trace_chunk(trace_writer=filter_trace_writer,
+                                           serviced_cycles=filter_serviced_cycles,
+                                           demand_chunk=filter_demand_mat[chunk_start_line:i + 1, :],
+                                           start_stop_cycles=sram_start_stop_cycles['filter'])
+                    self.write_trace_chunk(trace_writer=ofmap_trace_writer,
+                                           serviced_cycles=ofmap_serviced_cycles,
+                                           demand_chunk=ofmap_demand_mat[chunk_start_line:i + 1, :],
+                                           start_stop_cycles=sram_start_stop_cycles['ofmap'])
+
+                    ifmap_serviced_cycles = []
+                    filter_serviced_cycles = []
+                    ofmap_serviced_cycles = []
+                    chunk_start_line = i + 1
+        finally:
+            ifmap_trace_writer.close()
+            filter_trace_writer.close()
+            ofmap_trace_writer.close()
+
+        if self.estimate_bandwidth_mode:
+            self.ifmap_buf.complete_all_prefetches()
+            self.filter_buf.complete_all_prefetches()
+
+        self.ofmap_buf.empty_all_buffers(last_ofmap_serviced_cycle)
+
+        self.ifmap_sram_start_cycle, self.ifmap_sram_stop_cycle = \
+            self.get_start_stop_from_tracked(sram_start_stop_cycles['ifmap'])
+        self.filter_sram_start_cycle, self.filter_sram_stop_cycle = \
+            self.get_start_stop_from_tracked(sram_start_stop_cycles['filter'])
+        self.ofmap_sram_start_cycle, self.ofmap_sram_stop_cycle = \
+            self.get_start_stop_from_tracked(sram_start_stop_cycles['ofmap'])
+
+        self.total_cycles = int(max_ofmap_serviced_cycle)
+
+        # END of serving demands from memory
+        self.traces_valid = True
+
+        # The DRAM traces are complete only after the buffers are drained
+        if self.trace_format == 'csv':
+            self.ifmap_buf.print_trace(self.ifmap_dram_filename)
+            self.filter_buf.print_trace(self.filter_dram_filename)
+            self.ofmap_buf.print_trace(self.ofmap_dram_filename)
+        else:
+            TraceWriter.write_trace_matrix(filename=self.ifmap_dram_filename,
+                                           trace_matrix=self.ifmap_buf.get_trace_matrix(),
+                                           trace_format=self.trace_format)
+            TraceWriter.write_trace_matrix(filename=self.filter_dram_filename,
+                                           trace_matrix=self.filter_buf.get_trace_matrix(),
+                                           trace_format=self.trace_format)
+            TraceWriter.write_trace_matrix(filename=self.ofmap_dram_filename,
+                                           trace_matrix=self.ofmap_buf.get_trace_matrix(),
+                                           trace_format=self.trace_format)
+
+    #
+    def open_trace_writer(self, filename):
+        trace_writer = TraceWriter()
+        trace_writer.set_params(filename=filename, trace_format=self.trace_format)
+        trace_writer.open()
+
+        return trace_writer
+
+    #
+    @staticmethod
+    def write_trace_chunk(trace_writer=None, serviced_cycles=None, demand_chunk=None, start_stop_cycles=None):
+        serviced_cycles_np = np.asarray(serviced_cycles).reshape((len(serviced_cycles), 1))
+        trace_chunk = np.concatenate((serviced_cycles_np, demand_chunk), axis=1)
+        trace_writer.write_chunk(trace_chunk)
+
+        # Lines with at least one valid address
+        valid_line_ids = np.nonzero(np.any(demand_chunk != -1, axis=1))[0]
+        if valid_line_ids.shape[0] == 0:
+            return
+
+        if start_stop_cycles[0] is None:
+            start_stop_cycles[0] = serviced_cycles_np[valid_line_ids[0]][0]
+        start_stop_cycles[1] = serviced_cycles_np[valid_line_ids[-1]][0]
+
+    #
+    @staticmethod
+    def get_start_stop_from_tracked(start_stop_cycles):
+        # Same defaults as the base class when there are no valid requests
+        if start_stop_cycles[0] is None:
+            return 0, 0
+        return start_stop_cycles[0], start_stop_cycles[1]
+
+    #
+    def get_ifmap_sram_start_stop_cycles(self):
+        assert self.traces_valid, 'Traces not generated yet'
+        return self.ifmap_sram_start_cycle, self.ifmap_sram_stop_cycle
+
+    #
+    def get_filter_sram_start_stop_cycles(self):
+        assert self.traces_valid, 'Traces not generated yet'
+        return self.filter_sram_start_cycle, self.filter_sram_stop_cycle
+
+    #
+    def get_ofmap_sram_start_stop_cycles(self):
+        assert self.traces_valid, 'Traces not generated yet'
+        return self.ofmap_sram_start_cycle, self.ofmap_sram_stop_cycle
+
+    # The trace matrices are read back from the files, only meant for small layers
+    def get_ifmap_sram_trace_matrix(self):
+        assert self.traces_valid, 'Traces not generated yet'
+        return self.read_trace_matrix(self.ifmap_sram_filename)
+
+    #
+    def get_filter_sram_trace_matrix(self):
+        assert self.traces_valid, 'Traces not generated yet'
+        return self.read_trace_matrix(self.filter_sram_filename)
+
+    #
+    def get_ofmap_sram_trace_matrix(self):
+        assert self.traces_valid, 'Traces not generated yet'
+        return self.read_trace_matrix(self.ofmap_sram_filename)
+
+    #
+    def read_trace_matrix(self, filename):
+        trace_reader = TraceReader()
+        trace_reader.set_params(filename=filename, trace_format=self.trace_format)
+
+        return np.concatenate(list(trace_reader.iter_chunks(chunk_lines=self.chunk_lines)), axis=0)
+
+    #
+    def get_sram_trace_matrices(self):
+        return self.get_ifmap_sram_trace_matrix(), \
+               self.get_filter_sram_trace_matrix(), \
+               self.get_ofmap_sram_trace_matrix()
+
+    # The traces are already on disk, copy them if asked for another file
+    def print_ifmap_sram_trace(self, filename):
+        assert self.traces_valid, 'Traces not generated yet'
+        self.copy_trace(self.ifmap_sram_filename, filename)
+
+    #
+    def print_filter_sram_trace(self, filename):
+        assert self.traces_valid, 'Traces not generated yet'
+        self.copy_trace(self.filter_sram_filename, filename)
+
+    #
+    def print_ofmap_sram_trace(self, filename):
+        assert self.traces_valid, 'Traces not generated yet'
+        self.copy_trace(self.ofmap_sram_filename, filename)
+
+    #
+    def print_ifmap_dram_trace(self, filename):
+        self.copy_trace(self.ifmap_dram_filename, filename)
+
+    #
+    def print_filter_dram_trace(self, filename):
+        self.copy_trace(self.filter_dram_filename, filename)
+
+    #
+    def print_ofmap_dram_trace(self, filename):
+        self.copy_trace(self.ofmap_dram_filename, filename)
+
+    #
+    @staticmethod
+    def copy_trace(src_filename, dst_filename):
+        if src_filename != dst_filename:
+            shutil.copyfile(src_filename, dst_filename)
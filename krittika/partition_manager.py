@@ -1,5 +1,7 @@
 import math
 
+import numpy as np
+
 from scalesim.topology_utils import topologies
 from krittika.config.krittika_config import KrittikaConfig
 from krittika.static_utilities import StaticUtilities
@@ -7,8 +9,13 @@ from krittika.static_utilities import StaticUtilities
 
 class PartitionManager:
     def __init__(self):
-        self.partition_table_cols = ['LayerID', 'InputParts', 'FilterParts', 'ComputeUnit', 'Dataflow']
+        self.partition_table_cols = ['LayerID', 'InputParts', 'FilterParts', 'ComputeUnit', 'Dataflow',
+                                     'BatchParts', 'ReductionParts']
         self.partition_table = []
+        # Entries of the conv and gemm layers by layer id
+        self.partition_entries = {}
+        # Rows of the heterogeneous layers the matmul cores run, by layer id
+        self.matmul_unit_rows = {}
         self.config = KrittikaConfig()
         self.workload = topologies()
 
@@ -37,97 +44,90 @@ class PartitionManager:
             self.create_opt_const_df_part_table()
         elif partition_mode == 'AUTO':
             self.create_opt_auto_part_table()
+        elif partition_mode == 'MEM_AWARE':
+            self.create_opt_mem_aware_part_table()
 
         self.partition_table_valid = True
 
     #
     def create_opt_auto_part_table(self):
-        num_cores = self.config.get_num_cores()
-        num_layers = self.workload.get_num_layers()
-        partitions_list = StaticUtilities.get_factors_as_pairs(num_cores)
         dataflow_list = ['os', 'is', 'ws']
-        layer_params = self.workload.get_layer_params()
-        for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
-                opt_unit, opt_dataflow, input_parts, filter_parts \
-                    = self.search_layer_opt_config( layer_id=lid,
-                                                part_list=partitions_list,
-                                                matmul_dataflow_list=dataflow_list,
-                                                vec_dataflow_list=dataflow_list
-                                                )
-
-                entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
-                self.partition_table += [entry]
+        self.add_all_layers_opt_entries(part_list_fn=self.get_all_factor_parts,
+                                        matmul_dataflow_list=dataflow_list,
+                                        vec_dataflow_list=dataflow_list)
+
+    # Same search space as AUTO, scored by the estimated end to end cycles including memory stalls
+    def create_opt_mem_aware_part_table(self):
+        dataflow_list = ['os', 'is', 'ws']
+        self.add_all_layers_opt_entries(part_list_fn=self.get_all_factor_parts,
+                                        matmul_dataflow_list=dataflow_list,
+                                        vec_dataflow_list=dataflow_list,
+                                        mem_aware=True)
 
     #
     def create_opt_const_df_part_table(self):
-        num_cores = self.config.get_num_cores()
-        num_layers = self.workload.get_num_layers()
-        partitions_list = StaticUtilities.get_factors_as_pairs(num_cores)
-        matmul_dataflow_list = [self.config.get_matmul_dataflow()]
-        vector_dataflow_list = [self.config.get_vector_dataflow()]
-
-        for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
-                opt_unit, opt_dataflow, input_parts, filter_parts \
-                    = self.search_layer_opt_config( layer_id=lid,
-                                                part_list=partitions_list,
-                                                matmul_dataflow_list=matmul_dataflow_list,
-                                                vec_dataflow_list=vector_dataflow_list
-                                                )
-
-                entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
-                self.partition_table += [entry]
+        self.add_all_layers_opt_entries(part_list_fn=self.get_all_factor_parts,
+                                        matmul_dataflow_list=[self.config.get_matmul_dataflow()],
+                                        vec_dataflow_list=[self.config.get_vector_dataflow()])
 
     #
     def create_opt_ifmap_part_table(self):
-        num_cores = self.config.get_num_cores()
-        num_layers = self.workload.get_num_layers()
-        partitions_list = [[num_cores, 1]]
-        matmul_dataflow_list = [self.config.get_matmul_dataflow()]
-        vector_dataflow_list = [self.config.get_vector_dataflow()]
-
-        for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
-                opt_unit, opt_dataflow, input_parts, filter_parts \
-                    = self.search_layer_opt_config(layer_id=lid,
-                                               part_list=partitions_list,
-                                               matmul_dataflow_list=matmul_dataflow_list,
-                                               vec_dataflow_list=vector_dataflow_list
-                                               )
-
-            entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
-            self.partition_table += [entry]
+        self.add_all_layers_opt_entries(part_list_fn=lambda num_cores: [[num_cores, 1]],
+                                        matmul_dataflow_list=[self.config.get_matmul_dataflow()],
+                                        vec_dataflow_list=[self.config.get_vector_dataflow()])
 
     #
     def create_opt_filter_part_table(self):
-        num_cores = self.config.get_num_cores()
-        num_layers = self.workload.get_num_layers()
-        partitions_list = [[1, num_cores]]
-        matmul_dataflow_list = [self.config.get_matmul_dataflow()]
-        vector_dataflow_list = [self.config.get_vector_dataflow()]
-
-        for lid in range(num_layers):
-            layer_params = self.workload.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
-                opt_unit, opt_dataflow, input_parts, filter_parts \
-                    = self.search_layer_opt_config(layer_id=lid,
-                                               part_list=partitions_list,
-                                               matmul_dataflow_list=matmul_dataflow_list,
-                                               vec_dataflow_list=vector_dataflow_list
-                                               )
-
-            entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow]
-            self.partition_table += [entry]
+        self.add_all_layers_opt_entries(part_list_fn=lambda num_cores: [[1, num_cores]],
+                                        matmul_dataflow_list=[self.config.get_matmul_dataflow()],
+                                        vec_dataflow_list=[self.config.get_vector_dataflow()])
 
     #
+    @staticmethod
+    def get_all_factor_parts(num_cores=1):
+        return StaticUtilities.get_factors_as_tuples(num_cores, num_factors=4)
+
+    # Adds the optimal entry of every conv and gemm layer, searched over the partitions of
+    # part_list_fn(number of cores). On heterogeneous chips each unit type is searched on its own
+    # cores and its share of the rows, see search_all_layers_unit_split, and a layer gets one entry per
+    # unit type running it. The rows of every batch are split between the unit types, the batch and
+    # the window are not split. The heterogeneous search always scores with get_mem_aware_runtime_batched
+    def add_all_layers_opt_entries(self, part_list_fn=None, matmul_dataflow_list=None, vec_dataflow_list=None,
+                                   mem_aware=False):
+        assert part_list_fn is not None
+
+        if self.config.is_heterogeneous():
+            layer_opt_configs_list = self.search_all_layers_unit_split(part_list_fn=part_list_fn,
+                                                                       matmul_dataflow_list=matmul_dataflow_list,
+                                                                       vec_dataflow_list=vec_dataflow_list)
+        else:
+            layer_opt_configs, _ = \
+                self.search_all_layers_opt_config(part_list=part_list_fn(self.config.get_num_cores()),
+                                                  matmul_dataflow_list=matmul_dataflow_list,
+                                                  vec_dataflow_list=vec_dataflow_list,
+                                                  mem_aware=mem_aware)
+            layer_opt_configs_list = [layer_opt_configs]
+
+        for layer_opt_configs in layer_opt_configs_list:
+            for lid in range(self.workload.get_num_layers()):
+                layer_params = self.workload.get_layer_params(lid)
+                if (layer_params[0] in ['conv', 'gemm']) and lid in layer_opt_configs:
+                    opt_unit, opt_dataflow, input_parts, filter_parts, batch_parts, reduction_parts = \
+                        layer_opt_configs[lid]
+
+                    entry = [lid, input_parts, filter_parts, opt_unit, opt_dataflow, batch_parts, reduction_parts]
+                    self.add_partition_entry(entry)
+
+        # The entries of a layer stay next to each other, matmul first
+        self.partition_table.sort(key=lambda entry: entry[0])
+
+    # Compute only search of one layer, the reference which search_all_layers_opt_config matches.
+    # part_list holds [input, filter], [input, filter, batch] or [input, filter, batch, reduction] partitions
     def search_layer_opt_config(self, layer_id=0, part_list=None,
                                 matmul_dataflow_list=None, vec_dataflow_list=None):
         assert not layer_id < 0
         assert part_list is not None
+        part_list = [list(part) + [1] * (4 - len(part)) for part in part_list]
 
         opt_matmul_part_entries = []
         opt_vector_part_entries = []
@@ -157,63 +157,296 @@ class PartitionManager:
         else:
             return opt_vector_part_entries
 
-    #
-    def search_matmul_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None):
-        min_runtime = 10 ** 10
-        M, N, K = self.workload.get_transformed_mnk_dimensions(layer_id)
-
-        arr_row, arr_col = self.config.get_matmul_dims()
+    # Batched counterpart of search_layer_opt_config, all the conv and gemm layers are scored
+    # across partitions and dataflows at once.
+    # Returns the optimal entry and its estimated cycles of each layer by layer id
+    # With mem_aware, the cost is the estimate of get_mem_aware_runtime_batched instead of compute only
+    # part_list holds [input, filter], [input, filter, batch] or [input, filter, batch, reduction] partitions.
+    # The batch groups of a layer run side by side, each core runs its partition of every batch of its
+    # group back to back. The reduction partitions split the window, their partial sums are added up after
+    # With a unit, only that unit type is searched on unit_rows rows of every layer, in the order of
+    # get_all_transformed_mnk_dimensions. Layers without rows for the unit get no entry
+    def search_all_layers_opt_config(self, part_list=None, matmul_dataflow_list=None, vec_dataflow_list=None,
+                                     mem_aware=False, unit=None, unit_rows=None):
+        assert part_list is not None
+        assert unit in [None, 'matmul', 'vector'], 'Invalid compute unit: ' + str(unit)
+        part_list = [list(part) + [1] * (4 - len(part)) for part in part_list]
+
+        layer_ids, mnk_dims = self.workload.get_all_transformed_mnk_dimensions()
+        if len(layer_ids) == 0:
+            return {}, {}
+
+        # Layers along the rows, partitions along the columns
+        mnk_dims = np.asarray(mnk_dims, dtype=np.int64)
+        M = mnk_dims[:, 0:1]
+        N = mnk_dims[:, 1:2]
+        K = mnk_dims[:, 2:3]
+
+        # The memory model works on the operand matrices, M above is ofmap pixels x filters
+        ifmap_rows = M // np.maximum(N, 1)
+        ifmap_unique_words = []
+        for lid in layer_ids:
+            ifmap_h, ifmap_w = self.workload.get_layer_params(lid)[2:4]
+            num_ch = self.workload.get_layer_params(lid)[6]
+            ifmap_unique_words += [ifmap_h * ifmap_w * num_ch]
+        ifmap_unique_words = np.asarray(ifmap_unique_words, dtype=np.int64).reshape(M.shape)
+
+        if unit is not None:
+            assert unit_rows is not None, 'Need the rows of the ' + unit + ' cores'
+            unit_rows = np.asarray(unit_rows, dtype=np.int64).reshape(M.shape)
+            ifmap_unique_words = -(-ifmap_unique_words * unit_rows // np.maximum(ifmap_rows, 1))
+            ifmap_rows = unit_rows
+            M = unit_rows * N
+
+        # SRAM sizes and interface bandwidths in words of the precisions of each layer
+        sram_words = []
+        bw_words = []
+        for lid in layer_ids:
+            layer_precisions = self.workload.get_layer_precisions(lid)
+            sram_words += [self.config.get_per_unit_sram_sizes_words(precisions=layer_precisions)]
+            bw_words += [self.config.get_interface_bandwidths_words(precisions=layer_precisions)]
+        sram_words = np.asarray(sram_words, dtype=np.int64)
+        bw_words = np.asarray(bw_words, dtype=np.int64)
+        mem_words = (sram_words[:, 0:1], sram_words[:, 1:2], bw_words[:, 0:1], bw_words[:, 1:2], bw_words[:, 2:3])
+
+        # The compute only search keeps the starting bound of the scalar search
+        max_runtime = 10 ** 10
+        if mem_aware:
+            max_runtime = None
+
+        part_arr = np.asarray(part_list, dtype=np.int64)
+        input_parts = part_arr[:, 0].reshape((1, part_arr.shape[0]))
+        filter_parts = part_arr[:, 1].reshape((1, part_arr.shape[0]))
+        batch_parts = part_arr[:, 2].reshape((1, part_arr.shape[0]))
+        reduction_parts = part_arr[:, 3].reshape((1, part_arr.shape[0]))
+
+        # Batches run by the busiest core of each layer and partition
+        batches = np.asarray([self.workload.get_layer_batch(lid) for lid in layer_ids], dtype=np.int64)
+        group_batches = -(-batches.reshape(M.shape) // batch_parts)
+
+        # Window and ifmap words of every core of a reduction group, and the cycles to add up the partial sums.
+        # The window is not split finer than one word per core
+        reduction_parts = np.minimum(reduction_parts, K)
+        part_K = -(-K // reduction_parts)
+        part_ifmap_unique_words = -(-ifmap_unique_words // reduction_parts)
+        link_bw, link_latency = self.config.get_interconnect_link_params()
+        psum_words = -(-ifmap_rows // input_parts) * -(-N // filter_parts)
+        reduction_cycles = self.get_reduction_levels(reduction_parts) * \
+            self.get_reduction_level_cycles(psum_words=psum_words, link_bw=link_bw, link_latency=link_latency,
+                                            simd_length=self.config.get_simd_length())
+
+        opt_matmul_runtimes = []
+        opt_vector_runtimes = []
+        opt_matmul_part_entries = []
+        opt_vector_part_entries = []
 
-        opt_df = 'os'
-        opt_input_part = 1
-        opt_filter_part = 1
+        use_matmul, use_vector = self.config.get_compute_unit_valids()
+        if unit is not None:
+            use_matmul, use_vector = unit == 'matmul', unit == 'vector'
 
-        for part_pair in part_list:
-            input_part = part_pair[0]
-            filter_part = part_pair[1]
+        if use_matmul:
+            assert matmul_dataflow_list is not None
+            arr_row, arr_col = self.config.get_matmul_dims()
+
+            runtimes = []
+            for df in matmul_dataflow_list:
+                if mem_aware:
+                    runtime = self.get_mem_aware_runtime_batched(ifmap_rows, N, part_K, part_ifmap_unique_words, df,
+                                                                 arr_row, arr_col, input_parts, filter_parts,
+                                                                 mem_words)
+                else:
+                    runtime = self.get_mat_mul_analytical_runtime_batched(M, N, part_K, df, arr_row, arr_col,
+                                                                          input_parts, filter_parts)
+                runtimes += [group_batches * (runtime + reduction_cycles)]
+            opt_matmul_runtimes, opt_matmul_part_entries = \
+                self.get_batched_opt_entries(unit='matmul', runtimes=np.stack(runtimes, axis=2),
+                                             part_list=part_list, dataflow_list=matmul_dataflow_list,
+                                             max_runtime=max_runtime)
 
-            for df in dataflow_list:
-                runtime = self.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col, input_part, filter_part)
+        if use_vector:
+            assert vec_dataflow_list is not None
+            arr_row, arr_col = self.get_unit_array_dims(compute_unit='vector')
+
+            runtimes = []
+            for df in vec_dataflow_list:
+                if mem_aware:
+                    runtime = self.get_mem_aware_runtime_batched(ifmap_rows, N, part_K, part_ifmap_unique_words, df,
+                                                                 arr_row, arr_col, input_parts, filter_parts,
+                                                                 mem_words)
+                else:
+                    runtime = self.get_mat_mul_analytical_runtime_batched(M, N, part_K, df, arr_row, arr_col,
+                                                                          input_parts, filter_parts)
+                runtimes += [group_batches * (runtime + reduction_cycles)]
+            opt_vector_runtimes, opt_vector_part_entries = \
+                self.get_batched_opt_entries(unit='vector', runtimes=np.stack(runtimes, axis=2),
+                                             part_list=part_list, dataflow_list=vec_dataflow_list,
+                                             max_runtime=max_runtime)
+
+        layer_opt_configs = {}
+        layer_opt_runtimes = {}
+        for idx, lid in enumerate(layer_ids):
+            if ifmap_rows[idx, 0] == 0:
+                continue
+
+            if use_matmul and use_vector:
+                if opt_matmul_runtimes[idx] < opt_vector_runtimes[idx]:
+                    layer_opt_configs[lid] = opt_matmul_part_entries[idx]
+                    layer_opt_runtimes[lid] = int(opt_matmul_runtimes[idx])
+                else:
+                    layer_opt_configs[lid] = opt_vector_part_entries[idx]
+                    layer_opt_runtimes[lid] = int(opt_vector_runtimes[idx])
+            elif use_matmul:
+                layer_opt_configs[lid] = opt_matmul_part_entries[idx]
+                layer_opt_runtimes[lid] = int(opt_matmul_runtimes[idx])
+            else:
+                layer_opt_configs[lid] = opt_vector_part_entries[idx]
+                layer_opt_runtimes[lid] = int(opt_vector_runtimes[idx])
 
-                if runtime < min_runtime:
-                    min_runtime = runtime
-                    opt_df = df
-                    opt_input_part = input_part
-                    opt_filter_part = filter_part
+        return layer_opt_configs, layer_opt_runtimes
 
-        return min_runtime, ['matmul', opt_df, opt_input_part, opt_filter_part]
+    #
+    def search_matmul_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None):
+        arr_row, arr_col = self.get_unit_array_dims(compute_unit='matmul')
+        return self.search_unit_layer_opt_config(layer_id=layer_id, unit='matmul', part_list=part_list,
+                                                 dataflow_list=dataflow_list, arr_row=arr_row, arr_col=arr_col)
 
     #
     def search_vector_layer_opt_config(self, layer_id=0, part_list=None, dataflow_list=None):
+        arr_row, arr_col = self.get_unit_array_dims(compute_unit='vector')
+        return self.search_unit_layer_opt_config(layer_id=layer_id, unit='vector', part_list=part_list,
+                                                 dataflow_list=dataflow_list, arr_row=arr_row, arr_col=arr_col)
+
+    # The batch groups of the layer run side by side, the cores splitting the window add up their
+    # partial sums after, see search_all_layers_opt_config
+    def search_unit_layer_opt_config(self, layer_id=0, unit='matmul', part_list=None, dataflow_list=None,
+                                     arr_row=1, arr_col=1):
         min_runtime = 10 ** 10
         M, N, K = self.workload.get_transformed_mnk_dimensions(layer_id)
-
-        num_vec_units = self.config.get_vector_dim()
-
-        opt_df = 'os'
-        opt_input_part = 1
-        opt_filter_part = 1
-
-        for part_pair in part_list:
-            input_part = part_pair[0]
-            filter_part = part_pair[1]
+        ifmap_rows = M // max(N, 1)
+        num_batches = self.workload.get_layer_batch(layer_id)
+        link_bw, link_latency = self.config.get_interconnect_link_params()
+
+        opt_entry = [unit, 'os', 1, 1, 1, 1]
+
+        for input_part, filter_part, batch_part, reduction_part in part_list:
+            # The window is not split finer than one word per core
+            num_reduction = min(reduction_part, K)
+            part_K = math.ceil(K / num_reduction)
+            psum_words = math.ceil(ifmap_rows / input_part) * math.ceil(N / filter_part)
+            reduction_cycles = int(self.get_reduction_levels(num_reduction)) * \
+                self.get_reduction_level_cycles(psum_words=psum_words, link_bw=link_bw, link_latency=link_latency,
+                                                simd_length=self.config.get_simd_length())
+            group_batches = math.ceil(num_batches / batch_part)
 
             for df in dataflow_list:
-                if df == 'os' or df == 'is':
-                    arr_row, arr_col = [num_vec_units, 1]
-                else:   # df == 'ws':
-                    arr_row, arr_col = [1, num_vec_units]
-
-                runtime = self.get_mat_mul_analytical_runtime(M, N, K, df, arr_row, arr_col, input_part,
+                runtime = self.get_mat_mul_analytical_runtime(M, N, part_K, df, arr_row, arr_col, input_part,
                                                               filter_part)
+                runtime = group_batches * (runtime + reduction_cycles)
 
                 if runtime < min_runtime:
                     min_runtime = runtime
-                    opt_df = df
-                    opt_input_part = input_part
-                    opt_filter_part = filter_part
+                    opt_entry = [unit, df, input_part, filter_part, batch_part, reduction_part]
+
+        return min_runtime, opt_entry
+
+    # Splits the rows of every conv and gemm layer of a heterogeneous chip between the unit types so
+    # that both finish together. The vector cores reach a smaller share of their peak MACs than the matmul
+    # cores, hence the split follows the estimated cycles of each unit searched on its cores and rows.
+    # The matmul rows are binary searched for where the matmul cores become the slower unit, and the
+    # split around it with the fewest cycles of the slower unit is kept. When it is not faster than the
+    # matmul cores alone, the layer runs on the matmul cores only and the vector cores stay idle.
+    # The entries and the cycles come from get_mem_aware_runtime_batched in every mode, the compute only
+    # estimate does not follow the cycles of the cores closely enough to balance them.
+    # Returns the optimal entries of the matmul and of the vector cores, by layer id
+    def search_all_layers_unit_split(self, part_list_fn=None, matmul_dataflow_list=None, vec_dataflow_list=None):
+        layer_ids, mnk_dims = self.workload.get_all_transformed_mnk_dimensions()
+        if len(layer_ids) == 0:
+            return [{}, {}]
+
+        mnk_dims = np.asarray(mnk_dims, dtype=np.int64)
+        num_rows = mnk_dims[:, 0] // np.maximum(mnk_dims[:, 1], 1)
+        search_args = {'layer_ids': layer_ids, 'num_rows': num_rows, 'part_list_fn': part_list_fn,
+                       'matmul_dataflow_list': matmul_dataflow_list, 'vec_dataflow_list': vec_dataflow_list,
+                       'mem_aware': True}
+
+        # Fewest matmul rows with which the matmul cores are not faster than the vector cores
+        low_rows = np.zeros_like(num_rows)
+        high_rows = num_rows.copy()
+        while np.any(low_rows < high_rows):
+            mid_rows = (low_rows + high_rows) // 2
+            _, unit_runtimes_list = self.search_all_layers_unit_runtimes(matmul_rows=mid_rows, **search_args)
+            matmul_slower = unit_runtimes_list[0] >= unit_runtimes_list[1]
+
+            searching = low_rows < high_rows
+            high_rows = np.where(searching & matmul_slower, mid_rows, high_rows)
+            low_rows = np.where(searching & ~matmul_slower, mid_rows + 1, low_rows)
+
+        # The matmul cores alone, then the splits on both sides of the crossing
+        opt_rows = num_rows
+        _, unit_runtimes_list = self.search_all_layers_unit_runtimes(matmul_rows=opt_rows, **search_args)
+        opt_runtimes = np.maximum(unit_runtimes_list[0], unit_runtimes_list[1])
+        for matmul_rows in [low_rows, np.maximum(low_rows - 1, 0)]:
+            _, unit_runtimes_list = self.search_all_layers_unit_runtimes(matmul_rows=matmul_rows, **search_args)
+            runtimes = np.maximum(unit_runtimes_list[0], unit_runtimes_list[1])
+            opt_rows = np.where(runtimes < opt_runtimes, matmul_rows, opt_rows)
+            opt_runtimes = np.minimum(runtimes, opt_runtimes)
+
+        for idx, lid in enumerate(layer_ids):
+            self.matmul_unit_rows[lid] = int(opt_rows[idx])
+
+        layer_opt_configs_list, _ = self.search_all_layers_unit_runtimes(matmul_rows=opt_rows, **search_args)
+        return layer_opt_configs_list
+
+    # Optimal entries and estimated cycles of the matmul cores on matmul_rows rows of every layer and of
+    # the vector cores on the others. A unit without rows takes no cycles
+    def search_all_layers_unit_runtimes(self, layer_ids=None, num_rows=None, matmul_rows=None, part_list_fn=None,
+                                        matmul_dataflow_list=None, vec_dataflow_list=None, mem_aware=False):
+        num_matmul_cores, num_vector_cores = self.config.get_unit_core_counts()
+        unit_searches = [('matmul', num_matmul_cores, matmul_rows),
+                         ('vector', num_vector_cores, num_rows - matmul_rows)]
+
+        layer_opt_configs_list = []
+        unit_runtimes_list = []
+        for unit, num_cores, unit_rows in unit_searches:
+            partitions_list = [part for part in part_list_fn(num_cores) if all(x == 1 for x in part[2:])]
+            layer_opt_configs, layer_opt_runtimes = \
+                self.search_all_layers_opt_config(part_list=partitions_list,
+                                                  matmul_dataflow_list=matmul_dataflow_list,
+                                                  vec_dataflow_list=vec_dataflow_list,
+                                                  mem_aware=mem_aware,
+                                                  unit=unit,
+                                                  unit_rows=unit_rows)
+
+            layer_opt_configs_list += [layer_opt_configs]
+            unit_runtimes_list += [np.asarray([layer_opt_runtimes.get(lid, 0) for lid in layer_ids],
+                                              dtype=np.int64)]
+
+        return layer_opt_configs_list, unit_runtimes_list
+
+    #
+    @staticmethod
+    def get_batched_opt_entries(unit='matmul', runtimes=None, part_list=None, dataflow_list=None,
+                                max_runtime=10 ** 10):
+        # runtimes is indexed by [layer, partition, dataflow]. argmin picks the first minimum in the
+        # partition major order, same as the strict less than comparison in the scalar search
+        num_layers, num_parts, num_dataflows = runtimes.shape
+        flat_runtimes = runtimes.reshape((num_layers, num_parts * num_dataflows))
+        opt_ids = np.argmin(flat_runtimes, axis=1)
+        min_runtimes = flat_runtimes[np.arange(num_layers), opt_ids]
+
+        opt_part_entries = []
+        for idx in range(num_layers):
+            # The scalar search starts from a runtime of 10 ** 10 and the default entry
+            if max_runtime is None or min_runtimes[idx] < max_runtime:
+                part_id, df_id = divmod(int(opt_ids[idx]), num_dataflows)
+                opt_part_entries += [[unit, dataflow_list[df_id]] + list(part_list[part_id])]
+            else:
+                opt_part_entries += [[unit, 'os', 1, 1, 1, 1]]
+
+        if max_runtime is None:
+            return min_runtimes, opt_part_entries
 
-        return min_runtime, ['vector', opt_df, opt_input_part, opt_filter_part]
+        return np.minimum(min_runtimes, max_runtime), opt_part_entries
 
     #
     @staticmethod
@@ -234,8 +467,9 @@ class PartitionManager:
             max_input_part = math.floor(M/arr_col)
             max_filter_part = N
 
-        input_part = min(max_input_part, input_part)
-        filter_part = min(max_filter_part, filt_part)
+        # Operands smaller than the array are not split
+        input_part = max(min(max_input_part, input_part), 1)
+        filter_part = max(min(max_filter_part, filt_part), 1)
 
         Mprime = math.ceil(M/input_part)
         Nprime = math.ceil(N/filter_part)
@@ -252,46 +486,398 @@ class PartitionManager:
 
         return runtime
 
+    # Same model as get_mat_mul_analytical_runtime over integer arrays, which are broadcast together
+    @staticmethod
+    def get_mat_mul_analytical_runtime_batched(M=None, N=None, K=None, df='os',
+                                               arr_row=1, arr_col=1,
+                                               input_part=None, filt_part=None):
+        assert df in ['os', 'is', 'ws']
+
+        if df == 'os':
+            max_input_part = M // arr_row
+            max_filter_part = N // arr_col
+
+        elif df == 'ws':
+            max_input_part = M
+            max_filter_part = N // arr_col
+
+        else: # df == 'is'
+            max_input_part = M // arr_col
+            max_filter_part = N
+
+        input_part = np.maximum(np.minimum(max_input_part, input_part), 1)
+        filter_part = np.maximum(np.minimum(max_filter_part, filt_part), 1)
+
+        # Integer ceil division
+        Mprime = -(-M // input_part)
+        Nprime = -(-N // filter_part)
+        K = np.broadcast_to(K, Mprime.shape)
+
+        if df == 'os':
+            Sr, Sc, T = [Mprime, Nprime, K]
+        elif df == 'ws':
+            Sr, Sc, T = [K, Nprime, Mprime]
+        else: # df == 'is'
+            Sr, Sc, T = [K, Mprime, Nprime]
+
+        runtime = 2 * arr_row + arr_col + T - 2
+        runtime = runtime * (-(-Sr // arr_row)) * (-(-Sc // arr_col))
+
+        return runtime
+
+    # Estimated end to end cycles of the largest partition of a layer, the slowest core sets the
+    # layer runtime. Same model as AnalyticalLayerSim:
+    # 1. Compute cycles from the folds of the partition on the array
+    # 2. SRAM reads from the dataflow, the streaming operand is read once per fold along the other dimension
+    # 3. DRAM reads, an operand is fetched once if it fits in the SRAM, else once per SRAM read
+    # 4. DRAM cycles at the per core interface bandwidths, the layer takes the longer of compute and DRAM
+    # mem_words holds the ifmap and filter SRAM sizes and the three bandwidths in words of each layer,
+    # the config ones at the default precisions are used when not given
+    def get_mem_aware_runtime_batched(self, ifmap_rows=None, N=None, K=None, ifmap_unique_words=None, df='os',
+                                      arr_row=1, arr_col=1, input_part=None, filt_part=None, mem_words=None):
+        assert df in ['os', 'is', 'ws']
+
+        # Partitions as cut by SingleLayerSim
+        part_rows = -(-ifmap_rows // input_part)
+        part_cols = -(-N // filt_part)
+        K = np.broadcast_to(K, part_rows.shape)
+
+        if df == 'os':
+            Sr, Sc, T = [part_rows, part_cols, K]
+        elif df == 'ws':
+            Sr, Sc, T = [K, part_cols, part_rows]
+        else: # df == 'is'
+            Sr, Sc, T = [K, part_rows, part_cols]
+
+        row_folds = -(-Sr // arr_row)
+        col_folds = -(-Sc // arr_col)
+        compute_cycles = (2 * arr_row + arr_col + T - 2) * row_folds * col_folds
+
+        if df == 'os':
+            ifmap_sram_reads = part_rows * K * col_folds
+            filter_sram_reads = part_cols * K * row_folds
+            ofmap_sram_writes = part_rows * part_cols
+        elif df == 'ws':
+            ifmap_sram_reads = part_rows * K * col_folds
+            filter_sram_reads = part_cols * K
+            ofmap_sram_writes = part_rows * part_cols * row_folds
+        else: # df == 'is'
+            ifmap_sram_reads = part_rows * K
+            filter_sram_reads = part_cols * K * col_folds
+            ofmap_sram_writes = part_rows * part_cols * row_folds
+
+        # Overlapping convolution windows read the same ifmap words
+        part_ifmap_unique_words = np.minimum(part_rows * K,
+                                             -(-ifmap_unique_words * part_rows // np.maximum(ifmap_rows, 1)))
+        part_filter_unique_words = K * part_cols
+
+        if mem_words is None:
+            ifmap_buf_words, filter_buf_words, _ = self.config.get_per_unit_sram_sizes_words()
+            ifmap_bw, filter_bw, ofmap_bw = self.config.get_interface_bandwidths_words()
+        else:
+            ifmap_buf_words, filter_buf_words, ifmap_bw, filter_bw, ofmap_bw = mem_words
+
+        ifmap_dram_reads = np.where(part_ifmap_unique_words <= ifmap_buf_words, part_ifmap_unique_words,
+                                    np.maximum(ifmap_sram_reads, part_ifmap_unique_words))
+        filter_dram_reads = np.where(part_filter_unique_words <= filter_buf_words, part_filter_unique_words,
+                                     np.maximum(filter_sram_reads, part_filter_unique_words))
+        ofmap_dram_writes = ofmap_sram_writes
+
+        dram_cycles = np.maximum(np.maximum(-(-ifmap_dram_reads // ifmap_bw),
+                                            -(-filter_dram_reads // filter_bw)),
+                                 -(-ofmap_dram_writes // ofmap_bw))
+
+        return np.maximum(compute_cycles, dram_cycles)
+
+    # Bounds (start, end) of the chunks of num_rows rows cut for num_parts cores:
+    # 1. CEIL: chunks of ceil(num_rows / num_parts) rows, the last cores get the remainder or nothing
+    # 2. EVEN: the chunks differ by at most one row
+    # 3. TILE: whole tiles of tile_rows rows are spread evenly, the partial tile goes to the last busy core
+    @staticmethod
+    def get_chunk_bounds(num_rows=1, num_parts=1, scheme='CEIL', tile_rows=1):
+        assert scheme in ['CEIL', 'EVEN', 'TILE'], 'Invalid chunking scheme: ' + str(scheme)
+        assert num_parts > 0, 'Number of parts must be greater than 0'
+
+        if scheme == 'CEIL':
+            rows_per_part = math.ceil(num_rows / num_parts)
+            chunk_rows = [rows_per_part] * num_parts
+        elif scheme == 'EVEN':
+            base_rows, extra_rows = divmod(num_rows, num_parts)
+            chunk_rows = [base_rows + 1] * extra_rows + [base_rows] * (num_parts - extra_rows)
+        else:
+            base_tiles, extra_tiles = divmod(math.ceil(num_rows / tile_rows), num_parts)
+            chunk_rows = [(base_tiles + 1) * tile_rows] * extra_tiles + \
+                         [base_tiles * tile_rows] * (num_parts - extra_tiles)
+
+        bounds = []
+        row_start = 0
+        for rows in chunk_rows:
+            row_end = min(row_start + rows, num_rows)
+            bounds += [(min(row_start, num_rows), row_end)]
+            row_start += rows
+
+        return bounds
+
+    # Array rows and columns of a unit. The vector unit is a column for every dataflow, as ComputeNode
+    # hands it over to scalesim
+    def get_unit_array_dims(self, compute_unit='matmul', dataflow='os'):
+        if compute_unit == 'matmul':
+            return self.config.get_matmul_dims()
+
+        return self.config.get_vector_dim(), 1
+
+    # Row and column chunks (start, end) of the input and filter partitions of one entry of a layer,
+    # for num_rows rows of the ifmap operand matrix and num_cols filters.
+    # Without balanced partitions the chunks are the CEIL ones. With them, the CEIL, EVEN and TILE chunks
+    # of the rows and of the columns are estimated with get_mem_aware_runtime_batched. The tiles follow
+    # the array dimension the rows and the columns map onto in the dataflow, and temporal dimensions
+    # have tiles of one row. The pair with the fewest cycles on the slowest core is kept, then the one
+    # with the fewest cycles over all the cores, which leaves the other cores idle for longer.
+    # Chunks leaving more cores without work than the CEIL ones are not tried
+    def get_part_bounds(self, layer_id=0, unit_entry=None, num_rows=1, num_cols=1, window_sz=1,
+                        num_reduction_part=1):
+        assert unit_entry is not None
+        _, num_input_part, num_filter_part, compute_unit, dataflow = unit_entry[:5]
+
+        if not self.config.get_balanced_partitions():
+            return self.get_chunk_bounds(num_rows=num_rows, num_parts=num_input_part), \
+                self.get_chunk_bounds(num_rows=num_cols, num_parts=num_filter_part)
+
+        arr_row, arr_col = self.get_unit_array_dims(compute_unit=compute_unit, dataflow=dataflow)
+        row_tile, col_tile = {'os': (arr_row, arr_col), 'ws': (1, arr_col), 'is': (arr_col, 1)}[dataflow]
+
+        # Ifmap words of the layer, overlapping convolution windows read the same words
+        layer_rows, _, _ = self.workload.get_operand_matrix_dims(layer_id=layer_id)
+        ifmap_h, ifmap_w = self.workload.get_layer_params(layer_id)[2:4]
+        num_ch = self.workload.get_layer_params(layer_id)[6]
+        layer_precisions = self.workload.get_layer_precisions(layer_id)
+        sram_words = self.config.get_per_unit_sram_sizes_words(precisions=layer_precisions)
+        bw_words = self.config.get_interface_bandwidths_words(precisions=layer_precisions)
+        mem_words = (sram_words[0], sram_words[1], bw_words[0], bw_words[1], bw_words[2])
+        part_window_sz = math.ceil(window_sz / num_reduction_part)
+
+        row_bounds_list = self.get_busy_chunk_bounds_list(num_rows=num_rows, num_parts=num_input_part,
+                                                          tile_rows=row_tile)
+        col_bounds_list = self.get_busy_chunk_bounds_list(num_rows=num_cols, num_parts=num_filter_part,
+                                                          tile_rows=col_tile)
+
+        opt_bounds = None
+        opt_cycles = None
+        for row_bounds in row_bounds_list:
+            part_rows = np.asarray([end - start for start, end in row_bounds], dtype=np.int64).reshape((-1, 1))
+            part_ifmap_words = -(-ifmap_h * ifmap_w * num_ch * part_rows // max(layer_rows, 1))
+
+            for col_bounds in col_bounds_list:
+                part_cols = np.asarray([end - start for start, end in col_bounds], dtype=np.int64).reshape((1, -1))
+
+                core_cycles = self.get_mem_aware_runtime_batched(ifmap_rows=part_rows, N=part_cols, K=part_window_sz,
+                                                                 ifmap_unique_words=part_ifmap_words, df=dataflow,
+                                                                 arr_row=arr_row, arr_col=arr_col,
+                                                                 input_part=1, filt_part=1, mem_words=mem_words)
+                # Cores without rows or columns stay idle
+                core_cycles = np.where((part_rows > 0) & (part_cols > 0), core_cycles, 0)
+
+                cycles = (int(np.max(core_cycles)), int(np.sum(core_cycles)))
+                if opt_cycles is None or cycles < opt_cycles:
+                    opt_cycles = cycles
+                    opt_bounds = (row_bounds, col_bounds)
+
+        return opt_bounds
+
+    # CEIL, EVEN and TILE chunks, leaving out the ones with more empty chunks than the CEIL ones
+    @staticmethod
+    def get_busy_chunk_bounds_list(num_rows=1, num_parts=1, tile_rows=1):
+        ceil_bounds = PartitionManager.get_chunk_bounds(num_rows=num_rows, num_parts=num_parts)
+        max_empty = len([start for start, end in ceil_bounds if end <= start])
+
+        bounds_list = [ceil_bounds]
+        for scheme in ['EVEN', 'TILE']:
+            bounds = PartitionManager.get_chunk_bounds(num_rows=num_rows, num_parts=num_parts,
+                                                       scheme=scheme, tile_rows=tile_rows)
+            if len([start for start, end in bounds if end <= start]) <= max_empty:
+                bounds_list += [bounds]
+
+        return bounds_list
+
+    # Chunks of the first entry of a layer over all the rows of its operand matrices
+    def get_layer_part_bounds(self, layer_id=0):
+        num_rows, window_sz, num_cols = self.workload.get_operand_matrix_dims(layer_id=layer_id)
+        return self.get_part_bounds(layer_id=layer_id, unit_entry=self.get_layer_partition_entry(layer_id),
+                                    num_rows=num_rows, num_cols=num_cols, window_sz=window_sz,
+                                    num_reduction_part=min(self.get_layer_reduction_parts(layer_id), window_sz))
+
     #
-    def get_layer_partitions(self, layer_id=0):
+    def add_partition_entry(self, entry):
+        self.partition_table += [entry]
+
+        if entry[0] not in self.partition_entries:
+            self.partition_entries[entry[0]] = []
+        assert entry[3] not in [e[3] for e in self.partition_entries[entry[0]]], \
+            'Layer ' + str(entry[0]) + ' has two ' + entry[3] + ' entries'
+        self.partition_entries[entry[0]] += [entry]
+
+    # The table only holds the conv and gemm layers, entries are found by layer id.
+    # Returns the first entry of the heterogeneous layers, the one of the matmul cores
+    def get_layer_partition_entry(self, layer_id=0):
+        return self.get_layer_unit_entries(layer_id)[0]
+
+    # One entry per unit type running the layer, matmul first
+    def get_layer_unit_entries(self, layer_id=0):
         assert self.partition_table_valid, 'Partition table is not valid'
+        assert layer_id in self.partition_entries, 'No partition entry for layer ' + str(layer_id)
+
+        return sorted(self.partition_entries[layer_id], key=lambda entry: entry[3] != 'matmul')
 
-        partition_data = self.partition_table[layer_id]
+    #
+    def is_heterogeneous_layer(self, layer_id=0):
+        return len(self.get_layer_unit_entries(layer_id)) > 1
+
+    # Entries of a layer with the rows of the ifmap operand matrix they run, as (entry, first row, rows).
+    # The matmul cores of a heterogeneous layer run the first rows, see get_layer_matmul_unit_rows
+    def get_layer_unit_row_splits(self, layer_id=0, num_rows=1):
+        unit_entries = self.get_layer_unit_entries(layer_id)
+        if len(unit_entries) == 1:
+            return [(unit_entries[0], 0, num_rows)]
+
+        matmul_rows = min(self.get_layer_matmul_unit_rows(layer_id), num_rows)
+        return [(unit_entries[0], 0, matmul_rows), (unit_entries[1], matmul_rows, num_rows - matmul_rows)]
+
+    # Rows of a heterogeneous layer the matmul cores run. The search modes set them with the entries,
+    # the layers of a user table are split for their entries, see get_entries_matmul_unit_rows
+    def get_layer_matmul_unit_rows(self, layer_id=0):
+        assert self.is_heterogeneous_layer(layer_id), 'Layer ' + str(layer_id) + ' is not heterogeneous'
+
+        if layer_id not in self.matmul_unit_rows:
+            self.matmul_unit_rows[layer_id] = self.get_entries_matmul_unit_rows(layer_id)
+        return self.matmul_unit_rows[layer_id]
+
+    # Every split of the rows of a layer between the matmul and the vector entries is estimated with
+    # get_mem_aware_runtime_batched, and the one with the fewest cycles of the slower unit is kept.
+    # All the rows go to the matmul cores unless a split is faster than them alone
+    def get_entries_matmul_unit_rows(self, layer_id=0):
+        matmul_entry, vector_entry = self.get_layer_unit_entries(layer_id)
+        num_rows, window_sz, num_filt = self.workload.get_operand_matrix_dims(layer_id=layer_id)
+
+        ifmap_h, ifmap_w = self.workload.get_layer_params(layer_id)[2:4]
+        num_ch = self.workload.get_layer_params(layer_id)[6]
+        layer_precisions = self.workload.get_layer_precisions(layer_id)
+        sram_words = self.config.get_per_unit_sram_sizes_words(precisions=layer_precisions)
+        bw_words = self.config.get_interface_bandwidths_words(precisions=layer_precisions)
+        mem_words = (sram_words[0], sram_words[1], bw_words[0], bw_words[1], bw_words[2])
+
+        matmul_rows = np.arange(num_rows + 1, dtype=np.int64)
+        runtimes = np.zeros(num_rows + 1, dtype=np.int64)
+        for unit_entry, unit_rows in [(matmul_entry, matmul_rows), (vector_entry, num_rows - matmul_rows)]:
+            _, input_parts, filter_parts, compute_unit, dataflow = unit_entry[:5]
+            arr_row, arr_col = self.get_unit_array_dims(compute_unit=compute_unit, dataflow=dataflow)
+            unit_ifmap_words = -(-ifmap_h * ifmap_w * num_ch * unit_rows // max(num_rows, 1))
+
+            unit_runtimes = self.get_mem_aware_runtime_batched(ifmap_rows=unit_rows, N=num_filt, K=window_sz,
+                                                               ifmap_unique_words=unit_ifmap_words, df=dataflow,
+                                                               arr_row=arr_row, arr_col=arr_col,
+                                                               input_part=input_parts, filt_part=filter_parts,
+                                                               mem_words=mem_words)
+            runtimes = np.maximum(runtimes, np.where(unit_rows > 0, unit_runtimes, 0))
+
+        opt_rows = int(np.argmin(runtimes))
+        if runtimes[opt_rows] < runtimes[num_rows]:
+            return opt_rows
+        return num_rows
+
+    # Partial sums of the cores splitting the window of a partition are added up along a binary tree
+    @staticmethod
+    def get_reduction_levels(reduction_parts=1):
+        return np.ceil(np.log2(reduction_parts)).astype(np.int64)
+
+    # Every level of the tree moves the partial sums of a core over one link, and adds them up on
+    # the SIMD unit of the receiving core. Works on integers and on integer arrays
+    @staticmethod
+    def get_reduction_level_cycles(psum_words=1, link_bw=1, link_latency=1, simd_length=1):
+        return link_latency + -(-psum_words // link_bw) + -(-psum_words // simd_length)
+
+    #
+    def get_layer_partitions(self, layer_id=0):
+        partition_data = self.get_layer_partition_entry(layer_id)
         input_part = partition_data[1]
         filter_part = partition_data[2]
 
         return input_part, filter_part
 
     #
-    def get_opt_compute_params(self, layer_id=0):
+    def get_layer_batch_parts(self, layer_id=0):
+        partition_data = self.get_layer_partition_entry(layer_id)
+        return partition_data[5]
+
+    #
+    def get_layer_reduction_parts(self, layer_id=0):
+        partition_data = self.get_layer_partition_entry(layer_id)
+        return partition_data[6]
+
+    #
+    def is_reduction_partitioned(self):
         assert self.partition_table_valid, 'Partition table is not valid'
+        for entry in self.partition_table:
+            if entry[6] > 1:
+                return True
+        return False
 
-        partition_data = self.partition_table[layer_id]
+    #
+    def get_opt_compute_params(self, layer_id=0):
+        partition_data = self.get_layer_partition_entry(layer_id)
         opt_compute_unit = partition_data[3]
         opt_dataflow = partition_data[4]
 
         return opt_compute_unit, opt_dataflow
 
-    #
+    # Columns are matched by their header, e.g. 'layer id, input parts, filter parts, unit, dataflow'.
+    # An optional 'batch parts' column splits the batch of the bmm and attention layers, and an optional
+    # 'reduction parts' column splits the window of the layers. Both are 1 when missing.
+    # On heterogeneous chips a layer can have one row per unit type
     def read_user_partition_table(self, filename=''):
+        col_names = {'layerid': 'LayerID', 'inputparts': 'InputParts', 'filterparts': 'FilterParts',
+                     'unit': 'ComputeUnit', 'computeunit': 'ComputeUnit', 'dataflow': 'Dataflow',
+                     'batchparts': 'BatchParts', 'reductionparts': 'ReductionParts'}
 
         f = open(filename, 'r')
-        first = True
+        header = []
 
         for row in f:
-            if first:
-                first = False
-            else:
-                elems = row.strip().split(',')
-                entry = [int(e.strip()) for e in elems[0:-2]]
-                df = elems[-1].strip()
-                unit = elems[-2].strip()
-                assert unit in ['matmul', 'vector']
-                assert df in ['os', 'ws', 'is']
+            if row.strip() == '':
+                continue
+
+            elems = [e.strip() for e in row.strip().split(',')]
+            if len(header) == 0:
+                for e in elems:
+                    col_name = e.lower().replace(' ', '').replace('_', '')
+                    assert col_name in col_names, 'Unknown partition file column: ' + e
+                    header += [col_names[col_name]]
+                for col in self.partition_table_cols[:5]:
+                    assert col in header, 'Partition file has no ' + col + ' column'
+                continue
+
+            values = dict(zip(header, elems))
+            unit = values['ComputeUnit']
+            df = values['Dataflow']
+            assert unit in ['matmul', 'vector']
+            assert df in ['os', 'ws', 'is']
+
+            entry = [int(values['LayerID']), int(values['InputParts']), int(values['FilterParts']),
+                     unit, df, int(values.get('BatchParts', 1)), int(values.get('ReductionParts', 1))]
+            assert entry[5] > 0, 'Batch parts must be greater than 0'
+            assert entry[6] > 0, 'Reduction parts must be greater than 0'
+
+            self.add_partition_entry(entry)
 
-                entry += [unit, df]
+        f.close()
 
-                self.partition_table += [entry]
+        # A layer with an entry for each unit type is split between the matmul and the vector cores
+        for layer_id, unit_entries in self.partition_entries.items():
+            if len(unit_entries) > 1:
+                assert self.config.is_heterogeneous(), \
+                    'Layer ' + str(layer_id) + ' has entries for both units on a chip without heterogeneous cores'
+                for entry in unit_entries:
+                    assert entry[5] == 1 and entry[6] == 1, \
+                        'Heterogeneous layers do not split the batch or the window, see layer ' + str(layer_id)
 
         self.partition_table_valid = True
 
@@ -0,0 +1,63 @@
+from krittika.config.krittika_config import KrittikaConfig
+
+
+class PartitionResultCache:
+    '''
+        Memoizes the per core report items of a partition simulation.
+        Partitions with the same compute unit, dataflow, array and operand shapes, weight sparsity,
+        SRAM sizes, interface bandwidths in words and ifmap part offset are served by a single simulation.
+        The overlapping windows of a conv layer make the unique ifmap words of a part depend on the ofmap
+        column it starts at and on the window columns it holds, the ifmap part offset carries both.
+        Past it only the address offsets differ between such partitions, which the reported cycles and
+        access counts do not depend on.
+    '''
+    def __init__(self):
+        self.results_dict = {}
+
+        # Stats
+        self.num_hits = 0
+        self.num_misses = 0
+
+    #
+    @staticmethod
+    def get_key(config_obj=KrittikaConfig(), compute_unit='matmul', dataflow='ws',
+                ifmap_part_shape=(1, 1), filter_part_shape=(1, 1), sparsity_descriptor='dense',
+                operand_precisions=None, ifmap_part_offset=(0, 0)):
+        if compute_unit == 'matmul':
+            unit_dims = config_obj.get_matmul_dims()
+        else:
+            unit_dims = (config_obj.get_vector_dim(),)
+
+        key = (compute_unit, dataflow, tuple(unit_dims),
+               tuple(ifmap_part_shape), tuple(filter_part_shape), tuple(ifmap_part_offset), sparsity_descriptor,
+               tuple(config_obj.get_per_unit_sram_sizes_words(precisions=operand_precisions)),
+               config_obj.get_bandwidth_use_mode(),
+               tuple(config_obj.get_interface_bandwidths_words(precisions=operand_precisions)),
+               config_obj.get_operand_precisions(layer_precisions=operand_precisions)[1])
+
+        return key
+
+    #
+    def contains(self, key):
+        return key in self.results_dict
+
+    #
+    def lookup(self, key):
+        if key in self.results_dict:
+            self.num_hits += 1
+            return self.results_dict[key]
+
+        self.num_misses += 1
+        return None
+
+    #
+    def insert(self, key, part_report_items):
+        self.results_dict[key] = part_report_items
+
+    #
+    def get_num_entries(self):
+        return len(self.results_dict)
+
+    #
+    def get_hit_miss_counts(self):
+        return self.num_hits, self.num_misses
@@ -0,0 +1,221 @@
+from krittika.workload_manager import WorkloadManager
+
+
+class PipelineScheduler:
+    '''
+        Runs many inferences of a workload as a pipeline over groups of cores:
+        1. The cores are split into stage groups and every stage runs a contiguous range of layers on its group.
+           A stage starts at a conv/gemm layer, the activation layers stay with their producer
+        2. The first layer of every stage is either given, or searched for the fewest cycles of the slowest
+           stage from the latencies of the layers on the group of each stage
+        3. The inferences enter the first stage one after the other. A stage starts an inference once it is
+           done with the previous one and the stage before it has handed the inference over.
+           The ofmaps handed over between the stages are buffered, the transfers are not charged
+        4. A stage sits idle before the first inference reaches it (fill), while it waits for the stage before
+           it (stall) and after it is done with the last inference (drain)
+    '''
+    def __init__(self):
+        self.workload_obj = WorkloadManager()
+
+        self.num_inferences = 1
+        self.stage_cores = [1]
+        self.stage_first_layers = []
+
+        # Cycles of one inference on every stage
+        self.stage_cycles_list = []
+        # Start and end cycle of every inference on every stage, indexed by [inference][stage]
+        self.start_cycles_grid = []
+        self.end_cycles_grid = []
+
+        # Flags
+        self.params_set = False
+        self.stages_valid = False
+        self.run_done = False
+
+    #
+    def set_params(self, workload_obj=WorkloadManager(), stage_cores=None, stage_first_layers=None, num_inferences=1):
+        assert stage_cores is not None and len(stage_cores) > 0, 'No pipeline stages'
+        assert num_inferences > 0, 'Number of inferences must be greater than 0'
+
+        self.workload_obj = workload_obj
+        self.stage_cores = list(stage_cores)
+        self.num_inferences = num_inferences
+
+        self.stage_first_layers = []
+        if stage_first_layers is not None and len(stage_first_layers) > 0:
+            assert len(stage_first_layers) == len(stage_cores), 'Stage first layers must list every stage'
+            self.stage_first_layers = list(stage_first_layers)
+
+        self.params_set = True
+        self.stages_valid = False
+        self.run_done = False
+
+    # Layer ids a stage can start at
+    def get_stage_start_candidates(self):
+        assert self.params_set, 'Pipeline is not set up'
+
+        start_candidates = []
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if layer_params[0] in ['conv', 'gemm']:
+                start_candidates += [lid]
+
+        return start_candidates
+
+    # stage_latency_lists holds the cycles of every layer on the core group of each stage
+    def create_stages(self, stage_latency_lists=None):
+        assert self.params_set, 'Pipeline is not set up'
+        assert stage_latency_lists is not None and len(stage_latency_lists) == len(self.stage_cores), \
+            'Need the layer latencies on the group of every stage'
+
+        num_layers = self.workload_obj.get_num_layers()
+        start_candidates = self.get_stage_start_candidates()
+        assert len(start_candidates) >= len(self.stage_cores), 'Fewer conv/gemm layers than pipeline stages'
+
+        if len(self.stage_first_layers) == 0:
+            self.stage_first_layers = self.search_stage_first_layers(stage_latency_lists=stage_latency_lists,
+                                                                     start_candidates=start_candidates)
+
+        assert self.stage_first_layers[0] == 0, 'The first stage must start at layer 0'
+        for stage_id, first_layer in enumerate(self.stage_first_layers):
+            assert first_layer in start_candidates, 'A stage must start at a conv/gemm layer: ' + str(first_layer)
+            if stage_id > 0:
+                assert first_layer > self.stage_first_layers[stage_id - 1], 'Stage first layers must increase'
+
+        stage_bounds = self.stage_first_layers + [num_layers]
+        self.stage_cycles_list = []
+        for stage_id, latency_list in enumerate(stage_latency_lists):
+            self.stage_cycles_list += [sum(latency_list[stage_bounds[stage_id]:stage_bounds[stage_id + 1]])]
+
+        self.stages_valid = True
+        self.run_done = False
+
+    # Splits the layers at the candidate starts for the fewest cycles of the slowest stage,
+    # then for the fewest cycles of all the stages
+    def search_stage_first_layers(self, stage_latency_lists=None, start_candidates=None):
+        # Cycles of the layers before each layer id on the group of every stage
+        prefix_cycles_lists = []
+        for latency_list in stage_latency_lists:
+            prefix_cycles = [0]
+            for cycles in latency_list:
+                prefix_cycles += [prefix_cycles[-1] + cycles]
+            prefix_cycles_lists += [prefix_cycles]
+
+        slowest_stage_cycles, _ = self.get_best_split(prefix_cycles_lists=prefix_cycles_lists,
+                                                      start_candidates=start_candidates)
+        _, stage_first_layers = self.get_best_split(prefix_cycles_lists=prefix_cycles_lists,
+                                                    start_candidates=start_candidates,
+                                                    max_stage_cycles=slowest_stage_cycles)
+        return stage_first_layers
+
+    # Without a cap the split with the fewest cycles of the slowest stage, with a cap the split
+    # with the fewest cycles of all the stages, none of them above the cap
+    def get_best_split(self, prefix_cycles_lists=None, start_candidates=None, max_stage_cycles=None):
+        num_stages = len(self.stage_cores)
+        num_layers = self.workload_obj.get_num_layers()
+        bounds = start_candidates + [num_layers]
+        num_bounds = len(bounds)
+
+        # best_splits[stage_id][bound_id]: (cost, first layers) of the stages from stage_id on,
+        # with stage_id starting at bounds[bound_id]. The last stage ends at the last bound
+        best_splits = [[None] * num_bounds for _ in range(num_stages + 1)]
+        best_splits[num_stages][num_bounds - 1] = (0, [])
+
+        for stage_id in range(num_stages - 1, -1, -1):
+            prefix_cycles = prefix_cycles_lists[stage_id]
+
+            # The later stages need a candidate start each
+            for bound_id in range(stage_id, num_bounds - num_stages + stage_id):
+                for next_bound_id in range(bound_id + 1, num_bounds):
+                    next_split = best_splits[stage_id + 1][next_bound_id]
+                    if next_split is None:
+                        continue
+
+                    cycles = prefix_cycles[bounds[next_bound_id]] - prefix_cycles[bounds[bound_id]]
+                    if max_stage_cycles is None:
+                        cost = max(cycles, next_split[0])
+                    elif cycles <= max_stage_cycles:
+                        cost = cycles + next_split[0]
+                    else:
+                        continue
+
+                    if best_splits[stage_id][bound_id] is None or cost < best_splits[stage_id][bound_id][0]:
+                        best_splits[stage_id][bound_id] = (cost, [bounds[bound_id]] + next_split[1])
+
+        return best_splits[0][0]
+
+    #
+    def run_inferences(self):
+        assert self.stages_valid, 'Pipeline stages are not created'
+
+        num_stages = len(self.stage_cores)
+        self.start_cycles_grid = []
+        self.end_cycles_grid = []
+
+        for inference_id in range(self.num_inferences):
+            start_cycles_list = []
+            end_cycles_list = []
+            for stage_id in range(num_stages):
+                start_cycle = 0
+                if stage_id > 0:
+                    start_cycle = end_cycles_list[stage_id - 1]
+                if inference_id > 0:
+                    start_cycle = max(start_cycle, self.end_cycles_grid[inference_id - 1][stage_id])
+
+                start_cycles_list += [start_cycle]
+                end_cycles_list += [start_cycle + self.stage_cycles_list[stage_id]]
+
+            self.start_cycles_grid += [start_cycles_list]
+            self.end_cycles_grid += [end_cycles_list]
+
+        self.run_done = True
+
+    #
+    def get_num_stages(self):
+        return len(self.stage_cores)
+
+    #
+    def get_stage_layer_range(self, stage_id=0):
+        assert self.stages_valid, 'Pipeline stages are not created'
+
+        last_layer = self.workload_obj.get_num_layers() - 1
+        if stage_id < len(self.stage_first_layers) - 1:
+            last_layer = self.stage_first_layers[stage_id + 1] - 1
+
+        return self.stage_first_layers[stage_id], last_layer
+
+    #
+    def get_stage_cores(self, stage_id=0):
+        return self.stage_cores[stage_id]
+
+    #
+    def get_stage_cycles(self, stage_id=0):
+        assert self.stages_valid, 'Pipeline stages are not created'
+        return self.stage_cycles_list[stage_id]
+
+    # The slowest stage sets the rate the inferences leave the pipeline at
+    def get_bottleneck_stage(self):
+        assert self.stages_valid, 'Pipeline stages are not created'
+        return self.stage_cycles_list.index(max(self.stage_cycles_list))
+
+    # Cycles until the last inference leaves the last stage
+    def get_total_cycles(self):
+        assert self.run_done, 'Inferences are not run'
+        return self.end_cycles_grid[-1][-1]
+
+    # Cycles of the first inference through the empty pipeline
+    def get_first_inference_cycles(self):
+        assert self.run_done, 'Inferences are not run'
+        return self.end_cycles_grid[0][-1]
+
+    # Busy, fill, stall and drain cycles of a stage over the run
+    def get_stage_bubble_cycles(self, stage_id=0):
+        assert self.run_done, 'Inferences are not run'
+
+        total_cycles = self.get_total_cycles()
+        busy_cycles = self.num_inferences * self.stage_cycles_list[stage_id]
+        fill_cycles = self.start_cycles_grid[0][stage_id]
+        drain_cycles = total_cycles - self.end_cycles_grid[-1][stage_id]
+        stall_cycles = total_cycles - busy_cycles - fill_cycles - drain_cycles
+
+        return busy_cycles, fill_cycles, stall_cycles, drain_cycles
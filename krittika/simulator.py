@@ -1,6 +1,10 @@
 import os
+import copy
+import math
 import statistics
 import logging
+import numpy as np
+from multiprocessing import Pool
 
 from krittika.workload_manager import WorkloadManager
 from scalesim.scale_config import scale_config
@@ -8,6 +12,13 @@ from scalesim.compute.operand_matrix import operand_matrix
 from krittika.config.krittika_config import KrittikaConfig
 from krittika.partition_manager import PartitionManager
 from krittika.single_layer_sim import SingleLayerSim
+from krittika.layer_scheduler import LayerScheduler
+from krittika.pipeline_scheduler import PipelineScheduler
+from krittika.analytical_layer_sim import AnalyticalLayerSim
+from krittika.layer_result_cache import LayerResultCache
+from krittika.interconnect.interconnect import Interconnect
+from krittika.memory.shared_buffer import SharedBuffer
+from krittika.memory.dram_arbiter import DramArbiter
 
 
 class Simulator:
@@ -16,12 +27,21 @@ class Simulator:
         self.config_obj = KrittikaConfig()
         self.partition_obj = PartitionManager()
         self.workload_obj = WorkloadManager()
+        self.layer_scheduler = LayerScheduler()
+        self.result_cache = LayerResultCache()
+        self.interconnect = Interconnect()
+        self.shared_buffer = SharedBuffer()
+        self.dram_arbiter = DramArbiter()
+        self.pipeline_scheduler = PipelineScheduler()
 
         # State
         self.verbose = True
         self.trace_gen_flag = True
         self.autopartition = False
+        # Supported simulation modes: 'cycle', 'analytical'
+        self.simulation_mode = 'cycle'
         self.single_layer_objects_list = []
+        self.layer_cache_keys = []
         self.top_path=None
 
         # REPORT Structures
@@ -35,6 +55,19 @@ class Simulator:
         self.bandwidth_report_ready = False
         self.detailed_report_avg_items = []
         self.detailed_report_ready = False
+        # Words moved and cycles spent on the interconnect before each layer
+        self.interconnect_words_list = []
+        self.interconnect_cycles_list = []
+        self.interconnect_report_ready = False
+        # Producer and ifmap DRAM reads saved of every layer fused with its producer
+        self.fusion_producer_list = []
+        self.fusion_reads_saved_list = []
+        self.fusion_activation_words_saved_list = []
+        # Per core SIMD cycles of every activation layer fused into its conv/gemm producer
+        self.activation_producer_list = []
+        self.activation_busy_cycles_list = []
+        self.activation_overlapped_cycles_list = []
+        self.activation_exposed_cycles_list = []
         
         # Flags
         self.params_valid = False
@@ -47,16 +80,56 @@ class Simulator:
                    custom_partition_filename='',
                    reports_dir_path='./',
                    verbose=True,
-                   save_traces=True
+                   save_traces=True,
+                   num_workers=None,
+                   num_layer_workers=None,
+                   mode='cycle',
+                   no_cache=False,
+                   trace_format=None
                    ):
         # Read the user input and files and prepare the objects
         self.config_obj.read_config_from_file(filename=config_filename)
 
+        # Worker count from the command line takes precedence over the config file
+        if num_workers is not None:
+            self.config_obj.set_num_workers(num_workers=num_workers)
+        if num_layer_workers is not None:
+            self.config_obj.set_num_layer_workers(num_layer_workers=num_layer_workers)
+        if no_cache:
+            _, result_cache_size_mb = self.config_obj.get_result_cache_params()
+            self.config_obj.set_result_cache_params(enabled=False, size_mb=result_cache_size_mb)
+        if trace_format is not None:
+            self.config_obj.set_trace_format(trace_format=trace_format)
+
         self.workload_obj = WorkloadManager()
         self.workload_obj.read_topologies(workload_filename=workload_filename)
         
         # print(self.workload_obj.get_simd_operation(0))
 
+        self.set_params_from_objects(config_obj=self.config_obj,
+                                     workload_obj=self.workload_obj,
+                                     custom_partition_filename=custom_partition_filename,
+                                     reports_dir_path=reports_dir_path,
+                                     verbose=verbose,
+                                     save_traces=save_traces,
+                                     mode=mode)
+
+    # Sets up a run from a config and a parsed workload, which sweeps reuse across design points
+    def set_params_from_objects(self,
+                                config_obj=None,
+                                workload_obj=None,
+                                custom_partition_filename='',
+                                reports_dir_path='./',
+                                verbose=True,
+                                save_traces=True,
+                                mode='cycle'
+                                ):
+        assert config_obj is not None and workload_obj is not None
+
+        self.config_obj = config_obj
+        self.workload_obj = workload_obj
+
+        self.partition_obj = PartitionManager()
         self.partition_obj.set_params(config_obj=self.config_obj,
                                       workload_obj=self.workload_obj
                                       )
@@ -69,6 +142,9 @@ class Simulator:
         self.verbose = verbose
         self.trace_gen_flag = save_traces
 
+        assert mode in ['cycle', 'analytical'], 'Invalid simulation mode: ' + str(mode)
+        self.simulation_mode = mode
+
         # Check whether user input path is valid.
         # If so, use this path to save the reports. Otherwise, use the current working directory.
         full_top_path = os.path.join(os.getcwd(), reports_dir_path)
@@ -89,6 +165,519 @@ class Simulator:
         # Run compute simulations for all layers first
         num_layers = self.workload_obj.get_num_layers()
 
+        self.layer_scheduler.set_params(workload_obj=self.workload_obj)
+        self.layer_scheduler.create_dependency_graph()
+
+        self.single_layer_objects_list = [None] * num_layers
+
+        if self.simulation_mode == 'analytical':
+            self.run_analytical_all_layers()
+        else:
+            self.run_cycle_accurate_all_layers()
+
+        if self.config_obj.get_interconnect_topology() != 'none':
+            self.run_interconnect_all_layers()
+
+        if self.config_obj.get_fuse_activations():
+            self.run_activation_fusion_all_layers()
+
+        # Fusion changes the DRAM reads, which the shared buffer and the DRAM arbiter work on
+        if self.config_obj.get_layer_fusion():
+            self.run_layer_fusion_all_layers()
+
+        if self.config_obj.is_shared_buffer_present():
+            self.run_shared_buffer_all_layers()
+
+        if self.config_obj.is_dram_bw_shared():
+            self.run_dram_arbitration_all_layers()
+
+        self.runs_done = True
+
+        if self.config_obj.is_pipelined():
+            self.run_pipeline()
+
+        self.generate_all_reports()
+
+    #
+    def run_cycle_accurate_all_layers(self):
+        single_arr_config = self.get_single_arr_config()
+        num_layer_workers = self.config_obj.get_num_layer_workers()
+
+        self.setup_result_cache()
+
+        for layer_wave in self.layer_scheduler.get_layer_waves():
+            matmul_layer_ids = []
+            simd_layer_ids = []
+            for layer_id in layer_wave:
+                if self.load_layer_from_cache(layer_id=layer_id):
+                    continue
+
+                layer_params = self.workload_obj.get_layer_params(layer_id)
+                if layer_params[0] in ['conv', 'gemm']:
+                    matmul_layer_ids += [layer_id]
+                elif layer_params[0] in ['activation']:
+                    simd_layer_ids += [layer_id]
+
+            if num_layer_workers > 1 and len(matmul_layer_ids) > 1:
+                self.run_matmul_layers_parallel(layer_ids=matmul_layer_ids,
+                                                single_arr_config=single_arr_config)
+            else:
+                for layer_id in matmul_layer_ids:
+                    layer_args = self.get_matmul_layer_args(layer_id=layer_id,
+                                                            single_arr_config=single_arr_config,
+                                                            num_workers=self.config_obj.get_num_workers(),
+                                                            release_objects=False)
+                    self.single_layer_objects_list[layer_id] = simulate_matmul_layer(layer_args)
+
+            # SIMD layers are cheap, run them here once their producers are available
+            for layer_id in simd_layer_ids:
+                self.single_layer_objects_list[layer_id] = self.run_activation_layer(layer_id=layer_id,
+                                                                                     single_arr_config=single_arr_config)
+
+            for layer_id in matmul_layer_ids + simd_layer_ids:
+                self.save_layer_to_cache(layer_id=layer_id)
+
+    #
+    def setup_result_cache(self):
+        self.layer_cache_keys = []
+
+        result_cache_enabled, result_cache_size_mb = self.config_obj.get_result_cache_params()
+        if not result_cache_enabled:
+            return
+
+        self.result_cache.set_params(cache_dir=os.path.join(self.top_path, 'cache'),
+                                     max_size_mb=result_cache_size_mb)
+
+        # Producers always precede their consumers, so their keys are ready when needed
+        for layer_id in range(self.workload_obj.get_num_layers()):
+            producer_key = ''
+            for producer_id in self.layer_scheduler.get_layer_dependencies(layer_id):
+                producer_key += self.layer_cache_keys[producer_id]
+
+            self.layer_cache_keys += [self.result_cache.get_layer_key(config_obj=self.config_obj,
+                                                                      workload_obj=self.workload_obj,
+                                                                      partition_obj=self.partition_obj,
+                                                                      layer_id=layer_id,
+                                                                      producer_key=producer_key)]
+
+    #
+    def load_layer_from_cache(self, layer_id=0):
+        # Traces are only written by an actual simulation
+        if len(self.layer_cache_keys) == 0 or self.trace_gen_flag:
+            return False
+
+        report_items = self.result_cache.lookup(self.layer_cache_keys[layer_id])
+        if report_items is None:
+            return False
+
+        if self.verbose:
+            print('Loading Layer ' + str(layer_id) + ' from cache')
+
+        this_layer_sim = SingleLayerSim()
+        this_layer_sim.set_params(config_obj=self.config_obj,
+                                  partitioner_obj=self.partition_obj,
+                                  layer_id=layer_id,
+                                  log_top_path=self.top_path,
+                                  verbosity=self.verbose)
+        this_layer_sim.load_cached_report_items(report_items=report_items)
+        self.single_layer_objects_list[layer_id] = this_layer_sim
+
+        return True
+
+    #
+    def save_layer_to_cache(self, layer_id=0):
+        if len(self.layer_cache_keys) == 0:
+            return
+
+        this_layer_sim = self.single_layer_objects_list[layer_id]
+        self.result_cache.insert(self.layer_cache_keys[layer_id],
+                                 this_layer_sim.get_cacheable_report_items())
+
+    #
+    def run_analytical_all_layers(self):
+        # Closed form estimates are cheap, the layers are evaluated in order in this process
+        for layer_id in range(self.workload_obj.get_num_layers()):
+            if self.verbose:
+                print('Running Layer ' + str(layer_id))
+
+            layer_params = self.workload_obj.get_layer_params(layer_id)
+
+            this_layer_sim = AnalyticalLayerSim()
+            this_layer_sim.set_params(config_obj=self.config_obj,
+                                      partitioner_obj=self.partition_obj,
+                                      layer_id=layer_id,
+                                      log_top_path=self.top_path,
+                                      verbosity=self.verbose,
+                                      operand_precisions=self.get_layer_operand_precisions(layer_id),
+                                      num_batches=self.workload_obj.get_layer_batch(layer_id))
+            this_layer_sim.set_analytical_params(workload_obj=self.workload_obj)
+
+            if layer_params[0] in ['conv', 'gemm']:
+                this_layer_sim.run()
+            elif layer_params[0] in ['activation']:
+                producer_id = self.layer_scheduler.get_layer_dependencies(layer_id)[0]
+                producer_sim = self.single_layer_objects_list[producer_id]
+                this_layer_sim.run_simd_all_parts(optype=layer_params[2],
+                                                  operand_dims=producer_sim.get_ofmap_operand_dims())
+
+            self.single_layer_objects_list[layer_id] = this_layer_sim
+
+    # Precisions of the ifmap, filter and ofmap of a layer. Activation layers work in place
+    # on the ofmap of their producer, in its precision
+    def get_layer_operand_precisions(self, layer_id=0):
+        layer_params = self.workload_obj.get_layer_params(layer_id)
+        if layer_params[0] in ['activation']:
+            producer_id = self.layer_scheduler.get_layer_dependencies(layer_id)[0]
+            _, filter_precision, ofmap_precision = self.get_layer_operand_precisions(producer_id)
+            return ofmap_precision, filter_precision, ofmap_precision
+
+        return self.config_obj.get_operand_precisions(layer_precisions=self.workload_obj.get_layer_precisions(layer_id))
+
+    # Charges moving the ofmap of every conv/gemm layer to the cores that consume it next
+    def run_interconnect_all_layers(self):
+        num_cores = self.config_obj.get_num_cores()
+        grid_rows, grid_cols = self.config_obj.get_interconnect_grid_dims()
+        link_bw, link_latency = self.config_obj.get_interconnect_link_params()
+
+        self.interconnect = Interconnect()
+        self.interconnect.set_params(topology=self.config_obj.get_interconnect_topology(),
+                                     num_nodes=num_cores,
+                                     grid_rows=grid_rows, grid_cols=grid_cols,
+                                     link_bw=link_bw, link_latency=link_latency)
+
+        self.interconnect_words_list = []
+        self.interconnect_cycles_list = []
+
+        producer_id = -1
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            transfer_words = 0
+            transfer_cycles = 0
+
+            # Activation layers work in place on the ofmap of their producer
+            if layer_params[0] in ['conv', 'gemm']:
+                if producer_id >= 0:
+                    transfer_mat = self.get_redistribution_matrix(producer_id=producer_id, consumer_id=lid)
+                    transfer_words = int(np.sum(transfer_mat))
+                    transfer_cycles = self.interconnect.add_transfers(transfer_mat=transfer_mat)
+                producer_id = lid
+
+            self.interconnect_words_list += [transfer_words]
+            self.interconnect_cycles_list += [transfer_cycles]
+
+    # Words each core needs from the others, when the inputs of a layer are the outputs of the producer.
+    # A core owns the ofmap rows of its input partition and the columns of its filter partition, and
+    # needs every channel of the rows its own input partition reads. The diagonal, the words already
+    # on the core, is kept with include_local
+    def get_redistribution_matrix(self, producer_id=0, consumer_id=0, include_local=False):
+        num_cores = self.config_obj.get_num_cores()
+        transfer_mat = np.zeros((num_cores, num_cores), dtype=np.int64)
+
+        prod_rows, _, prod_cols = self.workload_obj.get_operand_matrix_dims(layer_id=producer_id)
+        cons_rows, _, _ = self.workload_obj.get_operand_matrix_dims(layer_id=consumer_id)
+
+        # Layers whose inputs are not the previous ofmap read them from the DRAM
+        cons_channels = self.workload_obj.get_layer_params(consumer_id)[6]
+        if cons_channels != prod_cols:
+            return transfer_mat
+
+        # The cores of a batched layer own whole batches, the cores splitting the window of a layer
+        # share its ofmap partitions, and the unit types of a heterogeneous layer split its rows unevenly,
+        # which the row mapping below does not cover
+        if self.workload_obj.get_layer_batch(producer_id) > 1 or self.workload_obj.get_layer_batch(consumer_id) > 1:
+            return transfer_mat
+        if self.partition_obj.get_layer_reduction_parts(layer_id=producer_id) > 1 or \
+                self.partition_obj.get_layer_reduction_parts(layer_id=consumer_id) > 1:
+            return transfer_mat
+        if self.partition_obj.is_heterogeneous_layer(layer_id=producer_id) or \
+                self.partition_obj.is_heterogeneous_layer(layer_id=consumer_id):
+            return transfer_mat
+
+        prod_input_parts, prod_filter_parts = self.partition_obj.get_layer_partitions(layer_id=producer_id)
+        cons_input_parts, cons_filter_parts = self.partition_obj.get_layer_partitions(layer_id=consumer_id)
+
+        # Chunks as cut by SingleLayerSim, see PartitionManager.get_part_bounds
+        prod_row_bounds, prod_col_bounds = self.partition_obj.get_layer_part_bounds(layer_id=producer_id)
+        cons_row_bounds, _ = self.partition_obj.get_layer_part_bounds(layer_id=consumer_id)
+
+        prod_row_starts, prod_row_ends = np.asarray(prod_row_bounds, dtype=np.int64).T
+        prod_col_starts, prod_col_ends = np.asarray(prod_col_bounds, dtype=np.int64).T
+        prod_part_cols = prod_col_ends - prod_col_starts
+
+        # Consumer rows are mapped onto the producer ofmap pixels in proportion
+        cons_row_starts, cons_row_ends = np.asarray(cons_row_bounds, dtype=np.int64).T
+        cons_row_starts = (cons_row_starts * prod_rows) // cons_rows
+        cons_row_ends = -(-cons_row_ends * prod_rows // cons_rows)
+
+        overlap_rows = np.minimum(prod_row_ends[:, None], cons_row_ends[None, :]) \
+                       - np.maximum(prod_row_starts[:, None], cons_row_starts[None, :])
+        overlap_rows = np.maximum(overlap_rows, 0)
+
+        # Cores are numbered as the partitions are simulated, input partitions first
+        part_words = overlap_rows[:, None, :, None] * prod_part_cols[None, :, None, None]
+        part_words = np.broadcast_to(part_words, (prod_input_parts, prod_filter_parts,
+                                                  cons_input_parts, cons_filter_parts))
+        num_prod_parts = prod_input_parts * prod_filter_parts
+        num_cons_parts = cons_input_parts * cons_filter_parts
+        transfer_mat[:num_prod_parts, :num_cons_parts] = part_words.reshape((num_prod_parts, num_cons_parts))
+
+        # Data already in place does not cross the interconnect
+        if not include_local:
+            np.fill_diagonal(transfer_mat, 0)
+
+        return transfer_mat
+
+    # Overlaps every activation layer with the ofmap write back of the conv/gemm layer heading its chain.
+    # The SIMD unit of a core starts with the first ofmap write, and the layer runs longer only by
+    # the SIMD cycles which do not fit before the producer finishes
+    def run_activation_fusion_all_layers(self):
+        self.activation_producer_list = []
+        self.activation_busy_cycles_list = []
+        self.activation_overlapped_cycles_list = []
+        self.activation_exposed_cycles_list = []
+
+        # SIMD cycles already queued on each core by the activations earlier in the chain
+        chain_busy_cycles = []
+        producer_id = -1
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if layer_params[0] in ['conv', 'gemm']:
+                producer_id = lid
+                chain_busy_cycles = []
+
+            if layer_params[0] not in ['activation'] or producer_id < 0:
+                self.activation_producer_list += [-1]
+                self.activation_busy_cycles_list += [[]]
+                self.activation_overlapped_cycles_list += [[]]
+                self.activation_exposed_cycles_list += [[]]
+                continue
+
+            producer_sim = self.single_layer_objects_list[producer_id]
+            this_layer_sim = self.single_layer_objects_list[lid]
+
+            overlapped_cycles_list = []
+            exposed_cycles_list = []
+            for core_id, busy_cycles in enumerate(this_layer_sim.total_cycles_list):
+                if core_id >= len(chain_busy_cycles):
+                    chain_busy_cycles += [0]
+
+                # Cores without a producer partition run the activation on their own
+                drain_start_cycle = 0
+                producer_cycles = 0
+                if core_id < len(producer_sim.total_cycles_list):
+                    drain_start_cycle = producer_sim.ofmap_sram_start_cycle_list[core_id]
+                    producer_cycles = producer_sim.total_cycles_list[core_id]
+
+                simd_start_cycle = drain_start_cycle + chain_busy_cycles[core_id]
+                overlapped_cycles = min(max(producer_cycles - simd_start_cycle, 0), busy_cycles)
+                overlapped_cycles_list += [overlapped_cycles]
+                exposed_cycles_list += [busy_cycles - overlapped_cycles]
+                chain_busy_cycles[core_id] += busy_cycles
+
+            self.activation_producer_list += [producer_id]
+            self.activation_busy_cycles_list += [list(this_layer_sim.total_cycles_list)]
+            self.activation_overlapped_cycles_list += [overlapped_cycles_list]
+            self.activation_exposed_cycles_list += [exposed_cycles_list]
+
+    # Skips the ifmap DRAM reads of the words each conv/gemm layer finds on chip, left there by its producer
+    # The activation layers between two fused layers work on the ofmap kept on chip, their DRAM reads and
+    # writes are skipped too
+    def run_layer_fusion_all_layers(self):
+        self.fusion_producer_list = []
+        self.fusion_reads_saved_list = []
+        self.fusion_activation_words_saved_list = []
+
+        producer_id = -1
+        activation_ids = []
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            reads_saved = 0
+            activation_words_saved = 0
+            fused_producer_id = -1
+
+            if layer_params[0] in ['conv', 'gemm']:
+                if producer_id >= 0:
+                    reads_saved = self.fuse_layer(producer_id=producer_id, consumer_id=lid)
+                    if reads_saved > 0:
+                        fused_producer_id = producer_id
+                        for activation_id in activation_ids:
+                            activation_words_saved += self.fuse_activation_layer(layer_id=activation_id)
+                producer_id = lid
+                activation_ids = []
+            else:
+                activation_ids += [lid]
+
+            self.fusion_producer_list += [fused_producer_id]
+            self.fusion_reads_saved_list += [reads_saved]
+            self.fusion_activation_words_saved_list += [activation_words_saved]
+
+    #
+    def fuse_layer(self, producer_id=0, consumer_id=0):
+        # The ofmap partition of the producer has to stay in the ifmap SRAM of its core
+        prod_row_bounds, prod_col_bounds = self.partition_obj.get_layer_part_bounds(layer_id=producer_id)
+        prod_part_words = max([row_end - row_start for row_start, row_end in prod_row_bounds]) * \
+            max([col_end - col_start for col_start, col_end in prod_col_bounds])
+        consumer_precisions = self.get_layer_operand_precisions(consumer_id)
+        ifmap_buf_words = self.config_obj.get_per_unit_sram_sizes_words(precisions=consumer_precisions)[0]
+        if prod_part_words > ifmap_buf_words:
+            return 0
+
+        words_mat = self.get_redistribution_matrix(producer_id=producer_id, consumer_id=consumer_id,
+                                                   include_local=True)
+        needed_words = np.sum(words_mat, axis=0)
+        local_words = np.diagonal(words_mat)
+
+        this_layer_sim = self.single_layer_objects_list[consumer_id]
+        reads_saved = 0
+        for core_id in range(len(this_layer_sim.ifmap_dram_reads_list)):
+            if needed_words[core_id] == 0 or local_words[core_id] == 0:
+                continue
+
+            # The reads are cut by the share of the ifmap already on the core
+            dram_reads = this_layer_sim.ifmap_dram_reads_list[core_id]
+            core_reads_saved = dram_reads * int(local_words[core_id]) // int(needed_words[core_id])
+
+            this_layer_sim.ifmap_dram_reads_list[core_id] = dram_reads - core_reads_saved
+            this_layer_sim.avg_ifmap_dram_bw_list[core_id] = \
+                this_layer_sim.ifmap_dram_reads_list[core_id] / this_layer_sim.total_cycles_list[core_id]
+            reads_saved += core_reads_saved
+
+        return reads_saved
+
+    # Returns the DRAM reads and writes of the activation layer which are skipped
+    def fuse_activation_layer(self, layer_id=0):
+        this_layer_sim = self.single_layer_objects_list[layer_id]
+        words_saved = sum(this_layer_sim.ifmap_dram_reads_list) + sum(this_layer_sim.ofmap_dram_writes_list)
+
+        for core_id in range(len(this_layer_sim.ifmap_dram_reads_list)):
+            this_layer_sim.ifmap_dram_reads_list[core_id] = 0
+            this_layer_sim.ofmap_dram_writes_list[core_id] = 0
+            this_layer_sim.avg_ifmap_dram_bw_list[core_id] = 0
+            this_layer_sim.avg_ofmap_dram_bw_list[core_id] = 0
+
+        return words_saved
+
+    # Replays the operand fetches of the cores of every conv/gemm layer through the shared buffer
+    def run_shared_buffer_all_layers(self):
+        size_kb, bank_bw, num_banks = self.config_obj.get_shared_buffer_params()
+
+        self.shared_buffer = SharedBuffer()
+        self.shared_buffer.set_params(size_kb=size_kb, bank_bw=bank_bw, num_banks=num_banks,
+                                      num_cores=self.config_obj.get_num_cores())
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if layer_params[0] not in ['conv', 'gemm']:
+                self.shared_buffer.skip_layer()
+                continue
+
+            this_layer_sim = self.single_layer_objects_list[lid]
+            ifmap_requests = sum(this_layer_sim.ifmap_dram_reads_list)
+            filter_requests = sum(this_layer_sim.filter_dram_reads_list)
+            requests = ifmap_requests + filter_requests
+
+            # The buffer holds bytes, the requests are words of the operand precisions of the layer
+            ifmap_precision, filter_precision, _ = self.get_layer_operand_precisions(lid)
+            word_bytes = 1
+            if requests > 0:
+                word_bytes = (ifmap_requests * self.config_obj.get_precision_bytes(ifmap_precision)
+                              + filter_requests * self.config_obj.get_precision_bytes(filter_precision)) / requests
+
+            # Cores sharing an input or a filter partition read the same words
+            num_rows, window_sz, num_filt = self.workload_obj.get_operand_matrix_dims(layer_id=lid)
+            ifmap_h, ifmap_w = layer_params[2:4]
+            num_ch = layer_params[6]
+            unique_ifmap_words = min(num_rows * window_sz, ifmap_h * ifmap_w * num_ch)
+
+            # Fusion leaves part of the ifmap on the cores, those words are not fetched
+            if self.config_obj.get_layer_fusion() and ifmap_requests > 0:
+                unfused_ifmap_requests = ifmap_requests + self.fusion_reads_saved_list[lid]
+                unique_ifmap_words = math.ceil(unique_ifmap_words * ifmap_requests / unfused_ifmap_requests)
+
+            # Sparse filters are fetched compressed along with their metadata
+            layer_sparsity = self.workload_obj.get_layer_sparsity(lid)
+            filter_word_bits = int(8 * self.config_obj.get_precision_bytes(filter_precision))
+            unique_filter_words = layer_sparsity.get_stored_words(num_rows=window_sz, num_cols=num_filt) + \
+                layer_sparsity.get_metadata_words(num_rows=window_sz, num_cols=num_filt, word_bits=filter_word_bits)
+
+            unique_words = (unique_ifmap_words + unique_filter_words) * self.workload_obj.get_layer_batch(lid)
+
+            self.shared_buffer.service_layer(requests=requests, unique_words=unique_words,
+                                             compute_cycles=max(this_layer_sim.total_cycles_list),
+                                             word_bytes=word_bytes)
+
+    # Splits the total DRAM bandwidth among the cores of every layer
+    def run_dram_arbitration_all_layers(self):
+        total_bw, arbitration = self.config_obj.get_dram_params()
+
+        self.dram_arbiter = DramArbiter()
+        self.dram_arbiter.set_params(total_bw=total_bw, policy=arbitration)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            this_layer_sim = self.single_layer_objects_list[lid]
+            num_cores = len(this_layer_sim.total_cycles_list)
+
+            # Reads served by the shared buffer do not reach the DRAM
+            read_fraction = 1
+            if self.config_obj.is_shared_buffer_present():
+                requests, _, dram_reads, _, _ = self.shared_buffer.get_layer_stats(lid)
+                if requests > 0:
+                    read_fraction = dram_reads / requests
+
+            dram_words_list = []
+            for core_id in range(num_cores):
+                dram_words_list += [(this_layer_sim.ifmap_dram_reads_list[core_id]
+                                     + this_layer_sim.filter_dram_reads_list[core_id]) * read_fraction
+                                    + this_layer_sim.ofmap_dram_writes_list[core_id]]
+
+            self.dram_arbiter.arbitrate_layer(dram_words_list=dram_words_list,
+                                              cycles_list=this_layer_sim.total_cycles_list)
+
+    # Runs the inferences through the stages, the layer latencies of each stage come from a run of the
+    # workload on a chip with the cores of its group
+    def run_pipeline(self):
+        num_stages, num_inferences, stage_cores, stage_first_layers = self.config_obj.get_pipeline_params()
+
+        group_latency_lists = {self.config_obj.get_num_cores(): self.get_layer_latency_list()}
+        for num_cores in stage_cores:
+            if num_cores not in group_latency_lists:
+                group_latency_lists[num_cores] = self.get_group_layer_latency_list(num_cores=num_cores)
+
+        self.pipeline_scheduler = PipelineScheduler()
+        self.pipeline_scheduler.set_params(workload_obj=self.workload_obj,
+                                           stage_cores=stage_cores,
+                                           stage_first_layers=stage_first_layers,
+                                           num_inferences=num_inferences)
+        self.pipeline_scheduler.create_stages(stage_latency_lists=[group_latency_lists[num_cores]
+                                                                   for num_cores in stage_cores])
+        self.pipeline_scheduler.run_inferences()
+
+    # The reports of the group run go to <reports dir>/pipeline/cores<N>
+    def get_group_layer_latency_list(self, num_cores=1):
+        group_config = copy.deepcopy(self.config_obj)
+        group_config.set_pipeline_params(num_stages=1)
+        group_config.set_num_cores(num_cores=num_cores)
+
+        group_dir = os.path.join(self.top_path, 'pipeline', 'cores' + str(num_cores))
+        if not os.path.isdir(group_dir):
+            os.makedirs(group_dir)
+
+        if self.verbose:
+            print('Running the layers on ' + str(num_cores) + ' cores for the pipeline stages')
+
+        group_sim = Simulator()
+        group_sim.set_params_from_objects(config_obj=group_config,
+                                          workload_obj=self.workload_obj,
+                                          reports_dir_path=group_dir,
+                                          verbose=self.verbose,
+                                          save_traces=False,
+                                          mode=self.simulation_mode)
+        group_sim.run()
+
+        return group_sim.get_layer_latency_list()
+
+    #
+    def get_single_arr_config(self):
         # Update the offsets to generate operand matrices
         single_arr_config = scale_config()
         conf_list = scale_config.get_default_conf_as_list()
@@ -100,60 +689,125 @@ class Simulator:
         conf_list.append(self.config_obj.get_interface_bandwidths()[0])
         single_arr_config.update_from_list(conf_list=conf_list)
 
-        for layer_id in range(num_layers):
-            if self.verbose:
-                print('Running Layer ' + str(layer_id))
-            this_layer_op_mat_obj = operand_matrix()
-            layer_params = self.workload_obj.get_layer_params(layer_id)
-            if (layer_params[0] in ['conv', 'gemm']):
-                this_layer_op_mat_obj.set_params(config_obj=single_arr_config,
-                                             topoutil_obj=self.workload_obj,
-                                             layer_id=layer_id)
-                this_layer_op_mat_obj.create_operand_matrices()
-
-                this_layer_sim = SingleLayerSim()
-                this_layer_sim.set_params(config_obj=self.config_obj,
-                                      op_mat_obj=this_layer_op_mat_obj,
-                                      partitioner_obj=self.partition_obj,
-                                      layer_id=layer_id,
-                                      log_top_path=self.top_path,
-                                      verbosity=self.verbose)
-                this_layer_sim.run()
-                self.single_layer_objects_list += [this_layer_sim]
-
-                if self.verbose:
-                    print('SAVING TRACES')
-                this_layer_sim.save_traces()
-                this_layer_sim.gather_report_items_across_cores()
-            elif (layer_params[0] in ['activation']):
-                op_matrix = self.single_layer_objects_list[layer_id-1].get_ofmap_operand_matrix()
-
-                this_layer_sim = SingleLayerSim()
-                this_layer_sim.set_params(config_obj=self.config_obj,
-                                      op_mat_obj=this_layer_op_mat_obj,
-                                      partitioner_obj=self.partition_obj,
-                                      layer_id=layer_id,
-                                      log_top_path=self.top_path,
-                                      verbosity=self.verbose)
-                this_layer_sim.run_simd_all_parts(operand_matrix=op_matrix, optype = layer_params[1])
-                self.single_layer_objects_list += [this_layer_sim]
-                
-                this_layer_sim.gather_simd_report_items_across_cores()
+        return single_arr_config
 
+    #
+    def get_matmul_layer_args(self, layer_id=0, single_arr_config=None, num_workers=1, release_objects=False):
+        # Cached partitions are not simulated individually, so there are no per core traces to save
+        use_partition_cache = self.config_obj.get_partition_cache_enabled() and not self.trace_gen_flag
+        stream_traces, _ = self.config_obj.get_trace_stream_params()
+        stream_traces = stream_traces and self.trace_gen_flag
 
-            
+        return (self.config_obj, self.workload_obj, self.partition_obj, single_arr_config,
+                layer_id, self.top_path, self.verbose, num_workers, release_objects,
+                self.trace_gen_flag, use_partition_cache, stream_traces,
+                self.get_layer_operand_precisions(layer_id))
 
-        self.runs_done = True
-        self.generate_all_reports()
+    #
+    def run_matmul_layers_parallel(self, layer_ids=None, single_arr_config=None):
+        assert layer_ids is not None
+
+        # Pool workers are daemonic and cannot spawn their own pools,
+        # hence the cores of a layer are simulated serially inside each worker
+        layer_args_list = []
+        for layer_id in layer_ids:
+            layer_args_list += [self.get_matmul_layer_args(layer_id=layer_id,
+                                                           single_arr_config=single_arr_config,
+                                                           num_workers=1,
+                                                           release_objects=True)]
+
+        num_processes = min(self.config_obj.get_num_layer_workers(), len(layer_args_list))
+        with Pool(processes=num_processes) as pool:
+            layer_sim_objects = pool.map(simulate_matmul_layer, layer_args_list)
+
+        for layer_id, this_layer_sim in zip(layer_ids, layer_sim_objects):
+            self.single_layer_objects_list[layer_id] = this_layer_sim
+
+    #
+    def run_activation_layer(self, layer_id=0, single_arr_config=None):
+        if self.verbose:
+            print('Running Layer ' + str(layer_id))
+
+        layer_params = self.workload_obj.get_layer_params(layer_id)
+        producer_id = self.layer_scheduler.get_layer_dependencies(layer_id)[0]
+        producer_sim = self.single_layer_objects_list[producer_id]
+
+        # A producer loaded from the cache has no operand matrices, recreate them from the
+        # conv/gemm layer at the head of the activation chain
+        if producer_sim.results_from_cache:
+            head_layer_id = producer_id
+            while self.workload_obj.get_layer_params(head_layer_id)[0] in ['activation']:
+                head_layer_id = self.layer_scheduler.get_layer_dependencies(head_layer_id)[0]
+            producer_sim.op_mat_obj = create_layer_operand_matrix(single_arr_config=single_arr_config,
+                                                                  workload_obj=self.workload_obj,
+                                                                  layer_id=head_layer_id)
+
+        op_matrix = producer_sim.get_ofmap_operand_matrix()
+
+        this_layer_sim = SingleLayerSim()
+        this_layer_sim.set_params(config_obj=self.config_obj,
+                                  op_mat_obj=producer_sim.op_mat_obj,
+                                  partitioner_obj=self.partition_obj,
+                                  layer_id=layer_id,
+                                  log_top_path=self.top_path,
+                                  verbosity=self.verbose,
+                                  operand_precisions=self.get_layer_operand_precisions(layer_id),
+                                  num_batches=self.workload_obj.get_layer_batch(layer_id))
+        this_layer_sim.run_simd_all_parts(operand_matrix=op_matrix, optype = layer_params[2])
+        this_layer_sim.run_mem_sim_all_parts()
+
+        if self.trace_gen_flag:
+            this_layer_sim.save_traces()
+        this_layer_sim.gather_report_items_across_cores()
+
+        return this_layer_sim
 
     def generate_all_reports(self):
+        self.build_reports_dir()
         self.create_cycles_report_structures()
         self.create_bandwidth_report_structures()
         self.create_detailed_report_structures()
         self.save_all_cycle_reports()
         self.save_all_bw_reports()
         self.save_all_detailed_reports()
+        self.save_dram_bytes_report()
+        self.save_load_balance_report()
+        self.save_network_summary_report()
+
+        if self.config_obj.get_interconnect_topology() != 'none':
+            self.save_interconnect_reports()
+
+        if self.config_obj.get_fuse_activations():
+            self.save_activation_fusion_report()
+
+        if self.config_obj.get_layer_fusion():
+            self.save_fusion_report()
 
+        if self.config_obj.is_shared_buffer_present():
+            self.save_shared_buffer_report()
+
+        if self.config_obj.is_dram_bw_shared():
+            self.save_dram_contention_report()
+
+        if self.workload_obj.is_sparse():
+            self.save_sparsity_report()
+
+        if self.partition_obj.is_reduction_partitioned():
+            self.save_reduction_report()
+
+        if self.config_obj.is_heterogeneous():
+            self.save_unit_utilization_report()
+
+        if self.config_obj.is_pipelined():
+            self.save_pipeline_reports()
+
+    # The reports live next to the traces, create the directory when no traces were saved
+    def build_reports_dir(self):
+        reports_dir = self.top_path + 'traces'
+        if not os.path.isdir(reports_dir):
+            os.makedirs(reports_dir)
+
+        self.reports_dir_ready = True
 
     # Report generation
     def create_cycles_report_structures(self):
@@ -168,7 +822,11 @@ class Simulator:
                 overall_util_list = this_layer_sim_obj.overall_util_list
                 mapping_eff_list = this_layer_sim_obj.mapping_eff_list
                 compute_util_list = this_layer_sim_obj.compute_util_list
+                # The cores run in parallel, the layer takes as long as its slowest core
+                self.cycles_report_avg_items += [max(total_cycles_list)]
+                self.cycles_report_avg_items += [min(total_cycles_list)]
                 self.cycles_report_avg_items += [statistics.mean(total_cycles_list)]
+                self.cycles_report_avg_items += [statistics.pstdev(total_cycles_list)]
                 self.cycles_report_avg_items += [statistics.mean(stall_cycles_list)]
                 self.cycles_report_avg_items += [statistics.mean(overall_util_list)]
                 self.cycles_report_avg_items += [statistics.mean(mapping_eff_list)]
@@ -182,7 +840,7 @@ class Simulator:
 
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if (layer_params[0] in ['conv', 'gemm', 'activation']):
                 this_layer_sim_obj = self.single_layer_objects_list[lid]
                 avg_ifmap_sram_bw_list = this_layer_sim_obj.avg_ifmap_sram_bw_list
                 avg_ifmap_dram_bw_list = this_layer_sim_obj.avg_ifmap_dram_bw_list
@@ -207,7 +865,7 @@ class Simulator:
 
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if (layer_params[0] in ['conv', 'gemm', 'activation']):
                 this_layer_sim_obj = self.single_layer_objects_list[lid]
                 ifmap_sram_start_cycle_list = this_layer_sim_obj.ifmap_sram_start_cycle_list
                 ifmap_sram_stop_cycle_list = this_layer_sim_obj.ifmap_sram_stop_cycle_list
@@ -256,17 +914,20 @@ class Simulator:
         assert self.cycles_report_ready
         compute_report_name = self.top_path + 'traces' + '/COMPUTE_REPORT.csv'
         compute_report = open(compute_report_name, 'w+')
-        header = 'LayerID, Total Cycles, Stall Cycles, Overall Util %, Mapping Efficiency %, Compute Util %,\n'
+        header = 'LayerID, Total Cycles, Min Cycles, Avg Cycles, Stddev Cycles, '
+        header += 'Stall Cycles, Overall Util %, Mapping Efficiency %, Compute Util %,\n'
         columns = header.count(',') - 1
         compute_report.write(header)
 
+        row = 0
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
             if (layer_params[0] in ['conv', 'gemm', 'activation']):
                 log = str(lid) +', '
-                log += ', '.join([str(x) for x in self.cycles_report_avg_items[lid * columns:lid * columns + 5]])
+                log += ', '.join([str(x) for x in self.cycles_report_avg_items[row * columns:row * columns + columns]])
                 log += ',\n'
                 compute_report.write(log)
+                row += 1
 
         compute_report.close()
 
@@ -282,13 +943,15 @@ class Simulator:
 
         bandwidth_report.write(header)
 
+        row = 0
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if (layer_params[0] in ['conv', 'gemm', 'activation']):
                 log = str(lid) +', '
-                log += ', '.join([str(x) for x in self.bandwidth_report_avg_items[lid * columns:lid * columns + columns]])
+                log += ', '.join([str(x) for x in self.bandwidth_report_avg_items[row * columns:row * columns + columns]])
                 log += ',\n'
                 bandwidth_report.write(log)
+                row += 1
         
         bandwidth_report.close()
 
@@ -310,15 +973,505 @@ class Simulator:
 
         detailed_report.write(header)
 
+        row = 0
         for lid in range(self.workload_obj.get_num_layers()):
             layer_params = self.workload_obj.get_layer_params(lid)
-            if (layer_params[0] in ['conv', 'gemm']):
+            if (layer_params[0] in ['conv', 'gemm', 'activation']):
                 log = str(lid) +', '
-                log += ', '.join([str(x) for x in self.detailed_report_avg_items[lid * columns:lid * columns + columns]])
+                log += ', '.join([str(x) for x in self.detailed_report_avg_items[row * columns:row * columns + columns]])
                 log += ',\n'
                 detailed_report.write(log)
+                row += 1
         
         detailed_report.close()
 
 
+    def save_interconnect_reports(self):
+        assert self.runs_done
+
+        interconnect_report_name = self.top_path + 'traces' + '/INTERCONNECT_REPORT.csv'
+        interconnect_report = open(interconnect_report_name, 'w+')
+        header = 'LayerID, Interconnect Words, Interconnect Cycles,\n'
+        interconnect_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            log = str(lid) + ', '
+            log += str(self.interconnect_words_list[lid]) + ', ' + str(self.interconnect_cycles_list[lid])
+            log += ',\n'
+            interconnect_report.write(log)
+
+        interconnect_report.close()
+
+        # Utilization of a link over the whole run, the layers run one after the other
+        total_cycles = sum(self.interconnect_cycles_list)
+        for this_layer_sim in self.single_layer_objects_list:
+            total_cycles += max(this_layer_sim.total_cycles_list)
+
+        link_bw, _ = self.config_obj.get_interconnect_link_params()
+        link_words, link_busy_cycles = self.interconnect.get_link_stats()
+
+        link_report_name = self.top_path + 'traces' + '/LINK_REPORT.csv'
+        link_report = open(link_report_name, 'w+')
+        header = 'Link, Words, Busy Cycles, Utilization %,\n'
+        link_report.write(header)
+
+        for link_name, words, busy_cycles in zip(self.interconnect.get_link_names(), link_words, link_busy_cycles):
+            log = link_name + ', ' + str(words) + ', ' + str(busy_cycles) + ', '
+            log += str(words * 100 / (link_bw * total_cycles))
+            log += ',\n'
+            link_report.write(log)
+
+        link_report.close()
+        self.interconnect_report_ready = True
+
+
+    def save_activation_fusion_report(self):
+        assert self.runs_done
+
+        activation_report_name = self.top_path + 'traces' + '/ACTIVATION_FUSION_REPORT.csv'
+        activation_report = open(activation_report_name, 'w+')
+        header = 'LayerID, Producer LayerID, CoreID, SIMD Busy Cycles, Overlapped Cycles, Exposed Cycles, '
+        header += 'SIMD Idle Cycles, SIMD Busy %,\n'
+        activation_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            producer_id = self.activation_producer_list[lid]
+            if producer_id < 0:
+                continue
+
+            producer_sim = self.single_layer_objects_list[producer_id]
+            for core_id, busy_cycles in enumerate(self.activation_busy_cycles_list[lid]):
+                overlapped_cycles = self.activation_overlapped_cycles_list[lid][core_id]
+                exposed_cycles = self.activation_exposed_cycles_list[lid][core_id]
+
+                # The SIMD unit is idle for the rest of the fused layer
+                fused_cycles = exposed_cycles
+                if core_id < len(producer_sim.total_cycles_list):
+                    fused_cycles += producer_sim.total_cycles_list[core_id]
+                idle_cycles = max(fused_cycles - busy_cycles, 0)
+
+                log = str(lid) + ', ' + str(producer_id) + ', ' + str(core_id) + ', '
+                log += ', '.join([str(x) for x in [busy_cycles, overlapped_cycles, exposed_cycles, idle_cycles,
+                                                   busy_cycles * 100 / max(fused_cycles, 1)]])
+                log += ',\n'
+                activation_report.write(log)
+
+        activation_report.close()
+
+    def save_fusion_report(self):
+        assert self.runs_done
+
+        fusion_report_name = self.top_path + 'traces' + '/FUSION_REPORT.csv'
+        fusion_report = open(fusion_report_name, 'w+')
+        header = 'LayerID, Producer LayerID, IFMAP DRAM Reads Saved, Activation DRAM Words Saved,\n'
+        fusion_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if (layer_params[0] in ['conv', 'gemm']):
+                log = str(lid) + ', ' + str(self.fusion_producer_list[lid]) + ', '
+                log += str(self.fusion_reads_saved_list[lid]) + ', '
+                log += str(self.fusion_activation_words_saved_list[lid])
+                log += ',\n'
+                fusion_report.write(log)
+
+        fusion_report.close()
+
+    # DRAM traffic of every layer in bytes, the other reports count words of the operand precisions
+    def save_dram_bytes_report(self):
+        assert self.runs_done
+
+        dram_bytes_report_name = self.top_path + 'traces' + '/DRAM_BYTES_REPORT.csv'
+        dram_bytes_report = open(dram_bytes_report_name, 'w+')
+        header = 'LayerID, IFMAP Precision, FILTER Precision, OFMAP Precision, '
+        header += 'IFMAP DRAM Read Bytes, FILTER DRAM Read Bytes, OFMAP DRAM Write Bytes, Total DRAM Bytes,\n'
+        dram_bytes_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            this_layer_sim = self.single_layer_objects_list[lid]
+            precisions = self.get_layer_operand_precisions(lid)
+            ifmap_bytes, filter_bytes, ofmap_bytes = \
+                [math.ceil(sum(words_list) * self.config_obj.get_precision_bytes(precision))
+                 for words_list, precision in zip([this_layer_sim.ifmap_dram_reads_list,
+                                                   this_layer_sim.filter_dram_reads_list,
+                                                   this_layer_sim.ofmap_dram_writes_list], precisions)]
+
+            log = str(lid) + ', ' + ', '.join(precisions) + ', '
+            log += ', '.join([str(x) for x in [ifmap_bytes, filter_bytes, ofmap_bytes,
+                                               ifmap_bytes + filter_bytes + ofmap_bytes]])
+            log += ',\n'
+            dram_bytes_report.write(log)
+
+        dram_bytes_report.close()
+
+    # Cycles of every core against the slowest core of its layer, which sets the layer latency
+    def save_load_balance_report(self):
+        assert self.runs_done
+
+        load_balance_report_name = self.top_path + 'traces' + '/LOAD_BALANCE_REPORT.csv'
+        load_balance_report = open(load_balance_report_name, 'w+')
+        header = 'LayerID, CoreID, ComputeUnit, Total Cycles, Idle Cycles, Imbalance %,\n'
+        load_balance_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            this_layer_sim = self.single_layer_objects_list[lid]
+            layer_cycles = max(this_layer_sim.total_cycles_list)
+
+            for core_id, core_cycles in enumerate(this_layer_sim.total_cycles_list):
+                idle_cycles = layer_cycles - core_cycles
+                log = str(lid) + ', ' + str(core_id) + ', ' + this_layer_sim.core_units_list[core_id] + ', '
+                log += ', '.join([str(x) for x in [core_cycles, idle_cycles, idle_cycles * 100 / layer_cycles]])
+                log += ',\n'
+                load_balance_report.write(log)
+
+        load_balance_report.close()
+
+    # Cycles from the start of every layer to the end of its slowest core, with the cycles the chip level
+    # models add on the critical path. A fused activation only adds the SIMD cycles past the end of its chain.
+    # The cycle accurate mode hands over some cycles as floats, the latencies are whole cycles in both modes
+    def get_layer_latency_list(self):
+        assert self.runs_done
+
+        layer_latency_list = []
+        # Per core SIMD cycles exposed by the fused activations of the current chain
+        chain_producer_cycles = []
+        chain_exposed_cycles = []
+        chain_end_cycles = 0
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            this_layer_sim = self.single_layer_objects_list[lid]
+            layer_latency = max(this_layer_sim.total_cycles_list)
+
+            if layer_params[0] in ['conv', 'gemm']:
+                chain_producer_cycles = list(this_layer_sim.total_cycles_list)
+                chain_exposed_cycles = [0] * len(chain_producer_cycles)
+                chain_end_cycles = layer_latency
+
+            elif self.config_obj.get_fuse_activations() and self.activation_producer_list[lid] >= 0:
+                for core_id, exposed_cycles in enumerate(self.activation_exposed_cycles_list[lid]):
+                    if core_id >= len(chain_exposed_cycles):
+                        chain_producer_cycles += [0]
+                        chain_exposed_cycles += [0]
+                    chain_exposed_cycles[core_id] += exposed_cycles
+
+                fused_end_cycles = max([producer_cycles + exposed_cycles for producer_cycles, exposed_cycles
+                                        in zip(chain_producer_cycles, chain_exposed_cycles)])
+                layer_latency = fused_end_cycles - chain_end_cycles
+                chain_end_cycles = fused_end_cycles
+
+            if self.config_obj.get_interconnect_topology() != 'none':
+                layer_latency += self.interconnect_cycles_list[lid]
+
+            if self.config_obj.is_shared_buffer_present():
+                layer_latency += self.shared_buffer.get_layer_stats(lid)[4]
+
+            # Contention stretches the slowest core of the layer
+            if self.config_obj.is_dram_bw_shared():
+                standalone_cycles_list, contended_cycles_list = self.dram_arbiter.get_layer_cycles(lid)
+                layer_latency += max(contended_cycles_list) - max(standalone_cycles_list)
+
+            layer_latency_list += [int(layer_latency)]
+
+        return layer_latency_list
+
+    # MACs of the conv and gemm layers of one inference, before and after skipping the zero weights
+    def get_network_macs(self):
+        dense_macs = 0
+        executed_macs = 0
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if (layer_params[0] in ['conv', 'gemm']):
+                num_rows, window_sz, num_filt = self.workload_obj.get_operand_matrix_dims(layer_id=lid)
+                kept_window_sz = self.workload_obj.get_layer_sparsity(lid).get_num_kept_rows(num_rows=window_sz,
+                                                                                             num_cols=num_filt)
+                batch = self.workload_obj.get_layer_batch(lid)
+                dense_macs += num_rows * window_sz * num_filt * batch
+                executed_macs += num_rows * kept_window_sz * num_filt * batch
+
+        return dense_macs, executed_macs
+
+    # End to end numbers of one inference running the layers one after the other:
+    # [total cycles, latency in us, inferences per second, peak TOPS, effective TOPS, MAC utilization %]
+    # A MAC counts as two ops. The effective TOPS count the dense MACs of the network, the utilization
+    # counts the MACs the arrays execute against the peak MACs of the chip over the run
+    def get_network_summary(self):
+        assert self.runs_done
+
+        total_cycles = sum(self.get_layer_latency_list())
+        clock_mhz = self.config_obj.get_clock_mhz()
+        peak_macs = self.config_obj.get_peak_macs()
+        dense_macs, executed_macs = self.get_network_macs()
+
+        latency_us = total_cycles / clock_mhz
+        inferences_per_sec = 10 ** 6 / latency_us
+        peak_tops = 2 * peak_macs * clock_mhz / 10 ** 6
+        effective_tops = 2 * dense_macs * inferences_per_sec / 10 ** 12
+        mac_util = executed_macs * 100 / (peak_macs * total_cycles)
+
+        return [total_cycles, latency_us, inferences_per_sec, peak_tops, effective_tops, mac_util]
+
+    #
+    def save_network_summary_report(self):
+        assert self.runs_done
+
+        summary_report_name = self.top_path + 'traces' + '/NETWORK_SUMMARY_REPORT.csv'
+        summary_report = open(summary_report_name, 'w+')
+        header = 'Total Cycles, Clock MHz, Latency us, Inferences/s, Peak TOPS, Effective TOPS, MAC Util %,\n'
+        summary_report.write(header)
+
+        total_cycles, latency_us, inferences_per_sec, peak_tops, effective_tops, mac_util = \
+            self.get_network_summary()
+        log = ', '.join([str(x) for x in [total_cycles, self.config_obj.get_clock_mhz(), latency_us,
+                                           inferences_per_sec, peak_tops, effective_tops, mac_util]])
+        log += ',\n'
+        summary_report.write(log)
+
+        summary_report.close()
+
+    # Layers, cycles and bubbles of every stage, and the throughput of the pipeline against running
+    # the inferences one after the other on all the cores
+    def save_pipeline_reports(self):
+        assert self.runs_done
+
+        pipeline_report_name = self.top_path + 'traces' + '/PIPELINE_REPORT.csv'
+        pipeline_report = open(pipeline_report_name, 'w+')
+        header = 'StageID, First LayerID, Last LayerID, Cores, Stage Cycles, Busy Cycles, '
+        header += 'Fill Cycles, Stall Cycles, Drain Cycles, Bubble %,\n'
+        pipeline_report.write(header)
+
+        total_cycles = self.pipeline_scheduler.get_total_cycles()
+        for stage_id in range(self.pipeline_scheduler.get_num_stages()):
+            first_layer, last_layer = self.pipeline_scheduler.get_stage_layer_range(stage_id)
+            busy_cycles, fill_cycles, stall_cycles, drain_cycles = \
+                self.pipeline_scheduler.get_stage_bubble_cycles(stage_id)
+
+            stage_cores = self.pipeline_scheduler.get_stage_cores(stage_id)
+            stage_cycles = self.pipeline_scheduler.get_stage_cycles(stage_id)
+
+            log = str(stage_id) + ', '
+            log += ', '.join([str(x) for x in [first_layer, last_layer, stage_cores, stage_cycles, busy_cycles,
+                                               fill_cycles, stall_cycles, drain_cycles,
+                                               (total_cycles - busy_cycles) * 100 / total_cycles]])
+            log += ',\n'
+            pipeline_report.write(log)
+
+        pipeline_report.close()
+
+        summary_report_name = self.top_path + 'traces' + '/PIPELINE_SUMMARY_REPORT.csv'
+        summary_report = open(summary_report_name, 'w+')
+        header = 'Stages, Inferences, Total Cycles, First Inference Cycles, Inferences/s, '
+        header += 'Steady State Inferences/s, Bottleneck StageID, Sequential Cycles, Speedup,\n'
+        summary_report.write(header)
+
+        num_inferences = self.config_obj.get_pipeline_params()[1]
+        clock_hz = self.config_obj.get_clock_mhz() * 10 ** 6
+        bottleneck_stage = self.pipeline_scheduler.get_bottleneck_stage()
+        sequential_cycles = num_inferences * sum(self.get_layer_latency_list())
+
+        log = ', '.join([str(x) for x in [self.pipeline_scheduler.get_num_stages(), num_inferences, total_cycles,
+                                           self.pipeline_scheduler.get_first_inference_cycles(),
+                                           num_inferences * clock_hz / total_cycles,
+                                           clock_hz / self.pipeline_scheduler.get_stage_cycles(bottleneck_stage),
+                                           bottleneck_stage, sequential_cycles, sequential_cycles / total_cycles]])
+        log += ',\n'
+        summary_report.write(log)
+
+        summary_report.close()
+
+    # Whole layer view of the skipped MACs and of the compressed weights with their metadata
+    def save_sparsity_report(self):
+        assert self.runs_done
+
+        sparsity_report_name = self.top_path + 'traces' + '/SPARSITY_REPORT.csv'
+        sparsity_report = open(sparsity_report_name, 'w+')
+        header = 'LayerID, Sparsity, Dense MACs, Executed MACs, Dense Filter Words, Stored Filter Words, '
+        header += 'Metadata Words, Metadata Overhead %, Filter DRAM Reads,\n'
+        sparsity_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if (layer_params[0] in ['conv', 'gemm']):
+                layer_sparsity = self.workload_obj.get_layer_sparsity(lid)
+                num_rows, window_sz, num_filt = self.workload_obj.get_operand_matrix_dims(layer_id=lid)
+                filter_precision = self.get_layer_operand_precisions(lid)[1]
+                filter_word_bits = int(8 * self.config_obj.get_precision_bytes(filter_precision))
+
+                kept_window_sz = layer_sparsity.get_num_kept_rows(num_rows=window_sz, num_cols=num_filt)
+                stored_words = layer_sparsity.get_stored_words(num_rows=window_sz, num_cols=num_filt)
+                metadata_words = layer_sparsity.get_metadata_words(num_rows=window_sz, num_cols=num_filt,
+                                                                   word_bits=filter_word_bits)
+                filter_dram_reads = sum(self.single_layer_objects_list[lid].filter_dram_reads_list)
+                batch = self.workload_obj.get_layer_batch(lid)
+
+                log = str(lid) + ', ' + layer_sparsity.get_descriptor() + ', '
+                log += ', '.join([str(x) for x in [num_rows * window_sz * num_filt * batch,
+                                                   num_rows * kept_window_sz * num_filt * batch,
+                                                   window_sz * num_filt * batch,
+                                                   stored_words * batch,
+                                                   metadata_words * batch,
+                                                   metadata_words * 100 / stored_words,
+                                                   filter_dram_reads]])
+                log += ',\n'
+                sparsity_report.write(log)
+
+        sparsity_report.close()
+
+    # Partial sums moved between the cores splitting the window of a layer and the cycles to add them up
+    def save_reduction_report(self):
+        assert self.runs_done
+
+        reduction_report_name = self.top_path + 'traces' + '/REDUCTION_REPORT.csv'
+        reduction_report = open(reduction_report_name, 'w+')
+        header = 'LayerID, ReductionParts, Reduction Levels, Partial Sum Words, Reduction Cycles,\n'
+        reduction_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if (layer_params[0] in ['conv', 'gemm']):
+                this_layer_sim = self.single_layer_objects_list[lid]
+                num_levels = int(PartitionManager.get_reduction_levels(this_layer_sim.num_reduction_part))
+
+                # Every batch is reduced, the busiest core runs the batches of its group back to back
+                num_batches = self.workload_obj.get_layer_batch(lid)
+                group_batches = math.ceil(num_batches / this_layer_sim.num_batch_part)
+
+                log = str(lid) + ', '
+                log += ', '.join([str(x) for x in [this_layer_sim.num_reduction_part, num_levels,
+                                                   this_layer_sim.reduction_words * num_batches,
+                                                   this_layer_sim.reduction_cycles * group_batches]])
+                log += ',\n'
+                reduction_report.write(log)
+
+        reduction_report.close()
+
+    # Cores, rows and utilization of each unit type running the conv and gemm layers of a heterogeneous chip
+    def save_unit_utilization_report(self):
+        assert self.runs_done
+
+        unit_report_name = self.top_path + 'traces' + '/UNIT_UTILIZATION_REPORT.csv'
+        unit_report = open(unit_report_name, 'w+')
+        header = 'LayerID, ComputeUnit, Cores, Rows, Max Cycles, Overall Util %, Compute Util %,\n'
+        unit_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if (layer_params[0] in ['conv', 'gemm']):
+                this_layer_sim = self.single_layer_objects_list[lid]
+                num_rows, _, _ = self.workload_obj.get_operand_matrix_dims(layer_id=lid)
+
+                for unit_entry, _, unit_rows in self.partition_obj.get_layer_unit_row_splits(layer_id=lid,
+                                                                                            num_rows=num_rows):
+                    compute_unit = unit_entry[3]
+                    core_ids = [core_id for core_id, core_unit in enumerate(this_layer_sim.core_units_list)
+                                if core_unit == compute_unit]
+                    if len(core_ids) == 0:
+                        continue
+
+                    max_cycles = max([this_layer_sim.total_cycles_list[core_id] for core_id in core_ids])
+                    overall_util = statistics.mean([this_layer_sim.overall_util_list[core_id]
+                                                    for core_id in core_ids])
+                    compute_util = statistics.mean([this_layer_sim.compute_util_list[core_id]
+                                                    for core_id in core_ids])
+
+                    log = str(lid) + ', ' + compute_unit + ', '
+                    log += ', '.join([str(x) for x in [len(core_ids), unit_rows * self.workload_obj.get_layer_batch(lid),
+                                                       max_cycles, overall_util, compute_util]])
+                    log += ',\n'
+                    unit_report.write(log)
+
+        unit_report.close()
+
+    def save_shared_buffer_report(self):
+        assert self.runs_done
+
+        shared_buffer_report_name = self.top_path + 'traces' + '/SHARED_BUFFER_REPORT.csv'
+        shared_buffer_report = open(shared_buffer_report_name, 'w+')
+        header = 'LayerID, Requests, Hit Rate %, DRAM Reads, DRAM Words Saved, Buffer Cycles, Stall Cycles,\n'
+        shared_buffer_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            layer_params = self.workload_obj.get_layer_params(lid)
+            if (layer_params[0] in ['conv', 'gemm']):
+                requests, hits, dram_reads, buffer_cycles, stall_cycles = self.shared_buffer.get_layer_stats(lid)
+                hit_rate = 0
+                if requests > 0:
+                    hit_rate = hits * 100 / requests
+
+                log = str(lid) + ', '
+                log += ', '.join([str(x) for x in [requests, hit_rate, dram_reads, hits,
+                                                   buffer_cycles, stall_cycles]])
+                log += ',\n'
+                shared_buffer_report.write(log)
+
+        shared_buffer_report.close()
+
+
+    def save_dram_contention_report(self):
+        assert self.runs_done
+
+        contention_report_name = self.top_path + 'traces' + '/DRAM_CONTENTION_REPORT.csv'
+        contention_report = open(contention_report_name, 'w+')
+        header = 'LayerID, CoreID, Total Cycles, Contended Cycles, Contention Stall Cycles,\n'
+        contention_report.write(header)
+
+        for lid in range(self.workload_obj.get_num_layers()):
+            standalone_cycles_list, contended_cycles_list = self.dram_arbiter.get_layer_cycles(lid)
+            for core_id, (cycles, contended_cycles) in enumerate(zip(standalone_cycles_list, contended_cycles_list)):
+                log = str(lid) + ', ' + str(core_id) + ', '
+                log += ', '.join([str(x) for x in [cycles, contended_cycles, contended_cycles - cycles]])
+                log += ',\n'
+                contention_report.write(log)
+
+        contention_report.close()
+
+
+# Worker for the layer pool, kept at the module level so that it can be pickled
+def simulate_matmul_layer(layer_args):
+    config_obj, workload_obj, partition_obj, single_arr_config, \
+        layer_id, top_path, verbose, num_workers, release_objects, \
+        save_traces, use_partition_cache, stream_traces, operand_precisions = layer_args
+
+    if verbose:
+        print('Running Layer ' + str(layer_id))
+
+    this_layer_op_mat_obj = create_layer_operand_matrix(single_arr_config=single_arr_config,
+                                                        workload_obj=workload_obj,
+                                                        layer_id=layer_id)
+
+    this_layer_sim = SingleLayerSim()
+    this_layer_sim.set_params(config_obj=config_obj,
+                              op_mat_obj=this_layer_op_mat_obj,
+                              partitioner_obj=partition_obj,
+                              layer_id=layer_id,
+                              log_top_path=top_path,
+                              verbosity=verbose,
+                              num_workers=num_workers,
+                              use_partition_cache=use_partition_cache,
+                              stream_traces=stream_traces,
+                              sparsity_obj=workload_obj.get_layer_sparsity(layer_id),
+                              operand_precisions=operand_precisions,
+                              num_batches=workload_obj.get_layer_batch(layer_id))
+    this_layer_sim.run()
+
+    if save_traces:
+        if verbose:
+            print('SAVING TRACES')
+        this_layer_sim.save_traces()
+    this_layer_sim.gather_report_items_across_cores()
+
+    # Only the report lists and the operand matrices travel back to the parent process
+    if release_objects:
+        this_layer_sim.release_simulation_objects()
+
+    return this_layer_sim
+
+
+#
+def create_layer_operand_matrix(single_arr_config=None, workload_obj=None, layer_id=0):
+    this_layer_op_mat_obj = operand_matrix()
+    this_layer_op_mat_obj.set_params(config_obj=single_arr_config,
+                                     topoutil_obj=workload_obj,
+                                     layer_id=layer_id)
+    this_layer_op_mat_obj.create_operand_matrices()
 
+    return this_layer_op_mat_obj
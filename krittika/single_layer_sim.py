@@ -1,12 +1,17 @@
 import math
 import os.path
+from multiprocessing import Pool
 
 from scalesim.compute.operand_matrix import operand_matrix
 from scalesim.memory.double_buffered_scratchpad_mem import double_buffered_scratchpad
 
 from krittika.config.krittika_config import KrittikaConfig
+from krittika.layer_sparsity import LayerSparsity
 from krittika.partition_manager import PartitionManager
 from krittika.compute.compute_node import ComputeNode
+from krittika.partition_result_cache import PartitionResultCache
+from krittika.memory.streaming_scratchpad import StreamingScratchpad
+from krittika.trace_io.trace_writer import TraceWriter
 
 
 class SingleLayerSim:
@@ -18,23 +23,62 @@ class SingleLayerSim:
         4. Run the partitioned operand matrix for compute
         5. Run the generated demands from each compute element
     '''
+
+    # Per core report items, each one is collected in the list attribute <name>_list
+    report_item_names = ['total_cycles', 'stall_cycles', 'overall_util', 'mapping_eff', 'compute_util',
+                         'ifmap_sram_reads', 'filter_sram_reads', 'ofmap_sram_writes',
+                         'avg_ifmap_sram_bw', 'avg_filter_sram_bw', 'avg_ofmap_sram_bw',
+                         'ifmap_sram_start_cycle', 'ifmap_sram_stop_cycle',
+                         'filter_sram_start_cycle', 'filter_sram_stop_cycle',
+                         'ofmap_sram_start_cycle', 'ofmap_sram_stop_cycle',
+                         'ifmap_dram_start_cycle', 'ifmap_dram_stop_cycle',
+                         'filter_dram_start_cycle', 'filter_dram_stop_cycle',
+                         'ofmap_dram_start_cycle', 'ofmap_dram_stop_cycle',
+                         'ifmap_dram_reads', 'filter_dram_reads', 'ofmap_dram_writes',
+                         'avg_ifmap_dram_bw', 'avg_filter_dram_bw', 'avg_ofmap_dram_bw']
+
     def __init__(self):
 
         # Member objects
         self.op_mat_obj = operand_matrix()
         self.partitioner_obj = PartitionManager()
         self.config_obj = KrittikaConfig()
+        self.sparsity_obj = None
+        self.operand_precisions = ('int8', 'int8', 'int8')
 
         # Variables determining state
         self.layer_id = 0
+        self.num_workers = 1
         self.num_input_part = 0
         self.num_filter_part = 0
+        # Batches of the layer and the groups of cores they are split among
+        self.num_batches = 1
+        self.num_batch_part = 1
+        # Cores splitting the window of every input and filter partition
+        self.num_reduction_part = 1
+        # Ofmap words of the partition of every core, which the reduction step moves as partial sums
+        self.part_ofmap_words_list = []
+        # First row and first window column of the ifmap partition of every core in the operand matrix
+        self.part_ifmap_starts_list = []
+        # Partial sum words moved and cycles of the busiest core in the reduction step, for one batch
+        self.reduction_words = 0
+        self.reduction_cycles = 0
+        # Compute unit and dataflow of the partition of every core, heterogeneous layers mix the unit types
+        self.part_compute_params_list = []
+        # Unit type of every core in the reports, 'simd' for the activation layers
+        self.core_units_list = []
         self.compute_node_list = []
         self.all_node_mem_objects = []
+        self.use_partition_cache = False
+        self.stream_traces = False
+        self.partition_cache = PartitionResultCache()
 
         #
         self.log_top_path = './'
 
+        # Reports: Per core, one dict per core with an entry for each of the report_item_names
+        self.part_report_items_list = []
+
         # Reports: Per core
         self.total_cycles_list = []
         self.stall_cycles_list = []
@@ -77,6 +121,8 @@ class SingleLayerSim:
         self.compute_done = False
         self.mem_traces_done = False
         self.report_metrics_ready = False
+        self.results_from_cache = False
+        self.traces_streamed = False
 
     #
     def set_params(self,
@@ -85,88 +131,288 @@ class SingleLayerSim:
                    partitioner_obj=PartitionManager(),
                    layer_id=0,
                    verbosity=True,
-                   log_top_path='./'):
+                   log_top_path='./',
+                   num_workers=1,
+                   use_partition_cache=False,
+                   stream_traces=False,
+                   sparsity_obj=None,
+                   operand_precisions=None,
+                   num_batches=1):
+
+        assert num_workers > 0, 'Number of workers must be greater than 0'
+        assert num_batches > 0, 'Number of batches must be greater than 0'
 
         self.verbose = verbosity
         self.log_top_path = log_top_path
+        self.num_workers = num_workers
+        self.use_partition_cache = use_partition_cache
+        self.stream_traces = stream_traces
 
         self.config_obj = config_obj
         self.op_mat_obj = op_mat_obj
         self.partitioner_obj = partitioner_obj
 
+        # Weight sparsity of a conv/gemm layer, dense when not given
+        self.sparsity_obj = sparsity_obj
+        if self.sparsity_obj is None:
+            self.sparsity_obj = LayerSparsity()
+            self.sparsity_obj.set_params(kind='dense')
+
+        # Precisions of the ifmap, filter and ofmap words, the config ones when not given
+        self.operand_precisions = self.config_obj.get_operand_precisions(layer_precisions=operand_precisions)
+
         self.layer_id = layer_id
+        self.num_batches = num_batches
 
         self.params_set = True
 
     #
     def run(self):
         self.num_input_part, self.num_filter_part = self.partitioner_obj.get_layer_partitions(layer_id=self.layer_id)
+        self.num_batch_part = self.partitioner_obj.get_layer_batch_parts(layer_id=self.layer_id)
+        self.num_reduction_part = self.partitioner_obj.get_layer_reduction_parts(layer_id=self.layer_id)
 
         self.compute_node_list = []
 
-        self.run_compute_all_parts()
-        self.run_mem_sim_all_parts()
+        if self.stream_traces:
+            self.run_all_parts_streaming()
+        elif self.use_partition_cache:
+            self.run_all_parts_cached()
+        elif self.num_workers > 1:
+            self.run_all_parts_parallel()
+        else:
+            self.run_compute_all_parts()
+            self.run_mem_sim_all_parts()
+
+    # Cores are numbered input partitions first, then filter partitions, then reduction partitions.
+    # The cores of a reduction partition hold partial sums of the same ofmap partition.
+    # The matmul cores of a heterogeneous layer come first, then the vector cores, each type
+    # partitions its rows of the operand matrices with its own entry
+    def get_operand_partitions(self):
+        ifmap_matrix, filter_matrix, ofmap_matrix = self.op_mat_obj.get_all_operand_matrix()
+
+        # The window is not split finer than one word per core
+        self.num_reduction_part = min(self.num_reduction_part, filter_matrix.shape[0])
+
+        self.part_ofmap_words_list = []
+        self.part_ifmap_starts_list = []
+        self.part_compute_params_list = []
+        operand_parts_list = []
+        for unit_entry, unit_row_start, unit_rows in \
+                self.partitioner_obj.get_layer_unit_row_splits(layer_id=self.layer_id, num_rows=ifmap_matrix.shape[0]):
+            if unit_rows == 0:
+                continue
+
+            unit_row_end = unit_row_start + unit_rows
+            operand_parts_list += \
+                self.get_unit_operand_partitions(ifmap_matrix=ifmap_matrix[unit_row_start:unit_row_end, :],
+                                                 filter_matrix=filter_matrix,
+                                                 ofmap_matrix=ofmap_matrix[unit_row_start:unit_row_end, :],
+                                                 unit_entry=unit_entry,
+                                                 unit_row_start=unit_row_start)
+
+        self.core_units_list = [compute_unit for compute_unit, _ in self.part_compute_params_list]
+        return operand_parts_list
+
+    # Partitions of the rows of one unit type, see PartitionManager for the layout of unit_entry
+    # and PartitionManager.get_part_bounds for the chunks of the rows and the columns
+    # unit_row_start is the row of the layer operand matrices the rows of the unit start at
+    def get_unit_operand_partitions(self, ifmap_matrix=None, filter_matrix=None, ofmap_matrix=None, unit_entry=None,
+                                    unit_row_start=0):
+        assert unit_entry is not None
+        compute_unit, dataflow = unit_entry[3:5]
+
+        row_bounds, col_bounds = self.partitioner_obj.get_part_bounds(layer_id=self.layer_id,
+                                                                      unit_entry=unit_entry,
+                                                                      num_rows=ifmap_matrix.shape[0],
+                                                                      num_cols=filter_matrix.shape[1],
+                                                                      window_sz=filter_matrix.shape[0],
+                                                                      num_reduction_part=self.num_reduction_part)
+        window_cols_per_part = math.ceil(filter_matrix.shape[0] / self.num_reduction_part)
+
+        operand_parts_list = []
+        for ifmap_row_start, ifmap_row_end in row_bounds:
+            ifmap_part = ifmap_matrix[ifmap_row_start:ifmap_row_end,:]
+
+            for filt_col_start, filt_col_end in col_bounds:
+                filter_part = filter_matrix[:, filt_col_start: filt_col_end]
+                ofmap_part = ofmap_matrix[ifmap_row_start: ifmap_row_end, filt_col_start:filt_col_end]
+
+                for red_part in range(self.num_reduction_part):
+                    window_col_start = red_part * window_cols_per_part
+                    window_col_end = min(window_col_start + window_cols_per_part, filter_matrix.shape[0])
+
+                    operand_parts_list += [(ifmap_part[:, window_col_start:window_col_end],
+                                            filter_part[window_col_start:window_col_end, :],
+                                            ofmap_part)]
+                    self.part_ofmap_words_list += [ofmap_part.shape[0] * ofmap_part.shape[1]]
+                    self.part_ifmap_starts_list += [(unit_row_start + ifmap_row_start, window_col_start)]
+                    self.part_compute_params_list += [(compute_unit, dataflow)]
+
+        return operand_parts_list
 
     #
     def run_compute_all_parts(self):
-        ifmap_matrix, filter_matrix, ofmap_matrix = self.op_mat_obj.get_all_operand_matrix()
-        compute_unit, opt_dataflow = self.partitioner_obj.get_opt_compute_params(layer_id=self.layer_id)
-        input_rows_per_part = math.ceil(ifmap_matrix.shape[0] / self.num_input_part)
-        filter_cols_per_part = math.ceil(filter_matrix.shape[1] / self.num_filter_part)
+        operand_parts_list = self.get_operand_partitions()
+
+        for (ifmap_part, filter_part, ofmap_part), (compute_unit, opt_dataflow) in \
+                zip(operand_parts_list, self.part_compute_params_list):
+            this_part_compute_node = self.create_part_compute_node(config_obj=self.config_obj,
+                                                                   compute_unit=compute_unit,
+                                                                   dataflow=opt_dataflow,
+                                                                   ifmap_part=ifmap_part,
+                                                                   filter_part=filter_part,
+                                                                   ofmap_part=ofmap_part,
+                                                                   sparsity_obj=self.sparsity_obj,
+                                                                   operand_precisions=self.operand_precisions)
+            self.compute_node_list += [this_part_compute_node]
 
-        for inp_part in range(self.num_input_part):
-            ifmap_row_start = inp_part * input_rows_per_part
-            ifmap_row_end = min(ifmap_row_start + input_rows_per_part, ifmap_matrix.shape[0])
+        self.compute_done = True
 
-            ifmap_part = ifmap_matrix[ifmap_row_start:ifmap_row_end,:]
+    #
+    def run_all_parts_parallel(self):
+        operand_parts_list = self.get_operand_partitions()
 
-            for filt_part in range(self.num_filter_part):
+        part_results = self.simulate_parts(operand_parts_list=operand_parts_list,
+                                           compute_params_list=self.part_compute_params_list)
 
-                filt_col_start = filt_part * filter_cols_per_part
-                filt_col_end = min(filt_col_start + filter_cols_per_part, filter_matrix.shape[1])
+        for this_part_compute_node, this_part_mem in part_results:
+            self.compute_node_list += [this_part_compute_node]
+            self.all_node_mem_objects += [this_part_mem]
 
-                filter_part = filter_matrix[:, filt_col_start: filt_col_end]
-                ofmap_part = ofmap_matrix[ifmap_row_start: ifmap_row_end, filt_col_start:filt_col_end]
+        self.compute_done = True
+        self.mem_traces_done = True
+
+    #
+    def run_all_parts_cached(self):
+        operand_parts_list = self.get_operand_partitions()
+
+        # The windows of neighbouring ofmap pixels overlap when an ofmap row has more than one column, the
+        # parts are then told apart by the ofmap column they start at and by their window columns.
+        # The parts of gemm layers, with a single ofmap column, only differ by a shift of their addresses
+        ofmap_cols = self.op_mat_obj.ofmap_cols
+
+        part_keys_list = []
+        unique_parts_list = []
+        unique_compute_params_list = []
+        unique_keys_list = []
+        for (ifmap_part, filter_part, ofmap_part), (compute_unit, opt_dataflow), (ifmap_row_start, window_col_start) \
+                in zip(operand_parts_list, self.part_compute_params_list, self.part_ifmap_starts_list):
+            ifmap_part_offset = (0, 0)
+            if ofmap_cols > 1:
+                ifmap_part_offset = (ifmap_row_start % ofmap_cols, window_col_start)
+
+            key = PartitionResultCache.get_key(config_obj=self.config_obj,
+                                               compute_unit=compute_unit,
+                                               dataflow=opt_dataflow,
+                                               ifmap_part_shape=ifmap_part.shape,
+                                               filter_part_shape=filter_part.shape,
+                                               sparsity_descriptor=self.sparsity_obj.get_descriptor(),
+                                               operand_precisions=self.operand_precisions,
+                                               ifmap_part_offset=ifmap_part_offset)
+            part_keys_list += [key]
+
+            if not self.partition_cache.contains(key) and key not in unique_keys_list:
+                unique_keys_list += [key]
+                unique_parts_list += [(ifmap_part, filter_part, ofmap_part)]
+                unique_compute_params_list += [(compute_unit, opt_dataflow)]
+
+        # Only one representative per distinct partition is simulated
+        part_results = self.simulate_parts(operand_parts_list=unique_parts_list,
+                                           compute_params_list=unique_compute_params_list)
+
+        for key, (this_part_compute_node, this_part_mem) in zip(unique_keys_list, part_results):
+            part_report_items = self.get_part_report_items(compute_system=this_part_compute_node,
+                                                           memory_system=this_part_mem)
+            self.partition_cache.insert(key, part_report_items)
+
+        for key in part_keys_list:
+            self.part_report_items_list += [self.partition_cache.lookup(key)]
+
+        self.compute_done = True
+        self.mem_traces_done = True
 
-                this_part_compute_node = ComputeNode()
-                this_part_compute_node.set_params(config=self.config_obj,
-                                                  compute_unit=compute_unit,
-                                                  dataflow=opt_dataflow)
+    # The operand matrices of all the cores are built up front, only the traces of one core are in memory at a time
+    def run_all_parts_streaming(self):
+        operand_parts_list = self.get_operand_partitions()
+        _, trace_chunk_lines = self.config_obj.get_trace_stream_params()
+        trace_format = self.config_obj.get_trace_format()
 
-                this_part_compute_node.set_operands(ifmap_opmat=ifmap_part,
-                                                    filter_opmat=filter_part,
-                                                    ofmap_opmat=ofmap_part)
-                this_part_compute_node.calc_demand_matrices()
+        self.build_trace_log_dirs(num_cores=len(operand_parts_list))
 
-                self.compute_node_list += [this_part_compute_node]
+        part_args_list = []
+        for part_idx, (ifmap_part, filter_part, ofmap_part) in enumerate(operand_parts_list):
+            compute_unit, opt_dataflow = self.part_compute_params_list[part_idx]
+            part_args_list += [(self.config_obj, compute_unit, opt_dataflow,
+                                ifmap_part, filter_part, ofmap_part, self.sparsity_obj, self.operand_precisions,
+                                self.get_trace_dir_name(part_idx), trace_chunk_lines, trace_format)]
+
+        # Each core writes its traces and is reduced to its report items before the next one starts
+        self.part_report_items_list = self.map_parts(part_worker=simulate_single_part_streaming,
+                                                     part_args_list=part_args_list)
 
         self.compute_done = True
-        
+        self.mem_traces_done = True
+        self.traces_streamed = True
+
+    # compute_params_list holds the compute unit and the dataflow of every partition
+    def simulate_parts(self, operand_parts_list=None, compute_params_list=None):
+        assert operand_parts_list is not None and compute_params_list is not None
+
+        part_args_list = []
+        for (ifmap_part, filter_part, ofmap_part), (compute_unit, dataflow) in \
+                zip(operand_parts_list, compute_params_list):
+            part_args_list += [(self.config_obj, compute_unit, dataflow,
+                                ifmap_part, filter_part, ofmap_part, self.sparsity_obj, self.operand_precisions)]
+
+        return self.map_parts(part_worker=simulate_single_part, part_args_list=part_args_list)
+
     #
+    def map_parts(self, part_worker=None, part_args_list=None):
+        assert part_worker is not None and part_args_list is not None
+
+        if self.num_workers < 2 or len(part_args_list) < 2:
+            part_results = []
+            for part_args in part_args_list:
+                part_results += [part_worker(part_args, verbose=self.verbose)]
+            return part_results
+
+        # Pool.map returns the results in the order of the inputs,
+        # hence the per core lists are identical to a serial run
+        num_processes = min(self.num_workers, len(part_args_list))
+        with Pool(processes=num_processes) as pool:
+            part_results = pool.map(part_worker, part_args_list)
+
+        return part_results
+
+    # The cores split the rows of the operand of one batch, and run their rows of every batch.
+    # Balanced partitions give every core the same rows give or take one
     def run_simd_all_parts(self, operand_matrix, optype = 'relu'):
         
         self.num_input_part = 1
         self.num_filter_part = self.config_obj.get_num_cores()
+        self.num_batch_part = 1
+        self.num_reduction_part = 1
 
-        input_rows_per_part = math.ceil((operand_matrix.shape[0]) / (self.num_input_part*self.num_filter_part))
-
-        for inp_part in range(self.num_input_part):
-            for filt_part in range(self.num_filter_part):
+        chunk_scheme = 'EVEN' if self.config_obj.get_balanced_partitions() else 'CEIL'
+        for operand_row_start, operand_row_end in \
+                PartitionManager.get_chunk_bounds(num_rows=operand_matrix.shape[0],
+                                                  num_parts=self.num_input_part * self.num_filter_part,
+                                                  scheme=chunk_scheme):
+            # Fewer rows than cores leave the last cores idle
+            if operand_row_end <= operand_row_start:
+                continue
 
-                operand_row_start = (inp_part+filt_part) * input_rows_per_part
-                operand_row_end = operand_row_start + input_rows_per_part
-                if operand_row_end > operand_matrix.shape[0]:
-                    operand_row_end = operand_matrix.shape[0]
+            operand_part = operand_matrix[operand_row_start: operand_row_end, :]
 
-                operand_part = operand_matrix[operand_row_start: operand_row_end, :]
+            this_part_compute_node = ComputeNode()
+            this_part_compute_node.set_params(config=self.config_obj,
+                                              compute_unit='simd', optype = optype)
 
-                this_part_compute_node = ComputeNode()
-                this_part_compute_node.set_params(config=self.config_obj,
-                                                  compute_unit='simd', optype = optype)
+            this_part_compute_node.set_operands(ifmap_opmat=operand_part)
 
-                this_part_compute_node.set_operands(ifmap_opmat=operand_part)
-
-                self.compute_node_list += [this_part_compute_node]
+            self.compute_node_list += [this_part_compute_node]
+            self.core_units_list += ['simd']
 
         self.compute_done = True
 
@@ -175,172 +421,367 @@ class SingleLayerSim:
     def run_mem_sim_all_parts(self):
         assert self.compute_done
 
-        bandwidth_mode = self.config_obj.get_bandwidth_use_mode()
+        for compute_node in self.compute_node_list:
+            this_part_mem = self.run_part_mem_sim(config_obj=self.config_obj,
+                                                  compute_node=compute_node,
+                                                  verbose=self.verbose,
+                                                  operand_precisions=self.operand_precisions)
+            self.all_node_mem_objects += [this_part_mem]
+
+        self.mem_traces_done = True
+
+    #
+    @staticmethod
+    def create_part_compute_node(config_obj=KrittikaConfig(),
+                                 compute_unit='matmul', dataflow='ws',
+                                 ifmap_part=None, filter_part=None, ofmap_part=None,
+                                 sparsity_obj=None, operand_precisions=None):
+        _, filter_precision, _ = config_obj.get_operand_precisions(layer_precisions=operand_precisions)
+
+        this_part_compute_node = ComputeNode()
+        this_part_compute_node.set_params(config=config_obj,
+                                          compute_unit=compute_unit,
+                                          dataflow=dataflow,
+                                          sparsity_obj=sparsity_obj,
+                                          filter_word_bits=int(8 * config_obj.get_precision_bytes(filter_precision)))
+
+        this_part_compute_node.set_operands(ifmap_opmat=ifmap_part,
+                                            filter_opmat=filter_part,
+                                            ofmap_opmat=ofmap_part)
+        this_part_compute_node.calc_demand_matrices()
+
+        return this_part_compute_node
+
+    #
+    @staticmethod
+    def run_part_mem_sim(config_obj=KrittikaConfig(), compute_node=None, verbose=True,
+                         trace_dir_name=None, trace_chunk_lines=10000, trace_format='csv',
+                         operand_precisions=None):
+        assert compute_node is not None
+
+        # The scratchpads count words, the sizes and bandwidths are in words of the operand precisions
+        bandwidth_mode = config_obj.get_bandwidth_use_mode()
         per_core_ifmap_buf_size, per_core_fitler_buf_size, per_core_ofmap_buf_size \
-            = ([i * 1024 for i in self.config_obj.get_per_unit_sram_sizes_kb()])
+            = config_obj.get_per_unit_sram_sizes_words(precisions=operand_precisions)
 
         per_core_ifmap_bw, per_core_filter_bw, per_core_ofmap_bw\
-            = self.config_obj.get_interface_bandwidths()
-
-        for compute_node in self.compute_node_list:
+            = config_obj.get_interface_bandwidths_words(precisions=operand_precisions)
 
+        if trace_dir_name is None:
             this_part_mem = double_buffered_scratchpad()
-            this_part_mem.set_params(verbose=self.verbose,
-                                     estimate_bandwidth_mode=bandwidth_mode,
-                                     ifmap_buf_size_bytes=per_core_ifmap_buf_size,
-                                     filter_buf_size_bytes=per_core_fitler_buf_size,
-                                     ofmap_buf_size_bytes=per_core_ofmap_buf_size,
-                                     ifmap_backing_buf_bw=per_core_ifmap_bw,
-                                     filter_backing_buf_bw=per_core_filter_bw,
-                                     ofmap_backing_buf_bw=per_core_ofmap_bw
-                                     )
-
-            # Demand mat
-            this_node_ifmap_demand_mat, this_node_filter_demand_mat, this_node_ofmap_demand_mat \
-                = compute_node.get_demand_matrices()
-
-            this_node_ifmap_fetch_mat, this_node_filter_fetch_mat = compute_node.get_prefetch_matrices()
-            if (self.config_obj.get_bandwidth_use_mode()=="USER"):
-                this_part_mem.set_read_buf_prefetch_matrices(ifmap_prefetch_mat=this_node_ifmap_fetch_mat,
+        else:
+            # Traces are written to trace_dir_name while the requests are serviced
+            ifmap_sram_filename, filter_sram_filename, ofmap_sram_filename, \
+                ifmap_dram_filename, filter_dram_filename, ofmap_dram_filename \
+                = SingleLayerSim.get_trace_filenames(trace_dir_name, trace_format=trace_format)
+
+            this_part_mem = StreamingScratchpad()
+            this_part_mem.set_stream_params(ifmap_sram_filename=ifmap_sram_filename,
+                                            filter_sram_filename=filter_sram_filename,
+                                            ofmap_sram_filename=ofmap_sram_filename,
+                                            ifmap_dram_filename=ifmap_dram_filename,
+                                            filter_dram_filename=filter_dram_filename,
+                                            ofmap_dram_filename=ofmap_dram_filename,
+                                            chunk_lines=trace_chunk_lines,
+                                            trace_format=trace_format)
+
+        this_part_mem.set_params(verbose=verbose,
+                                 estimate_bandwidth_mode=bandwidth_mode,
+                                 ifmap_buf_size_bytes=per_core_ifmap_buf_size,
+                                 filter_buf_size_bytes=per_core_fitler_buf_size,
+                                 ofmap_buf_size_bytes=per_core_ofmap_buf_size,
+                                 ifmap_backing_buf_bw=per_core_ifmap_bw,
+                                 filter_backing_buf_bw=per_core_filter_bw,
+                                 ofmap_backing_buf_bw=per_core_ofmap_bw
+                                 )
+
+        # Demand mat
+        this_node_ifmap_demand_mat, this_node_filter_demand_mat, this_node_ofmap_demand_mat \
+            = compute_node.get_demand_matrices()
+
+        this_node_ifmap_fetch_mat, this_node_filter_fetch_mat = compute_node.get_prefetch_matrices()
+        if (bandwidth_mode=="USER"):
+            this_part_mem.set_read_buf_prefetch_matrices(ifmap_prefetch_mat=this_node_ifmap_fetch_mat,
                                                          filter_prefetch_mat=this_node_filter_fetch_mat
                                                          )
-            this_part_mem.service_memory_requests(this_node_ifmap_demand_mat,
-                                                  this_node_filter_demand_mat,
-                                                  this_node_ofmap_demand_mat)
-
-            self.all_node_mem_objects += [this_part_mem]
-
-        self.mem_traces_done = True
+        this_part_mem.service_memory_requests(this_node_ifmap_demand_mat,
+                                              this_node_filter_demand_mat,
+                                              this_node_ofmap_demand_mat)
 
-
-    # 
-    def gather_simd_report_items_across_cores(self):
-        assert self.compute_done
-        for core_id in range(len(self.compute_node_list)):
-            compute_system = self.compute_node_list[core_id]
-
-            # Compute report
-            num_compute = compute_system.get_num_compute()
-            num_unit = compute_system.get_num_units()
-            total_cycles = compute_system.get_total_cycles()
-            
-            stall_cycles = 0
-
-            overall_util = (num_compute * 100) / (total_cycles * num_unit)
-            mapping_eff = compute_system.get_avg_mapping_efficiency() * 100
-            compute_util = compute_system.get_avg_compute_utilization() * 100
-
-            self.total_cycles_list += [total_cycles]
-            self.stall_cycles_list += [stall_cycles]
-            self.overall_util_list += [overall_util]
-            self.mapping_eff_list += [mapping_eff]
-            self.compute_util_list += [compute_util]
+        return this_part_mem
 
     #
     def gather_report_items_across_cores(self):
         assert self.compute_done and self.mem_traces_done
 
-        for core_id in range(len(self.compute_node_list)):
-            compute_system = self.compute_node_list[core_id]
-            memory_system = self.all_node_mem_objects[core_id]
-
-            # Compute report
-            num_compute = compute_system.get_num_compute()
-            num_unit = compute_system.get_num_units()
-            total_cycles = memory_system.get_total_compute_cycles()
-            
-            stall_cycles = memory_system.get_stall_cycles()
-            overall_util = (num_compute * 100) / (total_cycles * num_unit)
-            mapping_eff = compute_system.get_avg_mapping_efficiency() * 100
-            compute_util = compute_system.get_avg_compute_utilization() * 100
-
-            self.total_cycles_list += [total_cycles]
-            self.stall_cycles_list += [stall_cycles]
-            self.overall_util_list += [overall_util]
-            self.mapping_eff_list += [mapping_eff]
-            self.compute_util_list += [compute_util]
-
-            # BW report
-            ifmap_sram_reads = compute_system.get_ifmap_requests()
-            filter_sram_reads = compute_system.get_filter_requests()
-            ofmap_sram_writes = compute_system.get_ofmap_requests()
-            avg_ifmap_sram_bw = ifmap_sram_reads / total_cycles
-            avg_filter_sram_bw = filter_sram_reads / total_cycles
-            avg_ofmap_sram_bw = ofmap_sram_writes / total_cycles
-
-            self.ifmap_sram_reads_list += [ifmap_sram_reads]
-            self.filter_sram_reads_list += [filter_sram_reads]
-            self.ofmap_sram_writes_list += [ofmap_sram_writes]
-            self.avg_ifmap_sram_bw_list += [avg_ifmap_sram_bw]
-            self.avg_filter_sram_bw_list += [avg_filter_sram_bw]
-            self.avg_ofmap_sram_bw_list += [avg_ofmap_sram_bw]
-
-            # Detail report
-            ifmap_sram_start_cycle, ifmap_sram_stop_cycle = memory_system.get_ifmap_sram_start_stop_cycles()
-            filter_sram_start_cycle, filter_sram_stop_cycle = memory_system.get_filter_sram_start_stop_cycles()
-            ofmap_sram_start_cycle, ofmap_sram_stop_cycle = memory_system.get_ofmap_sram_start_stop_cycles()
-
-            ifmap_dram_start_cycle, ifmap_dram_stop_cycle, ifmap_dram_reads = memory_system.get_ifmap_dram_details()
-            filter_dram_start_cycle, filter_dram_stop_cycle, filter_dram_reads = memory_system.get_filter_dram_details()
-            ofmap_dram_start_cycle, ofmap_dram_stop_cycle, ofmap_dram_writes = memory_system.get_ofmap_dram_details()
-
-            self.ifmap_sram_start_cycle_list += [ifmap_sram_start_cycle]
-            self.ifmap_sram_stop_cycle_list += [ifmap_sram_stop_cycle]
-            self.filter_sram_start_cycle_list += [filter_sram_start_cycle]
-            self.filter_sram_stop_cycle_list += [filter_sram_stop_cycle]
-            self.ofmap_sram_start_cycle_list += [ofmap_sram_start_cycle]
-            self.ofmap_sram_stop_cycle_list += [ofmap_sram_stop_cycle]
-
-            self.ifmap_dram_start_cycle_list += [ifmap_dram_start_cycle]
-            self.ifmap_dram_stop_cycle_list += [ifmap_dram_stop_cycle]
-            self.filter_dram_start_cycle_list += [filter_dram_start_cycle]
-            self.filter_dram_stop_cycle_list += [filter_dram_stop_cycle]
-            self.ofmap_dram_start_cycle_list += [ofmap_dram_start_cycle]
-            self.ofmap_dram_stop_cycle_list += [ofmap_dram_stop_cycle]
-
-            self.ifmap_dram_reads_list += [ifmap_dram_reads]
-            self.filter_dram_reads_list += [filter_dram_reads]
-            self.ofmap_dram_writes_list += [ofmap_dram_writes]
-
-            # BW calc for DRAM access
-            avg_ifmap_dram_bw = ifmap_dram_reads / (ifmap_dram_stop_cycle - ifmap_dram_start_cycle + 1)
-            avg_filter_dram_bw = filter_dram_reads / (filter_dram_stop_cycle - filter_dram_start_cycle + 1)
-            avg_ofmap_dram_bw = ofmap_dram_writes / (ofmap_dram_stop_cycle - ofmap_dram_start_cycle + 1)
-
-            self.avg_ifmap_dram_bw_list += [avg_ifmap_dram_bw]
-            self.avg_filter_dram_bw_list += [avg_filter_dram_bw]
-            self.avg_ofmap_dram_bw_list += [avg_ofmap_dram_bw]
+        # Items are already available when the partitions were served from the cache
+        if len(self.part_report_items_list) == 0:
+            for core_id in range(len(self.compute_node_list)):
+                compute_system = self.compute_node_list[core_id]
+                memory_system = self.all_node_mem_objects[core_id]
+                self.part_report_items_list += [self.get_part_report_items(compute_system=compute_system,
+                                                                           memory_system=memory_system)]
+
+        for part_report_items in self.part_report_items_list:
+            for item_name in self.report_item_names:
+                getattr(self, item_name + '_list').append(part_report_items[item_name])
 
+        self.add_reduction_step()
+        self.expand_batch_groups()
         self.report_metrics_ready = True
 
+    # The cores splitting the window of a partition add up their partial sums along a binary tree
+    # onto the first core of the group, see PartitionManager.get_reduction_level_cycles.
+    # A core stays busy until it sends its sums, at the level of the lowest set bit of its position
+    # in the group, and the first core until the last level. Only the first core writes the ofmap
+    # to the DRAM, the others send their partial sums over the interconnect instead
+    def add_reduction_step(self):
+        self.reduction_words = 0
+        self.reduction_cycles = 0
+        if self.num_reduction_part == 1:
+            return
+
+        link_bw, link_latency = self.config_obj.get_interconnect_link_params()
+        simd_length = self.config_obj.get_simd_length()
+        num_levels = int(PartitionManager.get_reduction_levels(self.num_reduction_part))
+
+        for core_id in range(len(self.total_cycles_list)):
+            group_core_id = core_id % self.num_reduction_part
+            psum_words = self.part_ofmap_words_list[core_id]
+
+            core_levels = num_levels
+            if group_core_id > 0:
+                core_levels = (group_core_id & -group_core_id).bit_length()
+                self.reduction_words += psum_words
+                self.ofmap_dram_writes_list[core_id] = 0
+                self.avg_ofmap_dram_bw_list[core_id] = 0
+
+            core_reduction_cycles = core_levels * \
+                PartitionManager.get_reduction_level_cycles(psum_words=psum_words, link_bw=link_bw,
+                                                            link_latency=link_latency, simd_length=simd_length)
+            self.reduction_cycles = max(self.reduction_cycles, core_reduction_cycles)
+
+            # The first core writes the reduced ofmap once the last level is done
+            if group_core_id == 0:
+                self.ofmap_dram_start_cycle_list[core_id] += core_reduction_cycles
+                self.ofmap_dram_stop_cycle_list[core_id] += core_reduction_cycles
+
+            # The same work and SRAM accesses are spread over more cycles
+            compute_cycles = self.total_cycles_list[core_id]
+            self.total_cycles_list[core_id] = compute_cycles + core_reduction_cycles
+            cycles_ratio = compute_cycles / self.total_cycles_list[core_id]
+            for item_name in ['overall_util', 'avg_ifmap_sram_bw', 'avg_filter_sram_bw', 'avg_ofmap_sram_bw']:
+                getattr(self, item_name + '_list')[core_id] *= cycles_ratio
+
+    # Only one batch of the first batch group is simulated. The cores of every batch group run
+    # their partition of each batch of the group back to back, and only the address offsets differ
+    # between the batches, which the reported cycles and access counts do not depend on.
+    # The per core lists are extended to all the batch groups, cores are numbered group by group
+    def expand_batch_groups(self):
+        if self.num_batches == 1 and self.num_batch_part == 1:
+            return
+
+        part_report_items_list = []
+        for core_id in range(len(self.total_cycles_list)):
+            part_report_items = {}
+            for item_name in self.report_item_names:
+                part_report_items[item_name] = getattr(self, item_name + '_list')[core_id]
+            part_report_items_list += [part_report_items]
+
+        for item_name in self.report_item_names:
+            setattr(self, item_name + '_list', [])
+
+        group_core_units_list = self.core_units_list
+        self.core_units_list = []
+
+        batches_per_group = math.ceil(self.num_batches / self.num_batch_part)
+        for batch_group in range(self.num_batch_part):
+            # More batch groups than batches leave the last cores idle
+            group_batches = min(batches_per_group, self.num_batches - batch_group * batches_per_group)
+            if group_batches < 1:
+                break
+
+            self.core_units_list += group_core_units_list
+
+            for part_report_items in part_report_items_list:
+                group_report_items = self.get_batched_report_items(part_report_items=part_report_items,
+                                                                   num_batches=group_batches)
+                for item_name in self.report_item_names:
+                    getattr(self, item_name + '_list').append(group_report_items[item_name])
+
+    # Report items of a core running num_batches batches back to back, from the ones of one batch
+    @staticmethod
+    def get_batched_report_items(part_report_items=None, num_batches=1):
+        assert part_report_items is not None
+        batched_report_items = dict(part_report_items)
+
+        batch_cycles = part_report_items['total_cycles']
+        batched_report_items['total_cycles'] = batch_cycles * num_batches
+        batched_report_items['stall_cycles'] = part_report_items['stall_cycles'] * num_batches
+
+        # The utilizations and the SRAM bandwidths do not change
+        operand_accesses = [('ifmap_sram', 'ifmap_sram_reads'), ('filter_sram', 'filter_sram_reads'),
+                            ('ofmap_sram', 'ofmap_sram_writes'), ('ifmap_dram', 'ifmap_dram_reads'),
+                            ('filter_dram', 'filter_dram_reads'), ('ofmap_dram', 'ofmap_dram_writes')]
+        for operand, access_name in operand_accesses:
+            batched_report_items[access_name] = part_report_items[access_name] * num_batches
+
+            # The accesses of the last batch end num_batches - 1 batches later
+            if part_report_items[access_name] > 0:
+                batched_report_items[operand + '_stop_cycle'] += (num_batches - 1) * batch_cycles
+
+        for operand, access_name in operand_accesses[3:]:
+            start_cycle = batched_report_items[operand + '_start_cycle']
+            stop_cycle = batched_report_items[operand + '_stop_cycle']
+            batched_report_items['avg_' + operand + '_bw'] = \
+                batched_report_items[access_name] / (stop_cycle - start_cycle + 1)
+
+        return batched_report_items
+
+    #
+    @staticmethod
+    def get_part_report_items(compute_system=None, memory_system=None):
+        assert compute_system is not None and memory_system is not None
+        part_report_items = {}
+
+        # Compute report
+        num_compute = compute_system.get_num_compute()
+        num_unit = compute_system.get_num_units()
+        total_cycles = memory_system.get_total_compute_cycles()
+
+        stall_cycles = memory_system.get_stall_cycles()
+        overall_util = (num_compute * 100) / (total_cycles * num_unit)
+        mapping_eff = compute_system.get_avg_mapping_efficiency() * 100
+        compute_util = compute_system.get_avg_compute_utilization() * 100
+
+        part_report_items['total_cycles'] = total_cycles
+        part_report_items['stall_cycles'] = stall_cycles
+        part_report_items['overall_util'] = overall_util
+        part_report_items['mapping_eff'] = mapping_eff
+        part_report_items['compute_util'] = compute_util
+
+        # BW report
+        ifmap_sram_reads = compute_system.get_ifmap_requests()
+        filter_sram_reads = compute_system.get_filter_requests()
+        ofmap_sram_writes = compute_system.get_ofmap_requests()
+        avg_ifmap_sram_bw = ifmap_sram_reads / total_cycles
+        avg_filter_sram_bw = filter_sram_reads / total_cycles
+        avg_ofmap_sram_bw = ofmap_sram_writes / total_cycles
+
+        part_report_items['ifmap_sram_reads'] = ifmap_sram_reads
+        part_report_items['filter_sram_reads'] = filter_sram_reads
+        part_report_items['ofmap_sram_writes'] = ofmap_sram_writes
+        part_report_items['avg_ifmap_sram_bw'] = avg_ifmap_sram_bw
+        part_report_items['avg_filter_sram_bw'] = avg_filter_sram_bw
+        part_report_items['avg_ofmap_sram_bw'] = avg_ofmap_sram_bw
+
+        # Detail report
+        ifmap_sram_start_cycle, ifmap_sram_stop_cycle = memory_system.get_ifmap_sram_start_stop_cycles()
+        filter_sram_start_cycle, filter_sram_stop_cycle = memory_system.get_filter_sram_start_stop_cycles()
+        ofmap_sram_start_cycle, ofmap_sram_stop_cycle = memory_system.get_ofmap_sram_start_stop_cycles()
+
+        ifmap_dram_start_cycle, ifmap_dram_stop_cycle, ifmap_dram_reads = memory_system.get_ifmap_dram_details()
+        # SIMD parts have no filter operand, the filter buffer never goes to the DRAM
+        filter_dram_start_cycle, filter_dram_stop_cycle, filter_dram_reads = 0, 0, 0
+        if filter_sram_reads > 0:
+            filter_dram_start_cycle, filter_dram_stop_cycle, filter_dram_reads = memory_system.get_filter_dram_details()
+            # Sparse weights come from the DRAM compressed, along with their metadata
+            filter_dram_reads = math.ceil(filter_dram_reads * compute_system.get_filter_dram_scale())
+        ofmap_dram_start_cycle, ofmap_dram_stop_cycle, ofmap_dram_writes = memory_system.get_ofmap_dram_details()
+
+        part_report_items['ifmap_sram_start_cycle'] = ifmap_sram_start_cycle
+        part_report_items['ifmap_sram_stop_cycle'] = ifmap_sram_stop_cycle
+        part_report_items['filter_sram_start_cycle'] = filter_sram_start_cycle
+        part_report_items['filter_sram_stop_cycle'] = filter_sram_stop_cycle
+        part_report_items['ofmap_sram_start_cycle'] = ofmap_sram_start_cycle
+        part_report_items['ofmap_sram_stop_cycle'] = ofmap_sram_stop_cycle
+
+        part_report_items['ifmap_dram_start_cycle'] = ifmap_dram_start_cycle
+        part_report_items['ifmap_dram_stop_cycle'] = ifmap_dram_stop_cycle
+        part_report_items['filter_dram_start_cycle'] = filter_dram_start_cycle
+        part_report_items['filter_dram_stop_cycle'] = filter_dram_stop_cycle
+        part_report_items['ofmap_dram_start_cycle'] = ofmap_dram_start_cycle
+        part_report_items['ofmap_dram_stop_cycle'] = ofmap_dram_stop_cycle
+
+        part_report_items['ifmap_dram_reads'] = ifmap_dram_reads
+        part_report_items['filter_dram_reads'] = filter_dram_reads
+        part_report_items['ofmap_dram_writes'] = ofmap_dram_writes
+
+        # BW calc for DRAM access
+        avg_ifmap_dram_bw = ifmap_dram_reads / (ifmap_dram_stop_cycle - ifmap_dram_start_cycle + 1)
+        avg_filter_dram_bw = filter_dram_reads / (filter_dram_stop_cycle - filter_dram_start_cycle + 1)
+        avg_ofmap_dram_bw = ofmap_dram_writes / (ofmap_dram_stop_cycle - ofmap_dram_start_cycle + 1)
+
+        part_report_items['avg_ifmap_dram_bw'] = avg_ifmap_dram_bw
+        part_report_items['avg_filter_dram_bw'] = avg_filter_dram_bw
+        part_report_items['avg_ofmap_dram_bw'] = avg_ofmap_dram_bw
+
+        return part_report_items
+
     #
     def save_traces(self):
         assert self.mem_traces_done
+        assert not self.use_partition_cache, 'Traces are not available for partitions served from the cache'
+
+        # Streamed traces are already on disk
+        if self.traces_streamed:
+            return
+
         self.build_trace_log_dirs()
+        trace_format = self.config_obj.get_trace_format()
 
         for part_idx in range(len(self.all_node_mem_objects)):
-            trace_dir_name = self.log_top_path + \
-                             '/traces/layer' + str(self.layer_id) + \
-                             '/core' + str(part_idx)
+            ifmap_sram_filename, filter_sram_filename, ofmap_sram_filename, \
+                ifmap_dram_filename, filter_dram_filename, ofmap_dram_filename \
+                = self.get_trace_filenames(self.get_trace_dir_name(part_idx), trace_format=trace_format)
 
-            ifmap_sram_filename = trace_dir_name + '/IFMAP_SRAM_TRACE.csv'
-            filter_sram_filename = trace_dir_name + '/FILTER_SRAM_TRACE.csv'
-            ofmap_sram_filename = trace_dir_name + '/OFMAP_SRAM_TRACE.csv'
+            memory_system = self.all_node_mem_objects[part_idx]
+            if trace_format == 'csv':
+                memory_system.print_ifmap_sram_trace(ifmap_sram_filename)
+                memory_system.print_ifmap_dram_trace(ifmap_dram_filename)
+                memory_system.print_filter_sram_trace(filter_sram_filename)
+                memory_system.print_filter_dram_trace(filter_dram_filename)
+                memory_system.print_ofmap_sram_trace(ofmap_sram_filename)
+                memory_system.print_ofmap_dram_trace(ofmap_dram_filename)
+                continue
+
+            trace_files_list = [(ifmap_sram_filename, memory_system.get_ifmap_sram_trace_matrix()),
+                                (ifmap_dram_filename, memory_system.get_ifmap_dram_trace_matrix()),
+                                (filter_sram_filename, memory_system.get_filter_sram_trace_matrix()),
+                                (filter_dram_filename, memory_system.get_filter_dram_trace_matrix()),
+                                (ofmap_sram_filename, memory_system.get_ofmap_sram_trace_matrix()),
+                                (ofmap_dram_filename, memory_system.get_ofmap_dram_trace_matrix())]
+            for trace_filename, trace_matrix in trace_files_list:
+                TraceWriter.write_trace_matrix(filename=trace_filename,
+                                               trace_matrix=trace_matrix,
+                                               trace_format=trace_format)
 
-            ifmap_dram_filename = trace_dir_name + '/IFMAP_DRAM_TRACE.csv'
-            filter_dram_filename = trace_dir_name + '/FILTER_DRAM_TRACE.csv'
-            ofmap_dram_filename = trace_dir_name + '/OFMAP_DRAM_TRACE.csv'
+    #
+    def get_trace_dir_name(self, part_idx=0):
+        trace_dir_name = self.log_top_path + \
+                         '/traces/layer' + str(self.layer_id) + \
+                         '/core' + str(part_idx)
+        return trace_dir_name
+
+    #
+    @staticmethod
+    def get_trace_filenames(trace_dir_name='./', trace_format='csv'):
+        ifmap_sram_filename = TraceWriter.get_trace_filename(trace_dir_name + '/IFMAP_SRAM_TRACE', trace_format)
+        filter_sram_filename = TraceWriter.get_trace_filename(trace_dir_name + '/FILTER_SRAM_TRACE', trace_format)
+        ofmap_sram_filename = TraceWriter.get_trace_filename(trace_dir_name + '/OFMAP_SRAM_TRACE', trace_format)
+
+        ifmap_dram_filename = TraceWriter.get_trace_filename(trace_dir_name + '/IFMAP_DRAM_TRACE', trace_format)
+        filter_dram_filename = TraceWriter.get_trace_filename(trace_dir_name + '/FILTER_DRAM_TRACE', trace_format)
+        ofmap_dram_filename = TraceWriter.get_trace_filename(trace_dir_name + '/OFMAP_DRAM_TRACE', trace_format)
+
+        return ifmap_sram_filename, filter_sram_filename, ofmap_sram_filename, \
+            ifmap_dram_filename, filter_dram_filename, ofmap_dram_filename
+
+    #
+    def build_trace_log_dirs(self, num_cores=None):
+        if num_cores is None:
+            num_cores = len(self.compute_node_list)
 
-            memory_system = self.all_node_mem_objects[part_idx]
-            memory_system.print_ifmap_sram_trace(ifmap_sram_filename)
-            memory_system.print_ifmap_dram_trace(ifmap_dram_filename)
-            memory_system.print_filter_sram_trace(filter_sram_filename)
-            memory_system.print_filter_dram_trace(filter_dram_filename)
-            memory_system.print_ofmap_sram_trace(ofmap_sram_filename)
-            memory_system.print_ofmap_dram_trace(ofmap_dram_filename)
-
-#
-    def build_trace_log_dirs(self):
         self.check_and_build(self.log_top_path)
 
         l1_dir = self.log_top_path + '/traces'
@@ -349,10 +790,47 @@ class SingleLayerSim:
         l2_dir = l1_dir + '/layer' + str(self.layer_id)
         self.check_and_build(l2_dir)
 
-        for core_id in range(len(self.compute_node_list)):
+        for core_id in range(num_cores):
             this_core_dir = l2_dir + '/core' + str(core_id)
             self.check_and_build(this_core_dir)
 
+    #
+    def get_cacheable_report_items(self):
+        assert self.report_metrics_ready
+
+        report_items = {'num_input_part': self.num_input_part,
+                        'num_filter_part': self.num_filter_part,
+                        'num_batch_part': self.num_batch_part,
+                        'num_reduction_part': self.num_reduction_part,
+                        'reduction_words': self.reduction_words,
+                        'reduction_cycles': self.reduction_cycles,
+                        'core_units_list': self.core_units_list}
+        for item_name in self.report_item_names:
+            report_items[item_name + '_list'] = getattr(self, item_name + '_list')
+
+        return report_items
+
+    #
+    def load_cached_report_items(self, report_items=None):
+        assert report_items is not None
+
+        for item_name, value in report_items.items():
+            setattr(self, item_name, value)
+
+        # The operand matrices were not created, see Simulator.run_activation_layer
+        self.results_from_cache = True
+        self.compute_done = True
+        self.mem_traces_done = True
+        self.report_metrics_ready = True
+
+    #
+    def release_simulation_objects(self):
+        # Drop the per core compute and memory objects once the reports are gathered
+        assert self.report_metrics_ready
+
+        self.compute_node_list = []
+        self.all_node_mem_objects = []
+
     def get_ofmap_operand_matrix(self):
         
         if not self.compute_done:
@@ -370,7 +848,48 @@ class SingleLayerSim:
             os.system(cmd)
 
 
-
-
-
-
+# Worker for the process pool, kept at the module level so that it can be pickled
+def simulate_single_part(part_args, verbose=False):
+    config_obj, compute_unit, dataflow, ifmap_part, filter_part, ofmap_part, \
+        sparsity_obj, operand_precisions = part_args
+
+    this_part_compute_node = SingleLayerSim.create_part_compute_node(config_obj=config_obj,
+                                                                     compute_unit=compute_unit,
+                                                                     dataflow=dataflow,
+                                                                     ifmap_part=ifmap_part,
+                                                                     filter_part=filter_part,
+                                                                     ofmap_part=ofmap_part,
+                                                                     sparsity_obj=sparsity_obj,
+                                                                     operand_precisions=operand_precisions)
+    # Progress bars from concurrent workers would interleave, pool workers keep them quiet
+    this_part_mem = SingleLayerSim.run_part_mem_sim(config_obj=config_obj,
+                                                    compute_node=this_part_compute_node,
+                                                    verbose=verbose,
+                                                    operand_precisions=operand_precisions)
+
+    return this_part_compute_node, this_part_mem
+
+
+# Streaming counterpart of simulate_single_part, only the report items of the core are returned
+def simulate_single_part_streaming(part_args, verbose=False):
+    config_obj, compute_unit, dataflow, ifmap_part, filter_part, ofmap_part, sparsity_obj, \
+        operand_precisions, trace_dir_name, trace_chunk_lines, trace_format = part_args
+
+    this_part_compute_node = SingleLayerSim.create_part_compute_node(config_obj=config_obj,
+                                                                     compute_unit=compute_unit,
+                                                                     dataflow=dataflow,
+                                                                     ifmap_part=ifmap_part,
+                                                                     filter_part=filter_part,
+                                                                     ofmap_part=ofmap_part,
+                                                                     sparsity_obj=sparsity_obj,
+                                                                     operand_precisions=operand_precisions)
+    this_part_mem = SingleLayerSim.run_part_mem_sim(config_obj=config_obj,
+                                                    compute_node=this_part_compute_node,
+                                                    verbose=verbose,
+                                                    trace_dir_name=trace_dir_name,
+                                                    trace_chunk_lines=trace_chunk_lines,
+                                                    trace_format=trace_format,
+                                                    operand_precisions=operand_precisions)
+
+    return SingleLayerSim.get_part_report_items(compute_system=this_part_compute_node,
+                                                memory_system=this_part_mem)
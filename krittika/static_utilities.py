@@ -26,3 +26,18 @@ class StaticUtilities:
 
         factor_list += reverse_factor_list
         return factor_list
+
+    # Ordered lists of num_factors factors whose product is num. The later factors change
+    # slowest, the lists with the later factors at 1 come first
+    @staticmethod
+    def get_factors_as_tuples(num, num_factors=2):
+        if num_factors < 3:
+            return StaticUtilities.get_factors_as_pairs(num)
+
+        factor_list = []
+        for last_factor in range(1, num + 1):
+            if num % last_factor == 0:
+                for factors in StaticUtilities.get_factors_as_tuples(num // last_factor, num_factors - 1):
+                    factor_list.append(factors + [last_factor])
+
+        return factor_list
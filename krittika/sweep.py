@@ -0,0 +1,293 @@
+import os
+import random
+import itertools
+import statistics
+from configparser import ConfigParser
+from multiprocessing import Pool
+
+from krittika.config.krittika_config import KrittikaConfig
+from krittika.workload_manager import WorkloadManager
+from krittika.simulator import Simulator
+
+
+class DesignSpaceSweep:
+    '''
+        Runs a workload over many configs in one process tree:
+        1. The base config is loaded once and every design point overrides some of its entries
+        2. The sweep file lists the values of each swept entry, under the same sections as the config
+           [SWEEP] holds the sweep settings:
+           Sweep Mode = grid (all the combinations) or random (Num Samples combinations, drawn with Seed)
+        3. The topology is parsed once and shared by all the points
+        4. The points are simulated by a pool of workers, each one into its own reports directory
+        5. One row per point is written to SWEEP_RESULTS.csv
+    '''
+    def __init__(self):
+        self.base_cfg = ConfigParser()
+        self.workload_obj = WorkloadManager()
+
+        self.custom_partition_filename = ''
+        self.top_path = './'
+        self.num_workers = 1
+        self.simulation_mode = 'cycle'
+        self.verbose = True
+
+        # Swept entries as (section, option) and the values of each one
+        self.sweep_params = []
+        self.sweep_values = []
+        self.sweep_mode = 'grid'
+        self.num_samples = 1
+        self.seed = 0
+
+        # One list of values per point, in the order of the sweep_params
+        self.design_points = []
+        self.point_config_objs = []
+        self.point_results = []
+
+        # Flags
+        self.params_set = False
+        self.points_valid = False
+        self.sweep_done = False
+
+    #
+    def set_params(self,
+                   config_filename='',
+                   workload_filename='',
+                   custom_partition_filename='',
+                   sweep_filename='',
+                   reports_dir_path='./',
+                   num_workers=1,
+                   mode='cycle',
+                   verbose=True):
+
+        assert os.path.isfile(config_filename), 'Config file not found: ' + str(config_filename)
+        assert os.path.isfile(sweep_filename), 'Sweep file not found: ' + str(sweep_filename)
+        assert num_workers > 0, 'Number of workers must be greater than 0'
+        assert mode in ['cycle', 'analytical'], 'Invalid simulation mode: ' + str(mode)
+
+        self.base_cfg = ConfigParser()
+        self.base_cfg.read(config_filename)
+
+        # Parsed once, pickled to the workers along with each point
+        self.workload_obj = WorkloadManager()
+        self.workload_obj.read_topologies(workload_filename=workload_filename)
+
+        self.custom_partition_filename = custom_partition_filename
+        self.top_path = reports_dir_path
+        self.num_workers = num_workers
+        self.simulation_mode = mode
+        self.verbose = verbose
+
+        self.read_sweep_file(sweep_filename)
+
+        self.params_set = True
+
+    #
+    def read_sweep_file(self, filename):
+        sweep_cfg = ConfigParser()
+        sweep_cfg.read(filename)
+
+        self.sweep_params = []
+        self.sweep_values = []
+
+        section = 'SWEEP'
+        if sweep_cfg.has_option(section, 'Sweep Mode'):
+            self.sweep_mode = sweep_cfg.get(section, 'Sweep Mode').lower()
+        assert self.sweep_mode in ['grid', 'random'], 'Invalid sweep mode: ' + self.sweep_mode + \
+                                                      '. Supported vals: [grid, random]'
+
+        if sweep_cfg.has_option(section, 'Num Samples'):
+            self.num_samples = int(sweep_cfg.get(section, 'Num Samples'))
+            assert self.num_samples > 0, 'Number of samples must be greater than 0'
+
+        if sweep_cfg.has_option(section, 'Seed'):
+            self.seed = int(sweep_cfg.get(section, 'Seed'))
+
+        for section in sweep_cfg.sections():
+            if section == 'SWEEP':
+                continue
+            assert self.base_cfg.has_section(section), 'Section not in the base config: ' + section
+
+            for option in sweep_cfg.options(section):
+                values = [val.strip() for val in sweep_cfg.get(section, option).split(',')]
+                values = [val for val in values if val != '']
+                assert len(values) > 0, 'No values to sweep for ' + section + '.' + option
+
+                self.sweep_params += [(section, option)]
+                self.sweep_values += [values]
+
+        assert len(self.sweep_params) > 0, 'Nothing to sweep'
+
+    #
+    def create_design_points(self):
+        assert self.params_set, 'Params are not set'
+
+        all_points = list(itertools.product(*self.sweep_values))
+        if self.sweep_mode == 'random' and self.num_samples < len(all_points):
+            rng = random.Random(self.seed)
+            sample_ids = sorted(rng.sample(range(len(all_points)), self.num_samples))
+            all_points = [all_points[pid] for pid in sample_ids]
+
+        self.design_points = [list(point) for point in all_points]
+
+        # Configs are checked here, so that an invalid value fails before any simulation starts
+        self.point_config_objs = []
+        for point in self.design_points:
+            self.point_config_objs += [self.create_point_config(point)]
+
+        self.points_valid = True
+
+    #
+    def create_point_config(self, point):
+        point_cfg = ConfigParser()
+        point_cfg.read_dict(self.base_cfg)
+        for (section, option), value in zip(self.sweep_params, point):
+            point_cfg.set(section, option, value)
+
+        config_obj = KrittikaConfig()
+        config_obj.read_config(point_cfg)
+
+        # Pool workers are daemonic and cannot spawn their own pools
+        if self.num_workers > 1:
+            config_obj.set_num_workers(num_workers=1)
+            config_obj.set_num_layer_workers(num_layer_workers=1)
+
+        return config_obj
+
+    #
+    def run(self):
+        if not self.points_valid:
+            self.create_design_points()
+
+        if not os.path.isdir(self.top_path):
+            os.makedirs(self.top_path)
+
+        point_args_list = []
+        for point_id, config_obj in enumerate(self.point_config_objs):
+            point_dir = os.path.join(self.top_path, 'point' + str(point_id))
+            point_args_list += [(point_id, len(self.point_config_objs), config_obj, self.workload_obj,
+                                 self.custom_partition_filename, point_dir, self.simulation_mode,
+                                 self.verbose and self.num_workers < 2)]
+
+        if self.num_workers < 2 or len(point_args_list) < 2:
+            self.point_results = [run_design_point(point_args) for point_args in point_args_list]
+        else:
+            # Results come back in the order of the points
+            num_processes = min(self.num_workers, len(point_args_list))
+            with Pool(processes=num_processes) as pool:
+                self.point_results = pool.map(run_design_point, point_args_list)
+
+        self.sweep_done = True
+        self.save_results()
+
+    #
+    def save_results(self):
+        assert self.sweep_done
+
+        results_filename = os.path.join(self.top_path, 'SWEEP_RESULTS.csv')
+        results_file = open(results_filename, 'w+')
+
+        header = 'PointID, '
+        header += ', '.join([section + '.' + option for section, option in self.sweep_params]) + ', '
+        header += ', '.join(get_point_summary_names()) + ',\n'
+        results_file.write(header)
+
+        for point_id, (point, point_summary) in enumerate(zip(self.design_points, self.point_results)):
+            log = str(point_id) + ', '
+            log += ', '.join(point) + ', '
+            log += ', '.join([str(x) for x in point_summary])
+            log += ',\n'
+            results_file.write(log)
+
+        results_file.close()
+
+    #
+    def get_results(self):
+        assert self.sweep_done
+        return self.design_points, self.point_results
+
+
+#
+def get_point_summary_names():
+    return ['Total Cycles', 'Stall Cycles', 'Avg Overall Util %', 'Avg Mapping Efficiency %',
+            'IFMAP DRAM Reads', 'FILTER DRAM Reads', 'OFMAP DRAM Writes', 'Interconnect Cycles',
+            'Shared Buffer Stall Cycles', 'Shared Buffer DRAM Words Saved', 'DRAM Contention Stall Cycles',
+            'Activation Overlapped Cycles', 'Latency us', 'Inferences/s', 'Effective TOPS', 'MAC Util %']
+
+
+# Network level numbers of a finished run. The total cycles follow the slowest core of every layer,
+# the other layer numbers are averaged across cores as in the reports
+def get_point_summary(simulator=None):
+    assert simulator is not None and simulator.runs_done
+
+    total_cycles, latency_us, inferences_per_sec, _, effective_tops, mac_util = simulator.get_network_summary()
+    stall_cycles = 0
+    overall_util_list = []
+    mapping_eff_list = []
+    ifmap_dram_reads = 0
+    filter_dram_reads = 0
+    ofmap_dram_writes = 0
+
+    for this_layer_sim in simulator.single_layer_objects_list:
+        stall_cycles += statistics.mean(this_layer_sim.stall_cycles_list)
+        overall_util_list += [statistics.mean(this_layer_sim.overall_util_list)]
+        mapping_eff_list += [statistics.mean(this_layer_sim.mapping_eff_list)]
+
+        # Activation layers read and write their operand in the DRAM too
+        ifmap_dram_reads += sum(this_layer_sim.ifmap_dram_reads_list)
+        filter_dram_reads += sum(this_layer_sim.filter_dram_reads_list)
+        ofmap_dram_writes += sum(this_layer_sim.ofmap_dram_writes_list)
+
+    # The list is empty without an interconnect
+    interconnect_cycles = sum(simulator.interconnect_cycles_list)
+
+    shared_buffer_stall_cycles = 0
+    shared_buffer_words_saved = 0
+    if simulator.config_obj.is_shared_buffer_present():
+        shared_buffer_stall_cycles = simulator.shared_buffer.get_total_stall_cycles()
+        shared_buffer_words_saved = simulator.shared_buffer.get_total_dram_words_saved()
+    stall_cycles += shared_buffer_stall_cycles
+
+    # A layer ends with its slowest core, contention stretches that
+    dram_contention_stall_cycles = 0
+    if simulator.config_obj.is_dram_bw_shared():
+        for lid in range(len(simulator.single_layer_objects_list)):
+            standalone_cycles_list, contended_cycles_list = simulator.dram_arbiter.get_layer_cycles(lid)
+            dram_contention_stall_cycles += max(contended_cycles_list) - max(standalone_cycles_list)
+    stall_cycles += dram_contention_stall_cycles
+
+    # Fused activations only add the cycles which do not overlap with their producer
+    activation_overlapped_cycles = 0
+    if simulator.config_obj.get_fuse_activations():
+        for overlapped_cycles_list in simulator.activation_overlapped_cycles_list:
+            if len(overlapped_cycles_list) > 0:
+                activation_overlapped_cycles += statistics.mean(overlapped_cycles_list)
+
+    return [total_cycles, stall_cycles,
+            statistics.mean(overall_util_list), statistics.mean(mapping_eff_list),
+            ifmap_dram_reads, filter_dram_reads, ofmap_dram_writes, interconnect_cycles,
+            shared_buffer_stall_cycles, shared_buffer_words_saved, dram_contention_stall_cycles,
+            activation_overlapped_cycles, latency_us, inferences_per_sec, effective_tops, mac_util]
+
+
+# Worker for the point pool, kept at the module level so that it can be pickled
+def run_design_point(point_args):
+    point_id, num_points, config_obj, workload_obj, \
+        custom_partition_filename, point_dir, mode, verbose = point_args
+
+    print('Running point ' + str(point_id + 1) + '/' + str(num_points))
+
+    if not os.path.isdir(point_dir):
+        os.makedirs(point_dir)
+    config_obj.write_config_file(filename=os.path.join(point_dir, 'krittika.cfg'))
+
+    simulator = Simulator()
+    simulator.set_params_from_objects(config_obj=config_obj,
+                                      workload_obj=workload_obj,
+                                      custom_partition_filename=custom_partition_filename,
+                                      reports_dir_path=point_dir,
+                                      verbose=verbose,
+                                      save_traces=False,
+                                      mode=mode)
+    simulator.run()
+
+    return get_point_summary(simulator)
@@ -0,0 +1,2 @@
+from krittika.trace_io.trace_writer import TraceWriter
+from krittika.trace_io.trace_reader import TraceReader
@@ -0,0 +1,141 @@
+import os
+import itertools
+import zipfile
+
+import numpy as np
+
+
+class TraceReader:
+    '''
+        Reads the traces written by the TraceWriter (or scalesim) without loading the full file:
+        1. csv files are parsed a chunk of lines at a time
+        2. npy files are memory mapped
+        3. npz files are decompressed one stored chunk at a time, the chunks which do not cover
+           the requested cycles are skipped using the stored index
+        Every line holds the cycle in the first column and the addresses in the rest.
+    '''
+    def __init__(self):
+        self.filename = './TRACE.csv'
+        self.trace_format = 'csv'
+
+        self.trace_mat = None       # npy only, memory mapped
+        self.chunk_index = None     # npz only
+
+        # Flags
+        self.params_set = False
+
+    #
+    def set_params(self, filename='./TRACE.csv', trace_format=None):
+        assert os.path.isfile(filename), 'Trace file not found: ' + str(filename)
+
+        # The format is taken from the extension unless specified
+        if trace_format is None:
+            trace_format = os.path.splitext(filename)[1][1:]
+        assert trace_format in ['csv', 'npy', 'npz'], 'Invalid trace format: ' + str(trace_format)
+
+        self.filename = filename
+        self.trace_format = trace_format
+
+        self.trace_mat = None
+        self.chunk_index = None
+        if self.trace_format == 'npy':
+            self.trace_mat = np.load(self.filename, mmap_mode='r')
+        elif self.trace_format == 'npz':
+            with np.load(self.filename) as npz_file:
+                self.chunk_index = npz_file['index']
+
+        self.params_set = True
+
+    #
+    def get_num_lines(self):
+        assert self.params_set, 'Params are not set'
+
+        if self.trace_format == 'npy':
+            return self.trace_mat.shape[0]
+        elif self.trace_format == 'npz':
+            return int(np.sum(self.chunk_index[:, 3]))
+
+        num_lines = 0
+        with open(self.filename, 'r') as trace_file:
+            for _ in trace_file:
+                num_lines += 1
+        return num_lines
+
+    #
+    def iter_chunks(self, chunk_lines=10000):
+        # Chunks have at most chunk_lines lines, npz files are read back in their stored chunks
+        assert self.params_set, 'Params are not set'
+        assert chunk_lines > 0, 'Chunk size must be greater than 0'
+
+        if self.trace_format == 'npy':
+            for start_line in range(0, self.trace_mat.shape[0], chunk_lines):
+                yield np.asarray(self.trace_mat[start_line: start_line + chunk_lines, :])
+
+        elif self.trace_format == 'npz':
+            for chunk_id in range(self.chunk_index.shape[0]):
+                yield self.read_npz_chunk(chunk_id)
+
+        else:
+            with open(self.filename, 'r') as trace_file:
+                while True:
+                    lines = list(itertools.islice(trace_file, chunk_lines))
+                    if len(lines) == 0:
+                        break
+                    trace_chunk = np.loadtxt(lines, delimiter=",", ndmin=2)
+                    yield trace_chunk.astype(np.int64)
+
+    #
+    def get_cycle_range(self, start_cycle=0, end_cycle=1, chunk_lines=10000):
+        # Lines with start_cycle <= cycle < end_cycle
+        assert self.params_set, 'Params are not set'
+        assert end_cycle > start_cycle, 'Invalid cycle range'
+
+        if self.trace_format == 'npz':
+            chunk_ids = np.nonzero((self.chunk_index[:, 1] >= start_cycle) &
+                                   (self.chunk_index[:, 0] < end_cycle))[0]
+            trace_chunks = (self.read_npz_chunk(chunk_id) for chunk_id in chunk_ids)
+        else:
+            trace_chunks = self.iter_chunks(chunk_lines=chunk_lines)
+
+        selected_lines = []
+        num_cols = 1
+        for trace_chunk in trace_chunks:
+            num_cols = trace_chunk.shape[1]
+            cycles = trace_chunk[:, 0]
+            selected_lines += [trace_chunk[(cycles >= start_cycle) & (cycles < end_cycle), :]]
+
+        if len(selected_lines) == 0:
+            return np.zeros((0, num_cols), dtype=np.int64)
+        return np.concatenate(selected_lines, axis=0)
+
+    #
+    def iter_cycle_windows(self, window_cycles=1000, chunk_lines=10000):
+        # Yields (window start cycle, lines of the window) for every window with at least one line
+        # Windows are formed on the fly, which relies on the cycles being non decreasing in the trace
+        assert self.params_set, 'Params are not set'
+        assert window_cycles > 0, 'Window size must be greater than 0'
+
+        pending_window_id = None
+        pending_lines = []
+
+        for trace_chunk in self.iter_chunks(chunk_lines=chunk_lines):
+            window_ids = np.floor_divide(trace_chunk[:, 0], window_cycles)
+            # Boundaries between the windows present in this chunk
+            split_ids = np.nonzero(np.diff(window_ids))[0] + 1
+
+            for window_lines in np.split(trace_chunk, split_ids):
+                window_id = int(window_lines[0, 0] // window_cycles)
+                if pending_window_id is not None and window_id != pending_window_id:
+                    yield pending_window_id * window_cycles, np.concatenate(pending_lines, axis=0)
+                    pending_lines = []
+                pending_window_id = window_id
+                pending_lines += [window_lines]
+
+        if pending_window_id is not None:
+            yield pending_window_id * window_cycles, np.concatenate(pending_lines, axis=0)
+
+    #
+    def read_npz_chunk(self, chunk_id=0):
+        with zipfile.ZipFile(self.filename, mode='r') as zip_file:
+            with zip_file.open('chunk' + str(chunk_id) + '.npy', mode='r') as member_file:
+                return np.lib.format.read_array(member_file, allow_pickle=False)
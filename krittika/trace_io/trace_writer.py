@@ -0,0 +1,136 @@
+import struct
+import zipfile
+
+import numpy as np
+
+
+class TraceWriter:
+    '''
+        Writes a trace (first column cycles, the remaining columns addresses) chunk by chunk in
+        one of the supported formats:
+        1. csv: Plain text, identical to the traces written by scalesim
+        2. npy: Uncompressed int64 matrix, which the TraceReader memory maps
+        3. npz: Deflate compressed archive with one int64 matrix per chunk and an index of the
+           cycles covered by each chunk, which the TraceReader decompresses one chunk at a time
+    '''
+    supported_formats = ['csv', 'npy', 'npz']
+
+    # The npy header is rewritten with the final number of lines on close, hence has a fixed size
+    npy_header_bytes = 128
+
+    def __init__(self):
+        self.filename = './TRACE.csv'
+        self.trace_format = 'csv'
+
+        self.trace_file = None
+        self.num_lines = 0
+        self.num_cols = 0
+        # Per chunk: first cycle, last cycle, start line, num lines. Only kept for npz
+        self.chunk_index = []
+
+        # Flags
+        self.params_set = False
+        self.file_open = False
+
+    #
+    def set_params(self, filename='./TRACE.csv', trace_format='csv'):
+        assert trace_format in self.supported_formats, 'Invalid trace format: ' + str(trace_format)
+
+        self.filename = filename
+        self.trace_format = trace_format
+
+        self.params_set = True
+
+    #
+    def open(self):
+        assert self.params_set, 'Params are not set'
+
+        self.num_lines = 0
+        self.num_cols = 0
+        self.chunk_index = []
+
+        if self.trace_format == 'npz':
+            self.trace_file = zipfile.ZipFile(self.filename, mode='w',
+                                              compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+        elif self.trace_format == 'npy':
+            self.trace_file = open(self.filename, 'wb')
+            self.write_npy_header()
+        else:
+            self.trace_file = open(self.filename, 'w')
+
+        self.file_open = True
+
+    #
+    def write_chunk(self, trace_chunk):
+        assert self.file_open, 'Trace file is not open'
+
+        if len(trace_chunk.shape) == 1:
+            trace_chunk = trace_chunk.reshape((1, trace_chunk.shape[0]))
+        if trace_chunk.shape[0] == 0:
+            return
+
+        if self.num_cols == 0:
+            self.num_cols = trace_chunk.shape[1]
+        assert trace_chunk.shape[1] == self.num_cols, 'All the chunks of a trace must have the same columns'
+
+        if self.trace_format == 'csv':
+            np.savetxt(self.trace_file, trace_chunk, fmt='%i', delimiter=",")
+        elif self.trace_format == 'npy':
+            self.trace_file.write(trace_chunk.astype('<i8').tobytes(order='C'))
+        else:
+            chunk_name = 'chunk' + str(len(self.chunk_index)) + '.npy'
+            self.write_npz_member(chunk_name, trace_chunk.astype('<i8'))
+            self.chunk_index += [[int(np.amin(trace_chunk[:, 0])), int(np.amax(trace_chunk[:, 0])),
+                                  self.num_lines, trace_chunk.shape[0]]]
+
+        self.num_lines += trace_chunk.shape[0]
+
+    #
+    def close(self):
+        if not self.file_open:
+            return
+
+        if self.trace_format == 'npz':
+            chunk_index = np.asarray(self.chunk_index, dtype='<i8').reshape((len(self.chunk_index), 4))
+            self.write_npz_member('index.npy', chunk_index)
+        elif self.trace_format == 'npy':
+            self.trace_file.seek(0)
+            self.write_npy_header()
+
+        self.trace_file.close()
+        self.trace_file = None
+        self.file_open = False
+
+    #
+    def write_npy_header(self):
+        # Version 1.0 header, padded with spaces so that the data is 64 byte aligned
+        num_cols = max(self.num_cols, 1)
+        header_dict = "{'descr': '<i8', 'fortran_order': False, 'shape': (" + \
+                      str(self.num_lines) + ", " + str(num_cols) + "), }"
+        header_len = self.npy_header_bytes - 10
+        assert len(header_dict) + 1 <= header_len, 'Trace is too large for the npy header'
+
+        header = header_dict + ' ' * (header_len - len(header_dict) - 1) + '\n'
+        self.trace_file.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', header_len) + header.encode('latin1'))
+
+    #
+    def write_npz_member(self, member_name, array):
+        with self.trace_file.open(member_name, mode='w', force_zip64=True) as member_file:
+            np.lib.format.write_array(member_file, array, allow_pickle=False)
+
+    #
+    @staticmethod
+    def get_trace_filename(filename_stem='./TRACE', trace_format='csv'):
+        assert trace_format in TraceWriter.supported_formats, 'Invalid trace format: ' + str(trace_format)
+        return filename_stem + '.' + trace_format
+
+    #
+    @staticmethod
+    def write_trace_matrix(filename='./TRACE.csv', trace_matrix=None, trace_format='csv'):
+        trace_writer = TraceWriter()
+        trace_writer.set_params(filename=filename, trace_format=trace_format)
+        trace_writer.open()
+        # Buffers which never received a request have no trace
+        if trace_matrix is not None:
+            trace_writer.write_chunk(trace_matrix)
+        trace_writer.close()
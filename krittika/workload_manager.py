@@ -1,5 +1,8 @@
 import math
 
+from krittika.layer_sparsity import LayerSparsity
+from krittika.config.krittika_config import KrittikaConfig
+
 
 class WorkloadManager:
     def __init__(self):
@@ -7,6 +10,12 @@ class WorkloadManager:
         self.num_layers = 0
         self.topo_file_name = ''
         self.topo_list = []
+        # Weight sparsity of every layer, dense unless given at the end of a conv/gemm row
+        self.layer_sparsity_list = []
+        # Operand precisions (ifmap, filter, ofmap) of every layer, None to use the ones in the config
+        self.layer_precisions_list = []
+        # Number of independent matmuls of every layer, more than 1 for the bmm and attention layers
+        self.layer_batch_list = []
         self.spatio_temp_dim_arrays = []
         self.layers_calculated_hyperparams = []
         self.topo_valid = False
@@ -19,18 +28,24 @@ class WorkloadManager:
         f = open(workload_filename)
         format = 'conv'
 
-        for index, row in enumerate(f):
+        # A row can expand into several layers, the layer ids follow the expanded layers
+        for row in f:
                 format = str(row.strip("").split(', ')[0].strip(""))
-                assert format in ['gemm', 'conv', 'activation']
+                assert format in ['gemm', 'conv', 'activation', 'bmm', 'attention'], \
+                    'Unsupported layer type: ' + format
 
                 if format == "conv":
-                    self.load_arrays_conv(row, index)
+                    self.load_arrays_conv(row, self.num_layers)
                 elif format == "gemm":
-                    self.load_arrays_gemm(row, index)
+                    self.load_arrays_gemm(row, self.num_layers)
                 elif format == "activation":
-                    self.load_arrays_activation(row, index)
+                    self.load_arrays_activation(row, self.num_layers)
+                elif format == "bmm":
+                    self.load_arrays_bmm(row, self.num_layers)
+                elif format == "attention":
+                    self.load_arrays_attention(row, self.num_layers)
 
-                self.num_layers += 1
+                self.num_layers = len(self.topo_list)
 
         # There should be atleast one layer in topology file
         if self.num_layers > 0:
@@ -39,7 +54,7 @@ class WorkloadManager:
     #
     def load_arrays_conv(self, row, layer_id):
         row = row.strip()
-        elems = row.split(',')[:]
+        elems = self.load_layer_descriptors(row.split(',')[:])
         entry = ['conv', layer_id]
         for i in range(1, len(elems)):
             val = int(str(elems[i].strip()))
@@ -52,18 +67,63 @@ class WorkloadManager:
         assert entry[5] <= entry[3], 'Filter width cannot be larger than IFMAP width'
 
         self.topo_list.append(entry)
+        self.layer_batch_list.append(1)
     
     #    
     def load_arrays_gemm(self, row, layer_id):
         row = row.strip()
-        elems = row.split(',')[:]
+        elems = self.load_layer_descriptors(row.split(',')[:])
         m = int(elems[1].strip())
         n = int(elems[2].strip())
         k = int(elems[3].strip())
         entry = ['gemm', layer_id, m, k, 1, k, 1, n, 1, 1]
 
         self.topo_list.append(entry)
-    
+        self.layer_batch_list.append(1)
+
+    # B independent M x K by K x N products, kept as a gemm layer which runs B times
+    def load_arrays_bmm(self, row, layer_id):
+        row = row.strip()
+        elems = self.load_layer_descriptors(row.split(',')[:])
+        batch = int(elems[1].strip())
+        m = int(elems[2].strip())
+        n = int(elems[3].strip())
+        k = int(elems[4].strip())
+        assert batch > 0, 'Batch must be greater than 0'
+        entry = ['gemm', layer_id, m, k, 1, k, 1, n, 1, 1]
+
+        self.topo_list.append(entry)
+        self.layer_batch_list.append(batch)
+
+    # Scaled dot product attention of B sequences of H heads, S tokens and a head dimension D.
+    # Expands into three layers, each one batched over the B x H heads:
+    # 1. QK^T, S x D queries by D x S keys
+    # 2. softmax over the S x S scores, in place
+    # 3. AV, S x S probabilities by S x D values
+    def load_arrays_attention(self, row, layer_id):
+        row = row.strip()
+        elems = self.load_layer_descriptors(row.split(',')[:])
+        batch = int(elems[1].strip())
+        num_heads = int(elems[2].strip())
+        seq_len = int(elems[3].strip())
+        head_dim = int(elems[4].strip())
+        assert batch > 0 and num_heads > 0, 'Batch and heads must be greater than 0'
+
+        # Both matmuls multiply activations, hence only a precision can be given
+        layer_sparsity = self.layer_sparsity_list[-1]
+        layer_precisions = self.layer_precisions_list[-1]
+        assert layer_sparsity.is_dense(), 'Attention operands are activations, they cannot be sparse'
+
+        self.topo_list.append(['gemm', layer_id, seq_len, head_dim, 1, head_dim, 1, seq_len, 1, 1])
+        self.layer_batch_list.append(batch * num_heads)
+
+        self.load_arrays_activation('activation, softmax', layer_id + 1)
+
+        self.topo_list.append(['gemm', layer_id + 2, seq_len, seq_len, 1, seq_len, 1, head_dim, 1, 1])
+        self.layer_sparsity_list.append(layer_sparsity)
+        self.layer_precisions_list.append(layer_precisions)
+        self.layer_batch_list.append(batch * num_heads)
+
     #
     def load_arrays_activation(self, row, layer_id):
         row = row.strip()
@@ -77,6 +137,79 @@ class WorkloadManager:
 
         self.topo_list.append(entry)
 
+        # Activations work on the ofmap of their producer, in its precision
+        layer_sparsity = LayerSparsity()
+        layer_sparsity.set_params(kind='dense')
+        self.layer_sparsity_list.append(layer_sparsity)
+        self.layer_precisions_list.append(None)
+        # The ofmap of a batched producer holds all its batches
+        producer_batch = 1
+        if len(self.layer_batch_list) > 0:
+            producer_batch = self.layer_batch_list[-1]
+        self.layer_batch_list.append(producer_batch)
+
+    # Takes the sparsity and precision descriptors off the end of a conv/gemm/bmm/attention row,
+    # the numeric fields are returned
+    def load_layer_descriptors(self, elems):
+        layer_sparsity = LayerSparsity()
+        layer_sparsity.set_params(kind='dense')
+        layer_precisions = None
+
+        while not elems[-1].strip().isdigit():
+            descriptor = elems[-1].strip()
+            elems = elems[:-1]
+
+            # A precision for all the operands, or one per operand as ifmap/filter/ofmap
+            precisions = [x.strip().lower() for x in descriptor.split('/')]
+            if precisions[0] in KrittikaConfig.precision_bytes:
+                if len(precisions) == 1:
+                    precisions = precisions * 3
+                assert len(precisions) == 3, 'Precisions are written as <all> or <ifmap>/<filter>/<ofmap>'
+                for precision in precisions:
+                    assert precision in KrittikaConfig.precision_bytes, 'Invalid precision: ' + precision
+                layer_precisions = tuple(precisions)
+            else:
+                layer_sparsity.set_params_from_descriptor(descriptor=descriptor)
+
+        self.layer_sparsity_list.append(layer_sparsity)
+        self.layer_precisions_list.append(layer_precisions)
+        return elems
+
+    #
+    def get_layer_sparsity(self, layer_id=0):
+        if not (self.topo_valid or self.num_layers - 1 < layer_id):
+            print("ERROR: topologies.get_layer_sparsity: Invalid layer id")
+
+        return self.layer_sparsity_list[layer_id]
+
+    #
+    def get_layer_precisions(self, layer_id=0):
+        if not (self.topo_valid or self.num_layers - 1 < layer_id):
+            print("ERROR: topologies.get_layer_precisions: Invalid layer id")
+
+        return self.layer_precisions_list[layer_id]
+
+    #
+    def get_layer_batch(self, layer_id=0):
+        if not (self.topo_valid or self.num_layers - 1 < layer_id):
+            print("ERROR: topologies.get_layer_batch: Invalid layer id")
+
+        return self.layer_batch_list[layer_id]
+
+    #
+    def is_batched(self):
+        for batch in self.layer_batch_list:
+            if batch > 1:
+                return True
+        return False
+
+    #
+    def is_sparse(self):
+        for layer_sparsity in self.layer_sparsity_list:
+            if not layer_sparsity.is_dense():
+                return True
+        return False
+
     #
     def get_num_layers(self):
         if not self.topo_valid:
@@ -102,7 +235,7 @@ class WorkloadManager:
                 stride_w = array[9]
                 ofmap_h = int(math.ceil((ifmap_h - filt_h + stride_h) / stride_h))
                 ofmap_w = int(math.ceil((ifmap_w - filt_w + stride_w) / stride_w))
-                num_mac = ofmap_h * ofmap_w * filt_h * filt_w * num_ch * num_filt
+                num_mac = ofmap_h * ofmap_w * filt_h * filt_w * num_ch * num_filt * self.layer_batch_list[layer_id]
                 window_size = filt_h * filt_w * num_ch
                 entry = [layer_id, ofmap_h, ofmap_w, num_mac, window_size]
                 self.layers_calculated_hyperparams.append(entry)
@@ -265,7 +398,40 @@ class WorkloadManager:
             K = self.get_layer_window_size(layer_id)
 
         return (M, N, K)
+
+    # Same as get_transformed_mnk_dimensions for all the conv and gemm layers, in one pass
+    # over the hyper-parameters instead of one search per layer. Batched layers report one batch
+    def get_all_transformed_mnk_dimensions(self):
+        if not self.topo_hyper_param_valid:
+            self.topo_calc_hyperparams(self.topo_file_name)
+
+        layer_ids = []
+        mnk_dims = []
+        for hyperparams in self.layers_calculated_hyperparams:
+            layer_id, ofmap_h, ofmap_w, _, window_size = hyperparams
+            num_filters = self.topo_list[layer_id][7]
+
+            layer_ids += [layer_id]
+            mnk_dims += [(ofmap_h * ofmap_w * num_filters, num_filters, window_size)]
+
+        return layer_ids, mnk_dims
     
+    # Dimensions of the operand matrices as created by scalesim operand_matrix
+    # IFMAP: rows x window, FILTER: window x filters, OFMAP: rows x filters
+    def get_operand_matrix_dims(self, layer_id=0):
+        if not self.topo_hyper_param_valid:
+            self.topo_calc_hyperparams(self.topo_file_name)
+
+        layer_params = self.topo_list[layer_id]
+        assert layer_params[0] in ['conv', 'gemm'], 'It should be a conv/gemm layer'
+
+        ofmap_h, ofmap_w = self.get_layer_ofmap_dims(layer_id)
+        num_rows = ofmap_h * ofmap_w
+        window_sz = self.get_layer_window_size(layer_id)
+        num_filt = self.get_layer_num_filters(layer_id)
+
+        return num_rows, window_sz, num_filt
+
     #
     def get_layer_mac_ops(self, layer_id=0):
         if not self.topo_hyper_param_valid: